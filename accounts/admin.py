@@ -1,12 +1,103 @@
 from django.contrib import admin
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.views.main import ORDER_VAR, PAGE_VAR, ChangeList
 from django.contrib.auth.admin import UserAdmin
+from django.core.paginator import InvalidPage
+from django.utils import timezone
+from django.utils.html import format_html
 from django.utils.translation import gettext_lazy as _
-from .models import User, UserProfile
+from .avatars import avatar_files, queue_avatar_processing
+from tinggo.pagination import KeysetPaginator, approximate_count
+from .models import User, UserProfile, SupabaseOutbox, AvatarJob
+from .search import filter_users
+
+
+CURSOR_VAR = 'cursor'
+KEYSET_ORDERING = ('-created_at', '-pk')
+
+
+class KeysetChangeList(ChangeList):
+    """
+    Changelist paged with Previous/Next links instead of page numbers, so
+    it never runs COUNT(*) or OFFSET over the whole table:
+
+    - in the default -created_at order, by (created_at, id) cursors
+    - sorted by a column, by OFFSET without counting
+    - unfiltered, the count comes from table statistics; filtered or
+      searched, it is not shown
+    """
+
+    def __init__(self, request, *args, **kwargs):
+        self.cursor = request.GET.get(CURSOR_VAR)
+        super().__init__(request, *args, **kwargs)
+        # Filter, search and sort links start again from the first page
+        self.params.pop(CURSOR_VAR, None)
+        self.filter_params.pop(CURSOR_VAR, None)
+
+    def get_filters_params(self, params=None):
+        lookup_params = super().get_filters_params(params)
+        lookup_params.pop(CURSOR_VAR, None)
+        return lookup_params
+
+    def get_results(self, request):
+        per_page = self.list_per_page
+        if ORDER_VAR in self.params:
+            offset = (self.page_num - 1) * per_page
+            rows = list(self.queryset[offset:offset + per_page + 1])
+            self.result_list = rows[:per_page]
+            self.next_url = self.get_query_string({PAGE_VAR: self.page_num + 1}) if len(rows) > per_page else None
+            self.previous_url = self.get_query_string({PAGE_VAR: self.page_num - 1}) if offset else None
+            self.paginator = None
+        else:
+            self.paginator = KeysetPaginator(self.queryset, per_page, KEYSET_ORDERING)
+            try:
+                page = self.paginator.page(self.cursor)
+            except InvalidPage:
+                raise IncorrectLookupParameters
+            self.result_list = page.object_list
+            self.next_url = page.next_cursor and self.get_query_string({CURSOR_VAR: page.next_cursor})
+            self.previous_url = page.previous_cursor and self.get_query_string({CURSOR_VAR: page.previous_cursor})
+
+        # Any lookup in the query string: list filters, date hierarchy, raw lookups
+        self.counted = not (self.query or self.get_filters_params())
+        if self.counted:
+            self.result_count, self.count_is_approximate = approximate_count(self.root_queryset)
+        else:
+            # Only what is on the page: no "select all N" across the results
+            self.result_count, self.count_is_approximate = len(self.result_list), False
+        self.full_result_count = self.result_count
+        self.show_full_result_count = False
+        self.show_admin_actions = True
+        self.can_show_all = False
+        self.multi_page = bool(self.next_url or self.previous_url)
+
+
+class KeysetPaginationMixin:
+    """Admin changelist without COUNT(*) or deep OFFSETs, see KeysetChangeList"""
+    change_list_template = 'admin/keyset_change_list.html'
+    show_full_result_count = False
+
+    def get_changelist(self, request, **kwargs):
+        return KeysetChangeList
+
+
+class UserSearchMixin:
+    """
+    Admin search through the indexed User.search_text (accounts.search)
+    instead of OR'ed icontains over search_fields, with typo tolerance.
+    search_fields only needs to be set to show the search box.
+    """
+    # Path from the admin's model to the user
+    search_user_prefix = ''
+
+    def get_search_results(self, request, queryset, search_term):
+        queryset, _ = filter_users(queryset, search_term, self.search_user_prefix)
+        return queryset, False
 
 
 @admin.register(User)
-class CustomUserAdmin(UserAdmin):
-    list_display = ('email', 'full_name', 'role', 'is_verified', 'is_active', 'created_at')
+class CustomUserAdmin(KeysetPaginationMixin, UserSearchMixin, UserAdmin):
+    list_display = ('avatar_thumbnail', 'email', 'full_name', 'role', 'is_verified', 'is_active', 'created_at')
     list_filter = ('role', 'is_verified', 'is_active', 'language', 'created_at')
     search_fields = ('email', 'first_name', 'last_name')
     ordering = ('-created_at',)
@@ -32,13 +123,33 @@ class CustomUserAdmin(UserAdmin):
     def full_name(self, obj):
         return obj.full_name
     full_name.short_description = _('Full Name')
+    
+    def avatar_thumbnail(self, obj):
+        rendition = obj.avatar_small
+        if rendition is None:
+            return ''
+        return format_html(
+            '<picture><source srcset="{}" type="image/webp"><img src="{}" width="32" height="32" alt=""></picture>',
+            rendition['webp'], rendition['jpeg'],
+        )
+    avatar_thumbnail.short_description = _('avatar')
+    
+    def save_model(self, request, obj, form, change):
+        avatar_changed = 'avatar' in form.changed_data
+        if avatar_changed:
+            obsolete = avatar_files(form.initial.get('avatar'), obj.avatar_renditions)
+            obj.avatar_renditions = {}
+        super().save_model(request, obj, form, change)
+        if avatar_changed:
+            queue_avatar_processing(obj, obsolete)
 
 
 @admin.register(UserProfile)
-class UserProfileAdmin(admin.ModelAdmin):
+class UserProfileAdmin(KeysetPaginationMixin, UserSearchMixin, admin.ModelAdmin):
     list_display = ('user', 'business_name', 'website', 'created_at')
     list_filter = ('email_notifications', 'push_notifications', 'created_at')
     search_fields = ('user__email', 'user__first_name', 'user__last_name', 'business_name')
+    search_user_prefix = 'user__'
     ordering = ('-created_at',)
     
     fieldsets = (
@@ -50,3 +161,26 @@ class UserProfileAdmin(admin.ModelAdmin):
     )
     
     readonly_fields = ('created_at', 'updated_at')
+
+
+@admin.register(SupabaseOutbox)
+class SupabaseOutboxAdmin(admin.ModelAdmin):
+    list_display = ('user_id', 'fields', 'attempts', 'next_attempt_at', 'last_error', 'created_at')
+    list_filter = ('attempts',)
+    search_fields = ('user_id',)
+    ordering = ('id',)
+    readonly_fields = ('user_id', 'fields', 'attempts', 'last_error', 'created_at')
+
+
+@admin.register(AvatarJob)
+class AvatarJobAdmin(admin.ModelAdmin):
+    list_display = ('user_id', 'source', 'attempts', 'next_attempt_at', 'failed_at', 'last_error', 'created_at')
+    list_filter = ('attempts', ('failed_at', admin.EmptyFieldListFilter))
+    search_fields = ('user_id', 'source')
+    ordering = ('id',)
+    readonly_fields = ('user_id', 'source', 'obsolete', 'attempts', 'last_error', 'failed_at', 'created_at')
+    actions = ['retry_jobs']
+
+    @admin.action(description=_('Retry selected avatar jobs'))
+    def retry_jobs(self, request, queryset):
+        queryset.update(attempts=0, next_attempt_at=timezone.now(), failed_at=None)
@@ -1,6 +1,20 @@
 from django.apps import AppConfig
+from django.db import connections
+from django.db.models.signals import post_migrate
 
 
 class AccountsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'accounts'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+
+        post_migrate.connect(restore_search_index, sender=self)
+
+
+def restore_search_index(sender, using, **kwargs):
+    # SQLite drops the FTS triggers whenever a migration rebuilds accounts_user
+    from .search import install_search_index
+    if connections[using].vendor == 'sqlite':
+        install_search_index(connections[using])
@@ -0,0 +1,88 @@
+"""
+Async versions of the Supabase-bound auth views.
+
+Routed instead of the sync views in accounts.views when ASYNC_VIEWS is on
+(the ASGI entry point enables it), so a slow Supabase call waits on the
+event loop instead of holding a worker.
+"""
+from asgiref.sync import sync_to_async
+from django.shortcuts import render, redirect
+from django.contrib.auth import alogin, aauthenticate
+from django.contrib import messages
+from django.utils.translation import gettext_lazy as _
+from .backends import apassword_reset_requested
+from .forms import CustomUserCreationForm
+from .views import create_registered_user, registration_user_data
+from tinggo.supabase_async import sign_up_user, reset_password
+
+
+# Templates read request.user and the session, which hit the database
+arender = sync_to_async(render)
+
+
+async def register(request):
+    if request.method == 'POST':
+        form = CustomUserCreationForm(request.POST)
+        if await sync_to_async(form.is_valid)():
+            email = form.cleaned_data.get('email')
+            password = form.cleaned_data.get('password1')
+
+            # Get current language from session or default to 'en'
+            current_language = await request.session.aget('django_language', 'en')
+
+            supabase_user_data = registration_user_data(form, current_language)
+            supabase_user = await sign_up_user(email, password, supabase_user_data)
+
+            if supabase_user:
+                user = await sync_to_async(create_registered_user)(form, current_language)
+
+                # Credentials were just accepted by Supabase, no need to verify again
+                await alogin(request, user, backend='accounts.backends.SupabaseBackend')
+                messages.success(request, _('Welcome to TingGo! Your account has been created successfully.'))
+                return redirect('home')
+            else:
+                messages.error(request, _('Failed to create account. Please try again.'))
+                return await arender(request, 'accounts/register.html', {'form': form})
+    else:
+        form = CustomUserCreationForm()
+
+    return await arender(request, 'accounts/register.html', {'form': form})
+
+
+async def custom_login(request):
+    if request.method == 'POST':
+        email = request.POST.get('email')
+        password = request.POST.get('password')
+
+        if email and password:
+            # SupabaseBackend.aauthenticate awaits the async Supabase client
+            user = await aauthenticate(request, email=email, password=password)
+            if user is not None:
+                await alogin(request, user)
+                messages.success(request, _('Welcome back!'))
+                return redirect('home')
+            else:
+                messages.error(request, _('Invalid credentials.'))
+        else:
+            messages.error(request, _('Please provide email and password.'))
+
+    return await arender(request, 'accounts/custom_login.html')
+
+
+async def custom_password_reset(request):
+    if request.method == 'POST':
+        email = request.POST.get('email')
+
+        if email:
+            # The old password must not keep logging in from the cache or
+            # the local hash
+            await apassword_reset_requested(email)
+            if await reset_password(email):
+                messages.success(request, _('Password reset email sent. Please check your inbox.'))
+                return redirect('accounts:custom_login')
+            else:
+                messages.error(request, _('Failed to send password reset email. Please try again.'))
+        else:
+            messages.error(request, _('Please provide your email address.'))
+
+    return await arender(request, 'accounts/custom_password_reset.html')
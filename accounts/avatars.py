@@ -0,0 +1,138 @@
+import hashlib
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+
+from .models import AvatarJob, User
+
+
+# Square rendition sizes in pixels (2x the largest CSS size they are shown at)
+AVATAR_RENDITIONS = {
+    'small': 96,
+    'medium': 256,
+}
+AVATAR_FORMATS = {
+    'webp': {'format': 'WEBP', 'quality': 80, 'method': 4},
+    'jpeg': {'format': 'JPEG', 'quality': 85, 'optimize': True, 'progressive': True},
+}
+
+
+def queue_avatar_processing(user, obsolete=()):
+    """
+    Queue rendition of the user's current avatar, call after saving it.
+    ``obsolete`` are the files of the avatar it replaced (avatar_files()),
+    deleted by the worker.
+    """
+    if user.avatar or obsolete:
+        AvatarJob.objects.create(user_id=user.pk, source=user.avatar.name or '', obsolete=list(obsolete))
+
+
+def avatar_files(original, renditions):
+    """Storage names of an avatar original and its renditions"""
+    names = [str(original)] if original else []
+    names += [name for formats in renditions.values() for name in formats.values()]
+    return names
+
+
+def owns_avatar_file(user_id, name):
+    """
+    Whether ``name`` can only be used by ``user_id``: uploads get a unique
+    name from the storage, renditions are stored under the user's id
+    """
+    parts = name.split('/')
+    return (len(parts) == 2 and parts[0] == 'avatars'
+            or len(parts) == 4 and parts[0] == 'avatars' and parts[2] == str(user_id))
+
+
+def delete_avatar_files(user_id, names):
+    """
+    Delete the replaced avatar files ``names`` of ``user_id`` that its
+    current avatar does not use again (the same picture uploaded twice).
+    Renditions written before they were stored per user may be shared with
+    other users and are left in place.
+    """
+    names = {name for name in names if name and owns_avatar_file(user_id, name)}
+    if not names:
+        return
+    current = User.objects.filter(pk=user_id).values_list('avatar', 'avatar_renditions').first()
+    if current is not None:
+        names.difference_update(avatar_files(*current))
+    for name in names:
+        default_storage.delete(name)
+
+
+def decode_avatar(file):
+    """
+    Decode an upload once into an upright RGB image no larger than needed
+    """
+    # Pillow is imported here, by the worker, to keep it out of web startup
+    from PIL import Image, ImageOps
+
+    largest = max(AVATAR_RENDITIONS.values())
+    with Image.open(file) as image:
+        # JPEG can decode straight at a reduced scale, far cheaper than a
+        # full decode of a phone photo
+        image.draft('RGB', (largest, largest))
+        image = ImageOps.exif_transpose(image)
+        if image.mode in ('RGBA', 'LA', 'P'):
+            image = image.convert('RGBA')
+            background = Image.new('RGB', image.size, 'white')
+            background.paste(image, mask=image.getchannel('A'))
+            image = background
+        else:
+            image = image.convert('RGB')
+        return ImageOps.fit(image, (largest, largest), Image.LANCZOS)
+
+
+def render_avatar(user_id, file):
+    """
+    Write every rendition of an avatar of ``user_id`` and return their
+    storage names.
+
+    Files are named after the user and a hash of their content, so a name
+    never changes content and can be cached forever, and deleting a
+    replaced avatar never touches another user's files. Nothing but pixels is written: EXIF
+    (including GPS), ICC and other metadata are dropped.
+    """
+    from PIL import Image
+
+    square = decode_avatar(file)
+    renditions = {}
+    for size_name, size in AVATAR_RENDITIONS.items():
+        image = square if square.width == size else square.resize((size, size), Image.LANCZOS)
+        renditions[size_name] = {}
+        for fmt, options in AVATAR_FORMATS.items():
+            buffer = BytesIO()
+            image.save(buffer, **options)
+            content = buffer.getvalue()
+            name = f'avatars/{size}/{user_id}/{hashlib.sha256(content).hexdigest()[:24]}.{fmt}'
+            if not default_storage.exists(name):
+                name = default_storage.save(name, ContentFile(content))
+            renditions[size_name][fmt] = name
+    return renditions
+
+
+def process_avatar(user_id, source):
+    """
+    Render ``source`` for the user and store the result, unless the user has
+    uploaded another avatar in the meantime. Returns False for stale jobs.
+    """
+    user = User.objects.filter(pk=user_id).only('avatar').first()
+    if user is None or user.avatar.name != source:
+        return False
+
+    with user.avatar.open('rb') as file:
+        renditions = render_avatar(user_id, file)
+
+    with transaction.atomic():
+        user = User.objects.select_for_update().filter(pk=user_id, avatar=source).first()
+        if user is not None:
+            user.avatar_renditions = renditions
+            user.save(update_fields=['avatar_renditions'])
+    if user is None:
+        # Replaced while rendering: nothing will reference these
+        delete_avatar_files(user_id, avatar_files(None, renditions))
+        return False
+    return True
@@ -0,0 +1,347 @@
+import hashlib
+import threading
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.hashers import get_hasher, identify_hasher
+from django.core.cache import cache
+from django.utils.crypto import constant_time_compare, salted_hmac
+
+from tinggo import supabase_async
+from tinggo.supabase import SupabaseUnavailable, verify_user_credentials
+from .models import User
+
+
+_stats_lock = threading.Lock()
+_stats = {
+    'cache_hits': 0,
+    'cache_misses': 0,
+    'remote_accepted': 0,
+    'remote_rejected': 0,
+    'remote_unavailable': 0,
+    'local_checks': 0,
+    'local_throttled': 0,
+    'user_cache_hits': 0,
+    'user_cache_misses': 0,
+}
+
+
+def _increment(key):
+    with _stats_lock:
+        _stats[key] += 1
+
+
+def get_auth_stats():
+    """
+    Get login verification counters for the current worker
+    """
+    with _stats_lock:
+        return dict(_stats)
+
+
+def _user_version_key(user_id):
+    return f'auth:user_version:{user_id}'
+
+
+def _user_cache_key(user_id, version):
+    return f'auth:user:{user_id}:{version}'
+
+
+def invalidate_cached_user(user_id):
+    """
+    Make the next request of ``user_id`` reload the user and profile.
+
+    Bumps the per-user version instead of deleting, so a request that read
+    the old row before the change cannot write it back under the live key.
+    """
+    key = _user_version_key(user_id)
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Evicted between add() and incr()
+        cache.set(key, 1, None)
+
+
+def _auth_key(prefix, email):
+    return f'auth:{prefix}:{hashlib.sha256(email.lower().encode()).hexdigest()}'
+
+
+def forget_verified_password(email):
+    """
+    Drop the cached login verification of ``email``, so its next login is
+    checked again (password reset requested or password changed)
+    """
+    cache.delete(_auth_key('verified', email))
+
+
+async def aforget_verified_password(email):
+    await cache.adelete(_auth_key('verified', email))
+
+
+def password_reset_requested(email):
+    """
+    Forget the verified password of ``email`` and have its next Supabase
+    login bring the local hash up to date with the new password
+    """
+    forget_verified_password(email)
+    users = User._default_manager.filter(email__iexact=email)
+    for user_id in users.values_list('pk', flat=True):
+        invalidate_cached_user(user_id)
+    users.update(password_sync_pending=True)
+
+
+async def apassword_reset_requested(email):
+    await sync_to_async(password_reset_requested)(email)
+
+
+class SupabaseBackend(ModelBackend):
+    """
+    Authenticate by email against one authoritative source.
+
+    AUTH_AUTHORITY = 'supabase' verifies with Supabase Auth and trusts its
+    answer. Staff accounts, which
+    may exist only in Django, fall back to the local hash when Supabase
+    rejects them. AUTH_AUTHORITY = 'local' uses the Django hash only.
+
+    A local hash made with an older hasher or cost (PASSWORD_HASHER) is
+    redone from the password Supabase accepts. After a password reset
+    (password_reset_requested) the next accepted password is checked
+    against the local hash and replaces it when it differs, so the local
+    fallback stops accepting the old one; until then the fallback is
+    refused. Other logins do not run the hasher.
+
+    With a cache shared by all workers (CACHE_IS_SHARED), successful
+    verifications are cached for AUTH_VERIFICATION_TTL seconds as a keyed
+    HMAC of the password, so repeated logins skip both the remote call and
+    the hasher. Password resets and changes drop the cached verification
+    (forget_verified_password). Local hash checks made because Supabase is
+    down are limited to AUTH_LOCAL_FALLBACK_LIMIT per email per window.
+
+    The session user is loaded together with its profile and, when the
+    cache is shared by all workers (CACHE_IS_SHARED), cached for
+    USER_CACHE_TTL seconds, so authenticated requests normally run no user
+    or profile query. accounts.signals invalidates it on every save; code
+    changing users with QuerySet.update() must call invalidate_cached_user().
+    With a per-process cache the invalidation would only reach one worker
+    and the others would keep a deactivated user or an old password hash
+    (checked by the session auth hash), so the user is loaded every time.
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        email = username or kwargs.get(User.USERNAME_FIELD)
+        if not email or not password:
+            return None
+
+        try:
+            user = User._default_manager.get_by_natural_key(email)
+        except User.DoesNotExist:
+            # Run the hasher once to reduce the timing difference (see ModelBackend)
+            User().set_password(password)
+            return None
+        if not self.user_can_authenticate(user):
+            return None
+
+        if self._is_verified(user, password):
+            _increment('cache_hits')
+            return user
+        _increment('cache_misses')
+
+        if settings.AUTH_AUTHORITY == 'supabase':
+            try:
+                accepted = verify_user_credentials(user.email, password) is not None
+            except SupabaseUnavailable:
+                _increment('remote_unavailable')
+            else:
+                if accepted:
+                    _increment('remote_accepted')
+                    self._sync_password(user, password)
+                    self._remember(user, password)
+                    return user
+                _increment('remote_rejected')
+                if not user.is_staff:
+                    return None
+            if user.password_sync_pending and not user.is_staff:
+                return None
+            if self._throttled(user):
+                _increment('local_throttled')
+                return None
+
+        _increment('local_checks')
+        if user.check_password(password):
+            self._remember(user, password)
+            return user
+        return None
+
+    async def aauthenticate(self, request, username=None, password=None, **kwargs):
+        """
+        Async version of authenticate() using the async Supabase client
+        """
+        email = username or kwargs.get(User.USERNAME_FIELD)
+        if not email or not password:
+            return None
+
+        try:
+            user = await User._default_manager.aget_by_natural_key(email)
+        except User.DoesNotExist:
+            # Password hashing is CPU-bound, keep it off the event loop
+            await sync_to_async(User().set_password)(password)
+            return None
+        if not self.user_can_authenticate(user):
+            return None
+
+        if await self._ais_verified(user, password):
+            _increment('cache_hits')
+            return user
+        _increment('cache_misses')
+
+        if settings.AUTH_AUTHORITY == 'supabase':
+            try:
+                accepted = await supabase_async.verify_user_credentials(user.email, password) is not None
+            except SupabaseUnavailable:
+                _increment('remote_unavailable')
+            else:
+                if accepted:
+                    _increment('remote_accepted')
+                    await sync_to_async(self._sync_password)(user, password)
+                    await self._aremember(user, password)
+                    return user
+                _increment('remote_rejected')
+                if not user.is_staff:
+                    return None
+            if user.password_sync_pending and not user.is_staff:
+                return None
+            if await self._athrottled(user):
+                _increment('local_throttled')
+                return None
+
+        _increment('local_checks')
+        if await sync_to_async(user.check_password)(password):
+            await self._aremember(user, password)
+            return user
+        return None
+
+    def get_user(self, user_id):
+        if not settings.CACHE_IS_SHARED:
+            user = self._load_user(user_id)
+            return user if user is not None and self.user_can_authenticate(user) else None
+        version = cache.get(_user_version_key(user_id), 0)
+        key = _user_cache_key(user_id, version)
+        user = cache.get(key)
+        if user is not None:
+            _increment('user_cache_hits')
+        else:
+            _increment('user_cache_misses')
+            user = self._load_user(user_id)
+            if user is None:
+                return None
+            cache.set(key, user, settings.USER_CACHE_TTL)
+        return user if self.user_can_authenticate(user) else None
+
+    async def aget_user(self, user_id):
+        if not settings.CACHE_IS_SHARED:
+            user = await self._aload_user(user_id)
+            return user if user is not None and self.user_can_authenticate(user) else None
+        version = await cache.aget(_user_version_key(user_id), 0)
+        key = _user_cache_key(user_id, version)
+        user = await cache.aget(key)
+        if user is not None:
+            _increment('user_cache_hits')
+        else:
+            _increment('user_cache_misses')
+            user = await self._aload_user(user_id)
+            if user is None:
+                return None
+            await cache.aset(key, user, settings.USER_CACHE_TTL)
+        return user if self.user_can_authenticate(user) else None
+
+    def _load_user(self, user_id):
+        try:
+            return User._default_manager.select_related('profile').get(pk=user_id)
+        except User.DoesNotExist:
+            return None
+
+    async def _aload_user(self, user_id):
+        try:
+            return await User._default_manager.select_related('profile').aget(pk=user_id)
+        except User.DoesNotExist:
+            return None
+
+    def _sync_password(self, user, password):
+        """
+        Bring the local hash up to date with the password Supabase just
+        accepted. The hasher only runs after a password reset, when there
+        is no usable hash yet, or when the hash uses an older hasher or cost.
+        """
+        if user.password_sync_pending:
+            if not user.check_password(password):
+                user.set_password(password)
+            user.password_sync_pending = False
+            user.save(update_fields=['password', 'password_sync_pending'])
+        elif not user.has_usable_password() or self._hash_outdated(user.password):
+            user.set_password(password)
+            user.save(update_fields=['password'])
+
+    def _hash_outdated(self, encoded):
+        try:
+            hasher = identify_hasher(encoded)
+        except ValueError:
+            return True
+        preferred = get_hasher('default')
+        return hasher.algorithm != preferred.algorithm or preferred.must_update(encoded)
+
+    def _cache_key(self, prefix, user):
+        return _auth_key(prefix, user.email)
+
+    def _digest(self, user, password):
+        # The stored hash is part of the message so a local password change
+        # invalidates the cached verification.
+        return salted_hmac('accounts.backends.SupabaseBackend', f'{user.password}:{password}',
+                           algorithm='sha256').hexdigest()
+
+    def _is_verified(self, user, password):
+        if not settings.CACHE_IS_SHARED:
+            return False
+        digest = cache.get(self._cache_key('verified', user))
+        return digest is not None and constant_time_compare(digest, self._digest(user, password))
+
+    def _remember(self, user, password):
+        if not settings.CACHE_IS_SHARED:
+            return
+        cache.set(self._cache_key('verified', user), self._digest(user, password),
+                  settings.AUTH_VERIFICATION_TTL)
+
+    async def _ais_verified(self, user, password):
+        if not settings.CACHE_IS_SHARED:
+            return False
+        digest = await cache.aget(self._cache_key('verified', user))
+        return digest is not None and constant_time_compare(digest, self._digest(user, password))
+
+    async def _aremember(self, user, password):
+        if not settings.CACHE_IS_SHARED:
+            return
+        await cache.aset(self._cache_key('verified', user), self._digest(user, password),
+                         settings.AUTH_VERIFICATION_TTL)
+
+    def _throttled(self, user):
+        key = self._cache_key('fallback', user)
+        cache.add(key, 0, settings.AUTH_LOCAL_FALLBACK_WINDOW)
+        try:
+            attempts = cache.incr(key)
+        except ValueError:
+            # Expired between add() and incr()
+            cache.set(key, 1, settings.AUTH_LOCAL_FALLBACK_WINDOW)
+            attempts = 1
+        return attempts > settings.AUTH_LOCAL_FALLBACK_LIMIT
+
+    async def _athrottled(self, user):
+        key = self._cache_key('fallback', user)
+        await cache.aadd(key, 0, settings.AUTH_LOCAL_FALLBACK_WINDOW)
+        try:
+            attempts = await cache.aincr(key)
+        except ValueError:
+            # Expired between aadd() and aincr()
+            await cache.aset(key, 1, settings.AUTH_LOCAL_FALLBACK_WINDOW)
+            attempts = 1
+        return attempts > settings.AUTH_LOCAL_FALLBACK_LIMIT
@@ -0,0 +1,221 @@
+"""
+Bulk user creation, for imports and User.objects.bulk_create_users().
+
+Rows are validated against the model fields, their passwords hashed in a
+process pool and the User, UserProfile (and optionally SupabaseOutbox)
+rows inserted with bulk_create, one transaction per chunk. bulk_create
+skips save() and signals, so search_text and the dashboard stats cache
+are handled here.
+
+With AUTH_AUTHORITY = 'supabase' a user can only log in with a Supabase
+Auth account: create_auth_users() creates them with the admin API.
+"""
+import multiprocessing
+import os
+import secrets
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import nullcontext
+from itertools import islice
+
+from django.contrib.auth.hashers import UNUSABLE_PASSWORD_PREFIX, make_password
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, models, transaction
+
+from tinggo.supabase import SupabaseUnavailable, create_auth_user
+from .models import User, UserProfile, SupabaseOutbox, normalize_search_text
+from .stats import clear_user_stats_cache
+
+
+# Importable columns; anything else in a file is ignored
+USER_IMPORT_FIELDS = (
+    'email', 'first_name', 'last_name', 'phone', 'role', 'is_verified',
+    'bio', 'country', 'city', 'language',
+)
+PROFILE_IMPORT_FIELDS = (
+    'website', 'instagram', 'facebook', 'twitter', 'business_name',
+    'business_description', 'email_notifications', 'push_notifications',
+)
+IMPORT_FIELDS = (*USER_IMPORT_FIELDS, 'password', *PROFILE_IMPORT_FIELDS)
+# Most passwords sent to a worker process at a time
+HASH_CHUNK_SIZE = 32
+FILE_FORMATS = ('csv', 'jsonl')
+# Spreadsheets run cells starting with these as formulas: CSV exports
+# prefix such values with a quote
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+# Spreadsheet and CRM spellings of booleans
+BOOLEAN_VALUES = {
+    'true': True, 'yes': True, 'y': True, 't': True, '1': True,
+    'false': False, 'no': False, 'n': False, 'f': False, '0': False,
+}
+
+
+def file_format(path, requested=None):
+    """``requested``, or the format of ``path`` by extension (csv by default)"""
+    if requested:
+        return requested
+    return 'jsonl' if str(path).lower().endswith(('.jsonl', '.ndjson')) else 'csv'
+
+
+def password_pool(processes=None):
+    """
+    Process pool for hash_passwords(). Workers are spawned rather than
+    forked so they do not share the parent's database connections.
+    """
+    return ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context('spawn'))
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def hash_passwords(passwords, executor=None):
+    """
+    Iterator over the make_password() hashes of ``passwords`` in order,
+    an unusable password for empty ones. With an ``executor`` the hashing
+    is submitted at once and runs while the caller does other work.
+    """
+    to_hash = [password for password in passwords if password]
+    if executor is not None and to_hash:
+        # Small chunks keep every worker busy even for a few slow hashes
+        chunksize = max(1, min(HASH_CHUNK_SIZE, len(to_hash) // (4 * (os.cpu_count() or 1))))
+        hashed = executor.map(make_password, to_hash, chunksize=chunksize)
+    else:
+        hashed = map(make_password, to_hash)
+    return (next(hashed) if password else unusable_password() for password in passwords)
+
+
+def unusable_password():
+    """Like make_password(None), without its slow get_random_string()"""
+    return UNUSABLE_PASSWORD_PREFIX + secrets.token_hex(20)
+
+
+def clean_import_row(row):
+    """
+    (user fields, profile fields, password) from a dict of column values,
+    checked like model forms check them. Missing or empty columns get the
+    model defaults. Raises ValidationError with {column: messages}.
+    """
+    errors = {}
+    cleaned = {}
+    for name in (*USER_IMPORT_FIELDS, *PROFILE_IMPORT_FIELDS):
+        value = row.get(name)
+        if value is None or value == '':
+            continue
+        field = (User if name in USER_IMPORT_FIELDS else UserProfile)._meta.get_field(name)
+        if isinstance(value, str):
+            if value.startswith("'") and value[1:].startswith(FORMULA_PREFIXES):
+                value = value[1:]
+            value = value.strip()
+            if isinstance(field, models.BooleanField):
+                value = BOOLEAN_VALUES.get(value.lower(), value)
+        try:
+            cleaned[name] = field.clean(value, None)
+        except ValidationError as error:
+            errors[name] = error.messages
+    if 'email' not in cleaned and 'email' not in errors:
+        errors['email'] = ['This field is required.']
+    if errors:
+        raise ValidationError(errors)
+    cleaned['email'] = User.objects.normalize_email(cleaned['email'])
+    user_fields = {name: value for name, value in cleaned.items() if name in USER_IMPORT_FIELDS}
+    profile_fields = {name: value for name, value in cleaned.items() if name in PROFILE_IMPORT_FIELDS}
+    password = row.get('password')
+    return user_fields, profile_fields, str(password) if password else None
+
+
+def existing_emails(emails):
+    return set(User.objects.filter(email__in=emails).values_list('email', flat=True))
+
+
+def create_users(rows, password_hashes, sync_supabase=False, batch_size=1000):
+    """
+    Insert cleaned ``rows`` (from clean_import_row) with their hashes in
+    one transaction, skipping emails that already exist or repeat.
+    Returns the created users.
+    """
+    rows = list(zip(rows, password_hashes))
+    # A concurrent sign-up can take an email between the check and the
+    # insert: check again and retry once
+    for attempt in (1, 2):
+        # Existing emails and repeats within the chunk are skipped
+        seen = existing_emails([user_fields['email'] for (user_fields, _, _), _ in rows])
+        unique = []
+        for row in rows:
+            email = row[0][0]['email']
+            if email not in seen:
+                seen.add(email)
+                unique.append(row)
+        rows = unique
+        try:
+            with transaction.atomic():
+                return _insert(rows, sync_supabase, batch_size)
+        except IntegrityError:
+            if attempt == 2:
+                raise
+
+
+def _insert(rows, sync_supabase, batch_size):
+    users = []
+    profiles = []
+    for (user_fields, profile_fields, _), password_hash in rows:
+        user = User(password=password_hash, **user_fields)
+        user.search_text = normalize_search_text(
+            user.email, user.first_name, user.last_name, profile_fields.get('business_name'),
+        )
+        users.append(user)
+        profiles.append(profile_fields)
+    # Primary keys are set by bulk_create on PostgreSQL and SQLite
+    User.objects.bulk_create(users, batch_size=batch_size)
+    UserProfile.objects.bulk_create(
+        [UserProfile(user=user, **fields) for user, fields in zip(users, profiles)],
+        batch_size=batch_size,
+    )
+    if sync_supabase:
+        SupabaseOutbox.objects.bulk_create([SupabaseOutbox(user_id=user.pk) for user in users], batch_size=batch_size)
+    if users:
+        # Normally cleared by the post_save signal, which bulk_create skips
+        transaction.on_commit(clear_user_stats_cache)
+    return users
+
+
+def create_users_in_chunks(chunks, processes=None, sync_supabase=False):
+    """
+    (chunk, created users) for each chunk of cleaned rows, inserting one
+    chunk while the passwords of the next are hashed in ``processes``
+    processes (0: in this one)
+    """
+    with password_pool(processes) if processes != 0 else nullcontext() as pool:
+        pending = None
+        for chunk in chunks:
+            hashes = hash_passwords([password for _, _, password in chunk], pool)
+            if pending:
+                yield pending[0], create_users(*pending, sync_supabase=sync_supabase)
+            pending = chunk, hashes
+        if pending:
+            yield pending[0], create_users(*pending, sync_supabase=sync_supabase)
+
+
+def create_auth_users(users, passwords, threads=8):
+    """
+    Create the Supabase Auth users of the created ``users``, with their
+    plain ``passwords`` by email (users without one set it with a password
+    reset), ``threads`` requests at a time. Emails Supabase already has
+    keep their Supabase password. Returns {email: error} for failures.
+    """
+    def create(user):
+        user_data = {
+            'first_name': user.first_name,
+            'last_name': user.last_name,
+            'role': user.role,
+            'language': user.language,
+        }
+        try:
+            create_auth_user(user.email, passwords.get(user.email), user_data)
+        except SupabaseUnavailable as error:
+            return user.email, str(error)
+        return user.email, None
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        return {email: error for email, error in executor.map(create, users) if error}
@@ -3,6 +3,7 @@ from django.contrib.auth.forms import UserCreationForm, UserChangeForm
 from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError
 from django.utils.translation import gettext_lazy as _
+from .avatars import avatar_files, queue_avatar_processing
 from .models import User, UserProfile
 
 
@@ -85,4 +86,18 @@ class UserAvatarForm(forms.ModelForm):
         fields = ('avatar',)
         widgets = {
             'avatar': forms.FileInput(attrs={'class': 'file-input file-input-bordered w-full'})
-        } 
\ No newline at end of file
+        }
+    
+    def save(self, commit=True):
+        user = super().save(commit=False)
+        avatar_changed = 'avatar' in self.changed_data
+        if avatar_changed:
+            # Files of the old avatar, deleted by the worker; new renditions
+            # are made in the background
+            self.obsolete_avatar_files = avatar_files(self.initial.get('avatar'), user.avatar_renditions)
+            user.avatar_renditions = {}
+        if commit:
+            user.save()
+            if avatar_changed:
+                queue_avatar_processing(user, self.obsolete_avatar_files)
+        return user 
\ No newline at end of file
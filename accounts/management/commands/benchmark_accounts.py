@@ -0,0 +1,496 @@
+import json
+import random
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import ExitStack
+from pathlib import Path
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import override_settings
+from django.test.testcases import LiveServerThread, QuietWSGIRequestHandler
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.urls import reverse
+from django.utils import translation
+
+from accounts.models import User, UserProfile
+from tinggo import middleware, supabase, supabase_async
+from tinggo.supabase_stub import STUB_KEY, StubSupabase
+
+
+PASSWORD = 'benchmark-password-1'
+
+# (name, role logged in beforehand or None, max SQL queries per request)
+MICRO_BENCHMARKS = [
+    ('register_form', None, 0),
+    # Email check, user, profile and outbox rows, then login() saving the
+    # session and last_login
+    ('register', None, 11),
+    ('login_form', None, 0),
+    # User lookup, session insert, last_login, session update
+    ('login', None, 7),
+    # Session, user and profile come from the cache, the dashboard stats too
+    ('profile', User.UserRole.PARTICIPANT, 0),
+    ('admin_dashboard', User.UserRole.ADMIN, 0),
+]
+
+# Weights of the tasks a visitor runs during an event launch: mostly new
+# signups and returning users logging in, some browsing and typos
+EVENT_LAUNCH_MIX = {
+    'browse_home': 25,
+    'signup': 30,
+    'login': 30,
+    'failed_login': 5,
+    'view_profile': 10,
+}
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] if ordered else 0.0
+
+
+def summarize(timings_ms):
+    return {
+        'count': len(timings_ms),
+        'mean_ms': round(sum(timings_ms) / len(timings_ms), 2) if timings_ms else 0.0,
+        'p50_ms': round(percentile(timings_ms, 0.50), 2),
+        'p95_ms': round(percentile(timings_ms, 0.95), 2),
+        'max_ms': round(max(timings_ms, default=0.0), 2),
+    }
+
+
+class NoDelayRequestHandler(QuietWSGIRequestHandler):
+    # Without TCP_NODELAY, Nagle's algorithm and delayed ACKs add ~40 ms to
+    # every response on a kept-alive connection
+    disable_nagle_algorithm = True
+
+
+class BenchmarkServerThread(LiveServerThread):
+    """
+    Django's threaded test server. A thread serves each connection, so a
+    visitor's kept-alive connection reuses that thread's Supabase clients
+    like a gunicorn thread does.
+    """
+
+    def _create_server(self, connections_override=None):
+        return self.server_class(
+            (self.host, self.port),
+            NoDelayRequestHandler,
+            allow_reuse_address=False,
+            connections_override=connections_override,
+        )
+
+
+class ServerTimings:
+    """
+    Server-side duration and query count of the requests served, taken
+    from the instrumentation middleware (the Server-Timing header carries
+    no counts and is off by default)
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.last = None
+        self.record_request = middleware.record_request
+
+    def __call__(self, request, response, timings, total_ms):
+        with self.lock:
+            self.last = (total_ms, timings.counts['db'])
+        return self.record_request(request, response, timings, total_ms)
+
+
+class Visitor:
+    """
+    One browser: its own cookies, CSRF token and logged-in state
+    """
+
+    def __init__(self, base_url):
+        import httpx
+
+        self.http = httpx.Client(base_url=base_url, follow_redirects=False, timeout=60)
+        self.logged_in = False
+
+    def close(self):
+        self.http.close()
+
+    def get(self, url):
+        return self.http.get(url)
+
+    def post(self, url, data):
+        data['csrfmiddlewaretoken'] = self.http.cookies['csrftoken']
+        return self.http.post(url, data=data)
+
+    def expect(self, response, status):
+        if response.status_code != status:
+            raise RuntimeError(f'{response.request.method} {response.request.url.path}: '
+                               f'{response.status_code}, expected {status}')
+        return response
+
+    def signup(self):
+        url = reverse('accounts:register')
+        self.expect(self.get(url), 200)
+        response = self.expect(self.post(url, {
+            'email': f'signup-{uuid.uuid4().hex}@example.invalid',
+            'first_name': 'Bench',
+            'last_name': 'Mark',
+            'role': User.UserRole.PARTICIPANT,
+            'password1': PASSWORD,
+            'password2': PASSWORD,
+        }), 302)
+        self.logged_in = True
+        return response
+
+    def login(self, email, password=PASSWORD, status=302):
+        url = reverse('accounts:custom_login')
+        self.expect(self.get(url), 200)
+        response = self.expect(self.post(url, {'email': email, 'password': password}), status)
+        self.logged_in = status == 302
+        return response
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark register, login, profile and admin_dashboard against a live '
+        'local server with a stubbed Supabase, on a throwaway test database: '
+        'per-view timings and query counts, then a concurrent event-launch '
+        'mix of signups and logins. Compares with a JSON baseline.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=30, help='Requests per micro-benchmark')
+        parser.add_argument('--users', type=int, default=20, help='Concurrent visitors in the scenario')
+        parser.add_argument('--duration', type=float, default=20, help='Scenario length in seconds (0 skips it)')
+        parser.add_argument('--wait', type=float, nargs=2, default=(0.1, 0.5), metavar=('MIN', 'MAX'),
+                            help='Think time between a visitor\'s tasks in seconds')
+        parser.add_argument('--seed-users', type=int, default=500, help='Existing accounts to log in with')
+        parser.add_argument('--supabase-latency-ms', type=float, default=50,
+                            help='Latency of every stubbed Supabase call')
+        parser.add_argument('--output', help='Write the results JSON to this file')
+        parser.add_argument(
+            '--baseline',
+            default=str(settings.BASE_DIR / 'benchmark_accounts.json'),
+            help='Results JSON to compare against',
+        )
+        parser.add_argument('--save-baseline', action='store_true', help='Write the results to --baseline')
+        parser.add_argument('--tolerance', type=float, default=0.25,
+                            help='Allowed slowdown of p95 and throughput against the baseline (0.25 = 25%%)')
+        parser.add_argument('--max-error-rate', type=float, default=0.01,
+                            help='Allowed share of failed scenario tasks')
+
+    def handle(self, *args, **options):
+        if options['seed_users'] < options['iterations'] + 3:
+            raise CommandError('--seed-users must exceed --iterations (each login uses a new account)')
+        setup_test_environment()
+        with ExitStack() as stack:
+            if connection.vendor == 'sqlite':
+                # A file, not shared memory, so every server thread has its
+                # own connection as in production
+                directory = stack.enter_context(tempfile.TemporaryDirectory())
+                connection.settings_dict['TEST']['NAME'] = str(Path(directory) / 'benchmark.sqlite3')
+                # Concurrent sign-ups: take the write lock when a transaction
+                # starts and wait for it, instead of failing with "database
+                # is locked" when a read transaction cannot be upgraded
+                connection.settings_dict['OPTIONS'] = {
+                    **connection.settings_dict['OPTIONS'], 'transaction_mode': 'IMMEDIATE', 'timeout': 30,
+                }
+            old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+            stack.callback(teardown_test_environment)
+            stack.callback(connection.creation.destroy_test_db, old_name, verbosity=0)
+
+            stub = stack.enter_context(StubSupabase(options['supabase_latency_ms']))
+            stack.enter_context(mock.patch.multiple(supabase, SUPABASE_URL=stub.url, SUPABASE_KEY=STUB_KEY))
+            stack.enter_context(mock.patch.object(supabase_async, 'SUPABASE_URL', stub.url))
+            supabase._pool.reset()
+            stack.enter_context(override_settings(
+                DEBUG=False,
+                ALLOWED_HOSTS=['127.0.0.1'],
+                SECURE_SSL_REDIRECT=False,
+                SESSION_COOKIE_SECURE=False,
+                CSRF_COOKIE_SECURE=False,
+                SLOW_REQUEST_MS=float('inf'),
+                # No collectstatic manifest is needed for {% static %}
+                STORAGES={**settings.STORAGES, 'staticfiles': {
+                    'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage',
+                }},
+                # A private local cache keeps the run away from the shared cache.
+                # Every server thread is in this process and uses it, so it
+                # stands in for the shared cache production runs with: cached
+                # sessions and users, as the query limits expect.
+                CACHES={'default': {
+                    'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                    'LOCATION': 'benchmark_accounts',
+                }},
+                CACHE_IS_SHARED=True,
+                SESSION_ENGINE='django.contrib.sessions.backends.cached_db',
+            ))
+            stack.enter_context(translation.override('en'))
+            server_timings = ServerTimings()
+            stack.enter_context(mock.patch.object(middleware, 'record_request', server_timings))
+
+            server = BenchmarkServerThread('127.0.0.1', lambda handler: handler)
+            server.daemon = True
+            server.start()
+            server.is_ready.wait()
+            if server.error:
+                raise server.error
+            stack.callback(server.terminate)
+            base_url = f'http://127.0.0.1:{server.port}'
+
+            users = self.seed_users(options['seed_users'])
+            results = {
+                'settings': {
+                    'database': connection.vendor,
+                    'iterations': options['iterations'],
+                    'users': options['users'],
+                    'duration': options['duration'],
+                    'supabase_latency_ms': options['supabase_latency_ms'],
+                },
+                'views': self.run_micro_benchmarks(base_url, users, options['iterations'], server_timings),
+            }
+            if options['duration'] > 0:
+                results['scenario'] = self.run_scenario(base_url, users, options)
+            results['supabase_calls'] = stub.calls
+
+        self.report(results)
+        if options['output']:
+            Path(options['output']).write_text(json.dumps(results, indent=2) + '\n')
+            self.stdout.write(f'Results written to {options["output"]}')
+
+        failures = self.check_thresholds(results, options)
+        for failure in failures:
+            self.stderr.write(self.style.ERROR(f'❌ {failure}'))
+        if failures:
+            raise CommandError('Accounts benchmark regressed')
+        self.stdout.write(self.style.SUCCESS('✅ Within thresholds'))
+
+    def seed_users(self, count):
+        """
+        Existing participants to log in as, plus an admin, sharing one hash
+        """
+        password = make_password(PASSWORD)
+        users = User.objects.bulk_create([
+            User(email=f'user-{n}@example.invalid', password=password, role=User.UserRole.PARTICIPANT)
+            for n in range(count)
+        ] + [User(email='admin@example.invalid', password=password, role=User.UserRole.ADMIN)])
+        users = list(User.objects.order_by('pk'))
+        UserProfile.objects.bulk_create([UserProfile(user=user) for user in users])
+        return {
+            User.UserRole.ADMIN: users[-1],
+            User.UserRole.PARTICIPANT: users[:-1],
+        }
+
+    def run_micro_benchmarks(self, base_url, users, iterations, server_timings):
+        participants = iter(users[User.UserRole.PARTICIPANT])
+        results = {}
+        for name, role, max_queries in MICRO_BENCHMARKS:
+            visitor = Visitor(base_url)
+            if role == User.UserRole.ADMIN:
+                visitor.login(users[role].email)
+            elif role:
+                visitor.login(next(participants).email)
+
+            prepare = None
+            if name == 'register':
+                def prepare():
+                    # A new visitor for every sign-up
+                    visitor.http.cookies.clear()
+                    visitor.expect(visitor.get(reverse('accounts:register')), 200)
+
+                def request():
+                    return visitor.expect(visitor.post(reverse('accounts:register'), {
+                        'email': f'signup-{uuid.uuid4().hex}@example.invalid',
+                        'first_name': 'Bench',
+                        'last_name': 'Mark',
+                        'role': User.UserRole.PARTICIPANT,
+                        'password1': PASSWORD,
+                        'password2': PASSWORD,
+                    }), 302)
+            elif name == 'login':
+                def prepare():
+                    visitor.http.cookies.clear()
+                    visitor.expect(visitor.get(reverse('accounts:custom_login')), 200)
+
+                def request():
+                    # A different account each time, so Supabase is asked
+                    # instead of the verification cache
+                    return visitor.expect(visitor.post(reverse('accounts:custom_login'), {
+                        'email': next(participants).email,
+                        'password': PASSWORD,
+                    }), 302)
+            else:
+                url = reverse({
+                    'register_form': 'accounts:register',
+                    'login_form': 'accounts:custom_login',
+                    'profile': 'accounts:profile',
+                    'admin_dashboard': 'accounts:admin_dashboard',
+                }[name])
+
+                def request():
+                    return visitor.expect(visitor.get(url), 200)
+
+            # Warm-up fills the session, user and template caches
+            for _ in range(2):
+                if prepare:
+                    prepare()
+                request()
+            client_ms, server_ms, queries = [], [], []
+            for _ in range(iterations):
+                if prepare:
+                    prepare()
+                started = time.perf_counter()
+                request()
+                client_ms.append((time.perf_counter() - started) * 1000)
+                # The server records a request before sending its response
+                total_ms, query_count = server_timings.last
+                server_ms.append(total_ms)
+                queries.append(query_count)
+            visitor.close()
+
+            results[name] = {
+                **summarize(server_ms),
+                'client_p95_ms': round(percentile(client_ms, 0.95), 2),
+                'queries': max(queries),
+                'max_queries': max_queries,
+            }
+        return results
+
+    def run_scenario(self, base_url, users, options):
+        """
+        Locust-style run: virtual visitors pick weighted tasks with think
+        time in between until the duration is over
+        """
+        participants = users[User.UserRole.PARTICIPANT]
+        tasks, weights = zip(*EVENT_LAUNCH_MIX.items())
+        records = []
+        lock = threading.Lock()
+        deadline = time.monotonic() + options['duration']
+
+        def run_visitor(seed):
+            # The active language, used by reverse(), is per thread
+            translation.activate('en')
+            rng = random.Random(seed)
+            visitor = Visitor(base_url)
+            try:
+                while time.monotonic() < deadline:
+                    task = rng.choices(tasks, weights)[0]
+                    started = time.perf_counter()
+                    error = None
+                    try:
+                        self.run_task(visitor, task, rng.choice(participants).email)
+                    except Exception as e:
+                        error = str(e)
+                    elapsed_ms = (time.perf_counter() - started) * 1000
+                    with lock:
+                        records.append((task, elapsed_ms, error))
+                    time.sleep(rng.uniform(*options['wait']))
+            finally:
+                visitor.close()
+
+        threads = []
+        started = time.perf_counter()
+        for n in range(options['users']):
+            thread = threading.Thread(target=run_visitor, args=(n,))
+            thread.start()
+            threads.append(thread)
+            # Ramp up over the first second, as visitors arrive
+            time.sleep(1 / options['users'])
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        errors = [error for _, _, error in records if error]
+        return {
+            'tasks': {
+                task: {
+                    **summarize([ms for name, ms, error in records if name == task and not error]),
+                    'errors': sum(1 for name, _, error in records if name == task and error),
+                }
+                for task in tasks
+            },
+            'tasks_per_second': round(len(records) / elapsed, 2),
+            'error_rate': round(len(errors) / len(records), 4) if records else 0.0,
+            'sample_errors': sorted(set(errors))[:5],
+        }
+
+    def run_task(self, visitor, task, email):
+        if task == 'browse_home':
+            visitor.expect(visitor.get(reverse('home')), 200)
+        elif task == 'signup':
+            visitor.http.cookies.clear()
+            visitor.signup()
+        elif task == 'login':
+            visitor.http.cookies.clear()
+            visitor.login(email)
+        elif task == 'failed_login':
+            visitor.http.cookies.clear()
+            visitor.login(email, password='wrong-password', status=200)
+        elif task == 'view_profile':
+            if not visitor.logged_in:
+                visitor.login(email)
+            visitor.expect(visitor.get(reverse('accounts:profile')), 200)
+
+    def report(self, results):
+        self.stdout.write(f'{"view":<18}{"mean ms":>10}{"p50 ms":>10}{"p95 ms":>10}{"client p95":>12}{"queries":>9}')
+        for name, view in results['views'].items():
+            self.stdout.write(
+                f'{name:<18}{view["mean_ms"]:>10.1f}{view["p50_ms"]:>10.1f}{view["p95_ms"]:>10.1f}'
+                f'{view["client_p95_ms"]:>12.1f}{view["queries"]:>9}'
+            )
+        scenario = results.get('scenario')
+        if scenario:
+            self.stdout.write(f'\n{"task":<18}{"count":>8}{"errors":>8}{"p50 ms":>10}{"p95 ms":>10}')
+            for task, stats in scenario['tasks'].items():
+                self.stdout.write(
+                    f'{task:<18}{stats["count"]:>8}{stats["errors"]:>8}{stats["p50_ms"]:>10.1f}{stats["p95_ms"]:>10.1f}'
+                )
+            self.stdout.write(
+                f'{scenario["tasks_per_second"]} tasks/s, error rate {scenario["error_rate"]:.2%}, '
+                f'{results["supabase_calls"]} Supabase calls'
+            )
+
+    def check_thresholds(self, results, options):
+        failures = [
+            f'{name} ran {view["queries"]} queries, at most {view["max_queries"]} expected'
+            for name, view in results['views'].items()
+            if view['queries'] > view['max_queries']
+        ]
+        scenario = results.get('scenario')
+        if scenario and scenario['error_rate'] > options['max_error_rate']:
+            failures.append(f'scenario error rate {scenario["error_rate"]:.2%} '
+                            f'(e.g. {scenario["sample_errors"][:1]})')
+
+        baseline_path = Path(options['baseline'])
+        if options['save_baseline']:
+            baseline_path.write_text(json.dumps(results, indent=2) + '\n')
+            self.stdout.write(f'Baseline saved to {baseline_path}')
+            return failures
+        if not baseline_path.exists():
+            return failures
+
+        baseline = json.loads(baseline_path.read_text())
+        slower = 1 + options['tolerance']
+        for name, view in results['views'].items():
+            before = baseline['views'].get(name)
+            if not before:
+                continue
+            if view['p95_ms'] > before['p95_ms'] * slower:
+                failures.append(f'{name} p95 {view["p95_ms"]} ms, baseline {before["p95_ms"]} ms')
+            if view['queries'] > before['queries']:
+                failures.append(f'{name} runs {view["queries"]} queries, baseline {before["queries"]}')
+        if scenario and baseline.get('scenario'):
+            before = baseline['scenario']
+            if scenario['tasks_per_second'] < before['tasks_per_second'] / slower:
+                failures.append(f'scenario {scenario["tasks_per_second"]} tasks/s, '
+                                f'baseline {before["tasks_per_second"]}')
+            for task, stats in scenario['tasks'].items():
+                before_task = before['tasks'].get(task)
+                if before_task and before_task['count'] and stats['p95_ms'] > before_task['p95_ms'] * slower:
+                    failures.append(f'scenario {task} p95 {stats["p95_ms"]} ms, '
+                                    f'baseline {before_task["p95_ms"]} ms')
+        return failures
@@ -0,0 +1,76 @@
+import gettext as gettext_module
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand
+from django.template.loader import render_to_string
+from django.test import RequestFactory
+from django.utils import translation
+from django.utils.translation import trans_real
+
+from accounts.forms import CustomUserCreationForm
+from tinggo.translations import warm_translations
+
+
+def reset_translations():
+    gettext_module._translations = {}
+    trans_real._translations = {}
+    trans_real._default = None
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare per-language render times of the translated anonymous pages '
+        'with catalogs loaded lazily (first request) and preloaded at boot'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=200,
+            help='Renders per language for the steady-state average',
+        )
+
+    def pages(self, language):
+        request = RequestFactory().get(f'/{language}/')
+        request.user = AnonymousUser()
+        return [
+            ('home.html', {}, request),
+            ('accounts/custom_login.html', {}, request),
+            ('accounts/custom_password_reset.html', {}, request),
+            ('accounts/register.html', {'form': CustomUserCreationForm()}, request),
+        ]
+
+    def render_pages(self, language):
+        started = time.perf_counter()
+        with translation.override(language):
+            for template, context, request in self.pages(language):
+                render_to_string(template, context, request)
+        return (time.perf_counter() - started) * 1000
+
+    def handle(self, *args, **options):
+        languages = [code for code, _ in settings.LANGUAGES]
+        # Parse the templates first so only catalog loading differs below
+        for language in languages:
+            self.render_pages(language)
+
+        rows = []
+        for language in languages:
+            reset_translations()
+            lazy_first = self.render_pages(language)
+
+            reset_translations()
+            started = time.perf_counter()
+            warm_translations()
+            warm = (time.perf_counter() - started) * 1000
+            preloaded_first = self.render_pages(language)
+
+            steady = sum(self.render_pages(language) for _ in range(options['iterations'])) / options['iterations']
+            rows.append((language, lazy_first, preloaded_first, steady, warm))
+
+        self.stdout.write(f'{"lang":<6}{"lazy 1st ms":>14}{"preloaded 1st ms":>19}{"steady ms":>12}')
+        for language, lazy_first, preloaded_first, steady, _ in rows:
+            self.stdout.write(f'{language:<6}{lazy_first:>14.2f}{preloaded_first:>19.2f}{steady:>12.2f}')
+        self.stdout.write(f'Boot-time preload of all catalogs: {rows[-1][4]:.2f} ms (once per master process)')
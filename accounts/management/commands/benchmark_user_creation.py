@@ -0,0 +1,134 @@
+import json
+import os
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from accounts.models import User
+
+
+# PASSWORD_HASHER values and their hasher classes
+HASHERS = {
+    'pbkdf2': 'PBKDF2PasswordHasher',
+    'argon2': 'Argon2PasswordHasher',
+    'bcrypt': 'BCryptSHA256PasswordHasher',
+    'scrypt': 'ScryptPasswordHasher',
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure users created per second on a throwaway test database, one at a '
+        'time with create_user() and in bulk with bulk_create_users(), for each '
+        'password hasher (PASSWORD_HASHER) at the configured cost.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--hashers',
+            nargs='+',
+            choices=list(HASHERS),
+            default=list(HASHERS),
+            help='Hashers to measure (default: all with their library installed)',
+        )
+        parser.add_argument(
+            '--users',
+            type=int,
+            default=500,
+            help='Users created by bulk_create_users() per hasher',
+        )
+        parser.add_argument(
+            '--serial-users',
+            type=int,
+            default=10,
+            help='Users created one by one with create_user() per hasher',
+        )
+        parser.add_argument(
+            '--processes',
+            type=int,
+            default=os.cpu_count(),
+            help='Hashing processes for bulk_create_users()',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=100,
+            help='Users per bulk transaction',
+        )
+        parser.add_argument(
+            '--output',
+            help='Also write the results to this JSON file',
+        )
+
+    def password_hashers(self, name):
+        """PASSWORD_HASHERS with ``name`` first, as settings.py orders it"""
+        return sorted(settings.PASSWORD_HASHERS, key=lambda path: not path.endswith(f'.{HASHERS[name]}'))
+
+    def measure(self, name, options):
+        started = time.perf_counter()
+        for i in range(options['serial_users']):
+            User.objects.create_user(f'serial-{name}-{i}@example.invalid', f'password-{i}')
+        serial_elapsed = time.perf_counter() - started
+
+        rows = [
+            {'email': f'bulk-{name}-{i}@example.invalid', 'password': f'password-{i}',
+             'first_name': 'Bulk', 'last_name': f'User {i}', 'profile': {'business_name': f'Shop {i}'}}
+            for i in range(options['users'])
+        ]
+        started = time.perf_counter()
+        created = User.objects.bulk_create_users(rows, options['processes'], options['chunk_size'])
+        bulk_elapsed = time.perf_counter() - started
+
+        sample = User.objects.get(pk=created[-1].pk)
+        if not sample.check_password(f'password-{options["users"] - 1}'):
+            raise CommandError(f'{name}: bulk-created password does not verify')
+        return {
+            'algorithm': sample.password.split('$', 1)[0],
+            'serial_users_per_second': options['serial_users'] / serial_elapsed if serial_elapsed else 0,
+            'bulk_users_per_second': len(created) / bulk_elapsed if bulk_elapsed else 0,
+        }
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        results = {
+            'settings': {
+                'database': connection.vendor,
+                'users': options['users'],
+                'serial_users': options['serial_users'],
+                'processes': options['processes'],
+                'cpus': os.cpu_count(),
+            },
+            'hashers': {},
+        }
+        with ExitStack() as stack:
+            old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+            stack.callback(teardown_test_environment)
+            stack.callback(connection.creation.destroy_test_db, old_name, verbosity=0)
+            # Spawned hashing processes read the hasher from the environment
+            stack.callback(os.environ.__setitem__, 'PASSWORD_HASHER', settings.PASSWORD_HASHER)
+
+            for name in options['hashers']:
+                os.environ['PASSWORD_HASHER'] = name
+                with override_settings(PASSWORD_HASHER=name, PASSWORD_HASHERS=self.password_hashers(name)):
+                    try:
+                        # Fails if the hasher's library is not installed
+                        make_password('')
+                    except ValueError as error:
+                        self.stdout.write(self.style.WARNING(f'{name:8} skipped: {error}'))
+                        continue
+                    result = results['hashers'][name] = self.measure(name, options)
+                self.stdout.write(
+                    f'{name:8} {result["algorithm"]:16} '
+                    f'create_user {result["serial_users_per_second"]:8.1f}/s   '
+                    f'bulk_create_users {result["bulk_users_per_second"]:8.1f}/s'
+                )
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(results, f, indent=2)
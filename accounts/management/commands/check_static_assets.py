@@ -0,0 +1,57 @@
+import json
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        'Report the collected CSS and JS with their gzip and Brotli sizes '
+        '(build step, after collectstatic). Fails when a hashed file has no '
+        'compressed variants or the critical CSS is over budget.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--critical-budget-kb',
+            type=float,
+            default=14,
+            help='Max Brotli size of the critical CSS (it is inlined in every page; '
+                 '14 KB is the first TCP round trip)',
+        )
+
+    def handle(self, *args, **options):
+        root = Path(settings.STATIC_ROOT)
+        manifest_path = root / 'staticfiles.json'
+        if not manifest_path.exists():
+            raise CommandError(f'{manifest_path} not found, run collectstatic first')
+        paths = json.loads(manifest_path.read_text())['paths']
+
+        errors = []
+        self.stdout.write(f'{"file":<48}{"raw KB":>10}{"gzip KB":>10}{"br KB":>10}')
+        for name, hashed in sorted(paths.items()):
+            if not name.endswith(('.css', '.js')) or name.startswith('admin/'):
+                continue
+            file = root / hashed
+            sizes = [file.stat().st_size]
+            for suffix in ('.gz', '.br'):
+                variant = file.with_name(file.name + suffix)
+                if variant.exists():
+                    sizes.append(variant.stat().st_size)
+                else:
+                    sizes.append(None)
+                    errors.append(f'{hashed}{suffix} missing')
+            self.stdout.write(f'{name:<48}' + ''.join(
+                f'{size / 1024:>10.1f}' if size is not None else f'{"-":>10}' for size in sizes
+            ))
+            if name == settings.CRITICAL_CSS_PATH and sizes[2] is not None:
+                if sizes[2] > options['critical_budget_kb'] * 1024:
+                    errors.append(f'{name} is {sizes[2] / 1024:.1f} KB compressed, '
+                                  f'budget {options["critical_budget_kb"]} KB')
+
+        for error in errors:
+            self.stderr.write(self.style.ERROR(f'❌ {error}'))
+        if errors:
+            raise CommandError(f'{len(errors)} static asset errors')
+        self.stdout.write(self.style.SUCCESS('✅ Static assets fingerprinted and pre-compressed'))
@@ -0,0 +1,72 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.template import TemplateDoesNotExist, TemplateSyntaxError, engines
+from django.template.defaulttags import URLNode
+from django.template.loader_tags import ExtendsNode, IncludeNode
+from django.urls import NoReverseMatch, reverse
+from django.utils import translation
+
+from tinggo.templating import project_template_names
+
+
+def literal(expression):
+    """
+    Value of a FilterExpression that is a plain string literal, else None
+    """
+    if isinstance(expression.var, str) and not expression.filters:
+        return str(expression.var)
+    return None
+
+
+class Command(BaseCommand):
+    help = (
+        'Parse every template under templates/ and the project apps (build '
+        'step). Fails on syntax errors, unknown tags or filters, missing '
+        'extended/included templates and {% url %} names that do not reverse.'
+    )
+
+    def handle(self, *args, **options):
+        engine = engines['django'].engine
+        names = project_template_names()
+        errors = []
+
+        with translation.override('en'):
+            for name in names:
+                try:
+                    template = engine.get_template(name)
+                except (TemplateSyntaxError, TemplateDoesNotExist) as e:
+                    errors.append(f'{name}: {e}')
+                    continue
+                errors += [f'{name}: {error}' for error in self.check_references(engine, template)]
+
+        for error in errors:
+            self.stderr.write(self.style.ERROR(f'❌ {error}'))
+        if errors:
+            raise CommandError(f'{len(errors)} template errors')
+        self.stdout.write(self.style.SUCCESS(f'✅ {len(names)} templates OK'))
+
+    def check_references(self, engine, template):
+        for node in template.nodelist.get_nodes_by_type(ExtendsNode):
+            parent = literal(node.parent_name)
+            if parent is not None:
+                yield from self.check_exists(engine, parent, 'extends')
+        for node in template.nodelist.get_nodes_by_type(IncludeNode):
+            included = literal(node.template)
+            if included is not None:
+                yield from self.check_exists(engine, included, 'include')
+        for node in template.nodelist.get_nodes_by_type(URLNode):
+            view_name = literal(node.view_name)
+            # URLs with arguments need a context to reverse
+            if view_name is None or node.args or node.kwargs:
+                continue
+            try:
+                reverse(view_name)
+            except NoReverseMatch:
+                yield f'{{% url {view_name!r} %}} does not reverse'
+
+    def check_exists(self, engine, name, tag):
+        try:
+            engine.get_template(name)
+        except TemplateDoesNotExist:
+            yield f'{{% {tag} {name!r} %}}: template not found'
+        except TemplateSyntaxError as e:
+            yield f'{{% {tag} {name!r} %}}: {e}'
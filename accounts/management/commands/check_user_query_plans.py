@@ -0,0 +1,155 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from accounts.models import User, normalize_search_text
+from accounts.search import FTS_TABLE, PG_INDEX, contains_words, search_users, search_words
+
+
+SEED_COLUMNS = (
+    'password', 'is_superuser', 'first_name', 'last_name', 'is_staff', 'date_joined',
+    'email', 'phone', 'role', 'is_verified', 'is_active', 'bio', 'country', 'city',
+    'language', 'created_at', 'updated_at', 'avatar_renditions', 'search_text',
+    'password_sync_pending',
+)
+LANGUAGES = ('en', 'es', 'ht')
+# Admin search terms: a fragment, a full name and a typo
+SEARCH_QUERIES = ('user 4242', 'seed-99999@', 'sede usr 12345')
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed synthetic users inside a rolled-back transaction and check that '
+        'the User access patterns use the expected indexes. Run against a '
+        'development database: seeding holds write locks while it runs.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--users',
+            type=int,
+            default=1_000_000,
+            help='Number of synthetic users to seed',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=10_000,
+            help='Rows per INSERT batch',
+        )
+        parser.add_argument(
+            '--search-budget-ms',
+            type=float,
+            default=50,
+            help='Maximum time for one user search (search_users)',
+        )
+        parser.add_argument(
+            '--verbose-plans',
+            action='store_true',
+            help='Print the full plan of every query',
+        )
+
+    def access_patterns(self):
+        """
+        (description, queryset, expected index) for each query the app runs
+        """
+        since = timezone.now() - timedelta(days=1)
+        search_index = PG_INDEX if connection.vendor == 'postgresql' else FTS_TABLE
+        return [
+            ('recent users (dashboard, admin default ordering)',
+             User.objects.order_by('-created_at')[:10], 'user_created_idx'),
+            ('users of a role, newest first (dashboards, admin role filter)',
+             User.objects.filter(role=User.UserRole.ORGANIZER).order_by('-created_at')[:100],
+             'user_role_created_idx'),
+            ('deactivated users of a role (admin is_active + role filters)',
+             User.objects.filter(is_active=False, role=User.UserRole.VENDOR).values('pk'),
+             'user_inactive_role_idx'),
+            ('admin is_verified filter',
+             User.objects.filter(is_verified=True).order_by('-created_at')[:100],
+             'user_verified_created_idx'),
+            ('admin language filter',
+             User.objects.filter(language='ht').order_by('-created_at')[:100],
+             'user_language_created_idx'),
+            ('admin changelist page deep in the table (keyset cursor)',
+             User.objects.filter(Q(created_at__lt=since) | Q(created_at=since, id__lt=1000))
+             .order_by('-created_at', '-pk')[:101],
+             'user_created_idx'),
+            ('users created since the last rollup',
+             User.objects.filter(created_at__gte=since).values('pk'),
+             'user_created_idx'),
+            ('admin user search',
+             User.objects.filter(contains_words(search_words('user 4242'))).values('pk'),
+             search_index),
+        ]
+
+    def seed(self, total, batch_size):
+        roles = User.UserRole.values
+        now = timezone.now()
+        columns = ', '.join(connection.ops.quote_name(column) for column in SEED_COLUMNS)
+        placeholders = ', '.join(['%s'] * len(SEED_COLUMNS))
+        sql = f'INSERT INTO {connection.ops.quote_name(User._meta.db_table)} ({columns}) VALUES ({placeholders})'
+
+        with connection.cursor() as cursor:
+            for start in range(0, total, batch_size):
+                rows = []
+                for i in range(start, min(start + batch_size, total)):
+                    # Spread signups over ~3 years, newest first
+                    created = now - timedelta(minutes=i)
+                    rows.append((
+                        '!', False, 'Seed', f'User {i}', False, created,
+                        f'seed-{i}@example.invalid', '', roles[i % len(roles)],
+                        # ~5% verified, ~2% deactivated
+                        i % 20 == 0, i % 50 != 7, '', '', '',
+                        LANGUAGES[i % len(LANGUAGES)], created, created, '{}',
+                        normalize_search_text(f'seed-{i}@example.invalid', 'Seed', f'User {i}'),
+                        False,
+                    ))
+                cursor.executemany(sql, rows)
+            # Refresh planner statistics for the seeded data
+            cursor.execute(f'ANALYZE {connection.ops.quote_name(User._meta.db_table)}')
+
+    def handle(self, *args, **options):
+        failures = []
+        try:
+            with transaction.atomic():
+                started = time.perf_counter()
+                self.seed(options['users'], options['batch_size'])
+                self.stdout.write(f'Seeded {options["users"]} users in {time.perf_counter() - started:.1f}s')
+
+                for description, queryset, index in self.access_patterns():
+                    plan = queryset.explain()
+                    if options['verbose_plans']:
+                        self.stdout.write(plan)
+                    if index in plan:
+                        self.stdout.write(self.style.SUCCESS(f'OK    {description}: {index}'))
+                    else:
+                        failures.append(description)
+                        self.stdout.write(self.style.ERROR(f'FAIL  {description}: expected {index}'))
+                        self.stdout.write(plan)
+
+                for query in SEARCH_QUERIES:
+                    started = time.perf_counter()
+                    results = search_users(query)
+                    elapsed = (time.perf_counter() - started) * 1000
+                    label = f'search {query!r}: {len(results)} results in {elapsed:.1f} ms'
+                    if elapsed <= options['search_budget_ms']:
+                        self.stdout.write(self.style.SUCCESS(f'OK    {label}'))
+                    else:
+                        failures.append(f'search {query!r}')
+                        self.stdout.write(self.style.ERROR(
+                            f'FAIL  {label}, budget {options["search_budget_ms"]:.0f} ms'
+                        ))
+                raise Rollback
+        except Rollback:
+            pass
+
+        if failures:
+            raise CommandError(f'{len(failures)} queries do not use their index or are over budget')
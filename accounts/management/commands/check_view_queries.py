@@ -0,0 +1,92 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext, setup_test_environment, teardown_test_environment
+from django.urls import reverse
+from django.utils import translation
+
+from accounts.models import User, UserProfile
+
+
+# (url name in accounts/urls.py or namespaced, role of the logged-in user or None for an
+# anonymous visitor, expected queries once the session, user and dashboard
+# stats are cached)
+VIEW_QUERIES = [
+    ('register', None, 0),
+    ('custom_login', None, 0),
+    ('custom_password_reset', None, 0),
+    # Deletes the session row, then checks the new session key is unused
+    ('custom_logout', User.UserRole.PARTICIPANT, 2),
+    ('profile', User.UserRole.PARTICIPANT, 0),
+    ('dashboard', User.UserRole.PARTICIPANT, 0),
+    ('admin_dashboard', User.UserRole.ADMIN, 0),
+    ('organizer_dashboard', User.UserRole.ORGANIZER, 0),
+    ('participant_dashboard', User.UserRole.PARTICIPANT, 0),
+    # Without ?q= the search endpoint does not query
+    ('user_search', User.UserRole.ADMIN, 0),
+    ('events:feed', User.UserRole.PARTICIPANT, 0),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Request every view in accounts/urls.py on a throwaway test database '
+        'and check the exact number of SQL queries each one runs.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verbose-queries',
+            action='store_true',
+            help='Print the SQL of every measured request',
+        )
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            # A private local cache keeps the run away from the shared cache;
+            # in this one process it stands in for it, so the counts are
+            # those of a deploy with a shared CACHE_URL
+            with override_settings(CACHES={'default': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                'LOCATION': 'check_view_queries',
+            }}, CACHE_IS_SHARED=True,
+                SESSION_ENGINE='django.contrib.sessions.backends.cached_db',
+            ), translation.override('en'):
+                failures = self.check_views(options['verbose_queries'])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        if failures:
+            raise CommandError(f'{len(failures)} views ran an unexpected number of queries')
+
+    def check_views(self, verbose):
+        users = {}
+        for role in (User.UserRole.ADMIN, User.UserRole.ORGANIZER, User.UserRole.PARTICIPANT):
+            users[role] = User.objects.create_user(email=f'{role}@example.invalid', password='!', role=role)
+            UserProfile.objects.create(user=users[role])
+
+        failures = []
+        for name, role, expected in VIEW_QUERIES:
+            url = reverse(name if ':' in name else f'accounts:{name}')
+            client = Client()
+            if role:
+                client.force_login(users[role])
+            # A first request fills the caches (logout would end the session)
+            client.get(reverse('home') if name == 'custom_logout' else url)
+
+            with CaptureQueriesContext(connection) as queries:
+                response = client.get(url)
+
+            label = f'{name} ({role or "anonymous"}): {len(queries)} queries, status {response.status_code}'
+            if len(queries) == expected:
+                self.stdout.write(self.style.SUCCESS(f'OK    {label}'))
+            else:
+                failures.append(name)
+                self.stdout.write(self.style.ERROR(f'FAIL  {label}, expected {expected}'))
+            if verbose or len(queries) != expected:
+                for query in queries.captured_queries:
+                    self.stdout.write(f'      {query["sql"]}')
+        return failures
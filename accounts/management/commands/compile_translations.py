@@ -0,0 +1,179 @@
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+
+import polib
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+# Per locale directory: .po path -> hashes of the .po and of the .mo built from it
+MANIFEST_NAME = '.compiled.json'
+
+
+def file_hash(path):
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+
+def compile_catalog(po_path, allow_fuzzy=False, allow_missing=False):
+    """
+    Check and compile one .po file. Runs in a worker process.
+
+    Returns (po_path, mo_hash, errors); nothing is written when there are errors.
+    """
+    po = polib.pofile(po_path)
+    errors = []
+    if not allow_fuzzy:
+        errors += [f'fuzzy: {entry.msgid!r} (line {entry.linenum})' for entry in po.fuzzy_entries()]
+    if not allow_missing:
+        errors += [f'missing: {entry.msgid!r} (line {entry.linenum})' for entry in po.untranslated_entries()]
+    if errors:
+        return po_path, None, errors
+
+    mo_path = Path(po_path).with_suffix('.mo')
+    # Write next to the target and swap, so a running server never reads half a file
+    tmp_path = mo_path.with_suffix('.mo.tmp')
+    po.save_as_mofile(str(tmp_path))
+    os.replace(tmp_path, mo_path)
+    return po_path, file_hash(mo_path), []
+
+
+class Command(BaseCommand):
+    help = (
+        'Compile changed .po files to .mo in parallel. Catalogs whose .po and '
+        '.mo match the hashes from the previous run are skipped; fuzzy or '
+        'untranslated entries fail the build.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--jobs',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Worker processes',
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Recompile every catalog',
+        )
+        parser.add_argument(
+            '--allow-fuzzy',
+            action='store_true',
+            help='Compile catalogs with fuzzy entries (they are left out of the .mo)',
+        )
+        parser.add_argument(
+            '--allow-missing',
+            action='store_true',
+            help='Compile catalogs with untranslated entries',
+        )
+        parser.add_argument(
+            '--json',
+            action='store_true',
+            help='Print only a JSON summary',
+        )
+
+    def locale_dirs(self):
+        """
+        LOCALE_PATHS plus the locale directories of project apps
+        """
+        dirs = [Path(path) for path in settings.LOCALE_PATHS]
+        for app_config in apps.get_app_configs():
+            path = Path(app_config.path) / 'locale'
+            if path.is_relative_to(settings.BASE_DIR) and path.is_dir():
+                dirs.append(path)
+        return list(dict.fromkeys(path.resolve() for path in dirs if path.is_dir()))
+
+    def load_manifest(self, locale_dir):
+        try:
+            return json.loads((locale_dir / MANIFEST_NAME).read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def is_up_to_date(self, po_path, entry):
+        mo_path = po_path.with_suffix('.mo')
+        return (
+            entry is not None
+            and mo_path.exists()
+            and entry['po'] == file_hash(po_path)
+            and entry['mo'] == file_hash(mo_path)
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        summary = {'compiled': [], 'skipped': [], 'failed': {}}
+        manifests = {}
+        pending = []
+
+        for locale_dir in self.locale_dirs():
+            manifest = manifests[locale_dir] = self.load_manifest(locale_dir)
+            for po_path in sorted(locale_dir.glob('*/LC_MESSAGES/*.po')):
+                key = str(po_path.relative_to(locale_dir))
+                if not options['force'] and self.is_up_to_date(po_path, manifest.get(key)):
+                    summary['skipped'].append(str(po_path))
+                else:
+                    pending.append((locale_dir, key, po_path))
+
+        results = self.compile(pending, options)
+        for locale_dir, key, po_path in pending:
+            mo_hash, errors = results.get(str(po_path), (None, ['not compiled, an earlier catalog failed']))
+            if errors:
+                summary['failed'][str(po_path)] = errors
+            else:
+                manifests[locale_dir][key] = {'po': file_hash(po_path), 'mo': mo_hash}
+                summary['compiled'].append(str(po_path))
+
+        for locale_dir, manifest in manifests.items():
+            if manifest:
+                (locale_dir / MANIFEST_NAME).write_text(json.dumps(manifest, indent=2, sort_keys=True))
+
+        summary['seconds'] = round(time.perf_counter() - started, 3)
+        self.report(summary, options['json'])
+        if summary['failed']:
+            raise CommandError(f'{len(summary["failed"])} catalogs have fuzzy or missing translations')
+
+    def compile(self, pending, options):
+        """
+        Compile catalogs, stopping at the first one with errors
+        """
+        args = (options['allow_fuzzy'], options['allow_missing'])
+        results = {}
+        if len(pending) <= 1 or options['jobs'] <= 1:
+            for _, _, po_path in pending:
+                po, mo_hash, errors = compile_catalog(str(po_path), *args)
+                results[po] = (mo_hash, errors)
+                if errors:
+                    break
+            return results
+
+        with ProcessPoolExecutor(max_workers=min(options['jobs'], len(pending))) as executor:
+            futures = {executor.submit(compile_catalog, str(po_path), *args) for _, _, po_path in pending}
+            while futures:
+                finished, futures = wait(futures, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    po, mo_hash, errors = future.result()
+                    results[po] = (mo_hash, errors)
+                    if errors:
+                        for queued in futures:
+                            queued.cancel()
+                        futures = set()
+        return results
+
+    def report(self, summary, as_json):
+        if as_json:
+            self.stdout.write(json.dumps(summary, indent=2))
+            return
+        for po_path in summary['compiled']:
+            self.stdout.write(self.style.SUCCESS(f'✅ Compiled {po_path}'))
+        for po_path, errors in summary['failed'].items():
+            self.stderr.write(self.style.ERROR(f'❌ {po_path}'))
+            for error in errors:
+                self.stderr.write(f'   {error}')
+        self.stdout.write(
+            f'📊 {len(summary["compiled"])} compiled, {len(summary["skipped"])} up to date, '
+            f'{len(summary["failed"])} failed in {summary["seconds"]}s'
+        )
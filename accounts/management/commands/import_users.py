@@ -0,0 +1,160 @@
+import csv
+import io
+import json
+import os
+import sys
+import time
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.bulk import (
+    FILE_FORMATS, IMPORT_FIELDS, clean_import_row, create_auth_users, create_users_in_chunks, file_format,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Import users with their profiles from a CSV or JSON Lines file, streamed in '
+        'chunks: each chunk is validated, its passwords hashed in a process pool and '
+        'its rows bulk-inserted in one transaction. Existing emails are skipped; rows '
+        'without a password get an unusable one (users set it with a password reset). '
+        'With AUTH_AUTHORITY=supabase the users are also created in Supabase Auth '
+        '(needs SUPABASE_SERVICE_KEY), which decides their logins.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='File to import, - for stdin')
+        parser.add_argument(
+            '--format',
+            choices=FILE_FORMATS,
+            help='File format (default: from the extension, .jsonl/.ndjson or csv)',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=2000,
+            help='Rows per transaction',
+        )
+        parser.add_argument(
+            '--processes',
+            type=int,
+            default=os.cpu_count(),
+            help='Password hashing processes (0: hash in this process)',
+        )
+        parser.add_argument(
+            '--sync-supabase',
+            action='store_true',
+            help='Queue a Supabase user_profiles sync for every created user',
+        )
+        parser.add_argument(
+            '--auth-threads',
+            type=int,
+            default=8,
+            help='Concurrent Supabase Auth admin requests',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only validate the file',
+        )
+        parser.add_argument(
+            '--max-errors',
+            type=int,
+            default=100,
+            help='Stop after this many invalid rows',
+        )
+
+    def read_rows(self, stream, fmt):
+        """(line number, dict) for every row of ``stream``"""
+        if fmt == 'csv':
+            reader = csv.DictReader(stream)
+            unknown = set(reader.fieldnames or ()) - set(IMPORT_FIELDS)
+            if unknown:
+                self.stderr.write(f'Ignoring columns: {", ".join(sorted(unknown))}')
+            for row in reader:
+                yield reader.line_num, row
+        else:
+            for line_number, line in enumerate(stream, 1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError as error:
+                    row = error
+                yield line_number, row if isinstance(row, dict) else ValueError('not a JSON object')
+
+    def valid_chunks(self, rows, chunk_size, max_errors):
+        """Lists of cleaned rows, reporting invalid ones on stderr"""
+        chunk = []
+        for line_number, row in rows:
+            self.total += 1
+            try:
+                if isinstance(row, Exception):
+                    raise ValidationError(str(row))
+                chunk.append(clean_import_row(row))
+            except ValidationError as error:
+                self.invalid += 1
+                messages = (
+                    '; '.join(f'{name}: {" ".join(errors)}' for name, errors in error.message_dict.items())
+                    if hasattr(error, 'error_dict') else ' '.join(error.messages)
+                )
+                self.stderr.write(f'line {line_number}: {messages}')
+                if self.invalid >= max_errors:
+                    raise CommandError(f'Stopped after {self.invalid} invalid rows')
+                continue
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def handle(self, *args, **options):
+        fmt = file_format(options['path'], options['format'])
+        if options['path'] == '-':
+            # utf-8-sig drops the byte order mark spreadsheet exports start with
+            stream = io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8-sig', newline='')
+        else:
+            try:
+                stream = open(options['path'], encoding='utf-8-sig', newline='')
+            except OSError as error:
+                raise CommandError(error)
+
+        # Without a Supabase Auth account the users could not log in
+        auth_users = settings.AUTH_AUTHORITY == 'supabase' and not options['dry_run']
+        if auth_users and not settings.SUPABASE_SERVICE_KEY:
+            raise CommandError(
+                'AUTH_AUTHORITY is supabase: set SUPABASE_SERVICE_KEY to create the Supabase Auth users'
+            )
+
+        self.total = self.invalid = self.created = self.skipped = self.auth_failed = 0
+        started = time.perf_counter()
+        chunks = self.valid_chunks(self.read_rows(stream, fmt), options['chunk_size'], options['max_errors'])
+        with stream:
+            if options['dry_run']:
+                for chunk in chunks:
+                    pass
+                self.stdout.write(f'{self.total} rows, {self.invalid} invalid')
+                return
+
+            for chunk, users in create_users_in_chunks(chunks, options['processes'], options['sync_supabase']):
+                self.created += len(users)
+                self.skipped += len(chunk) - len(users)
+                if auth_users:
+                    passwords = {user_fields['email']: password for user_fields, _, password in chunk}
+                    failed = create_auth_users(users, passwords, options['auth_threads'])
+                    for email, error in failed.items():
+                        self.stderr.write(f'{email}: no Supabase Auth user created: {error}')
+                    self.auth_failed += len(failed)
+                if options['verbosity'] > 1:
+                    self.stdout.write(f'{self.total} rows read, {self.created} users created')
+
+        elapsed = time.perf_counter() - started
+        style = self.style.SUCCESS if not self.invalid and not self.auth_failed else self.style.WARNING
+        self.stdout.write(style(
+            f'Created {self.created} users from {self.total} rows in {elapsed:.1f}s '
+            f'({self.created / elapsed if elapsed else 0:.0f}/s): '
+            f'{self.skipped} existing or repeated emails skipped, {self.invalid} invalid rows'
+            + (f', {self.auth_failed} without a Supabase Auth user' if self.auth_failed else '')
+        ))
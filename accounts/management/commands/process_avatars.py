@@ -0,0 +1,122 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from PIL import Image, UnidentifiedImageError
+
+from accounts.avatars import delete_avatar_files, process_avatar, queue_avatar_processing
+from accounts.models import AvatarJob, User
+
+
+# Seconds a claimed job stays hidden from other workers
+AVATAR_JOB_LEASE = 300
+AVATAR_RETRY_DELAY = 30
+AVATAR_RETRY_MAX_DELAY = 3600
+# Attempts before a job is marked failed (about 2 hours of retries)
+AVATAR_MAX_ATTEMPTS = 8
+# Retrying cannot fix a broken, oversized or deleted upload
+UNRECOVERABLE_ERRORS = (UnidentifiedImageError, Image.DecompressionBombError, FileNotFoundError)
+
+
+class Command(BaseCommand):
+    help = 'Resize uploaded avatars into WebP/JPEG renditions (background worker)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=20,
+            help='Jobs claimed per batch',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep running and poll for new jobs',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5,
+            help='Seconds to wait when there are no jobs (with --loop)',
+        )
+        parser.add_argument(
+            '--backfill',
+            action='store_true',
+            help='First queue every user whose avatar has no renditions yet',
+        )
+
+    def handle(self, *args, **options):
+        if options['backfill']:
+            users = User.objects.exclude(avatar='').exclude(avatar=None).filter(avatar_renditions={})
+            for user in users.only('pk', 'avatar').iterator():
+                queue_avatar_processing(user)
+            self.stdout.write(f'Queued {users.count()} avatars')
+
+        try:
+            while True:
+                processed = self.process_batch(options['batch_size'])
+                if processed:
+                    continue
+                if not options['loop']:
+                    break
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+
+    def claim_batch(self, batch_size):
+        """
+        Lock due jobs and push their next attempt past the lease so that
+        concurrent workers skip them
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            jobs = list(
+                AvatarJob.objects.select_for_update(skip_locked=True)
+                .filter(next_attempt_at__lte=now, failed_at=None)
+                .order_by('pk')[:batch_size]
+            )
+            if jobs:
+                AvatarJob.objects.filter(pk__in=[job.pk for job in jobs]).update(
+                    next_attempt_at=now + timedelta(seconds=AVATAR_JOB_LEASE),
+                )
+        return jobs
+
+    def process_batch(self, batch_size):
+        jobs = self.claim_batch(batch_size)
+        done = []
+        for job in jobs:
+            try:
+                processed = process_avatar(job.user_id, job.source) if job.source else False
+            except Exception as e:
+                if not isinstance(e, UNRECOVERABLE_ERRORS) and job.attempts + 1 < AVATAR_MAX_ATTEMPTS:
+                    self.retry_later(job, e)
+                    continue
+                self.fail(job, e)
+            else:
+                done.append(job)
+                self.stdout.write(f'{"Processed" if processed else "Skipped stale"} {job}')
+            # The replaced avatar is gone whether or not the new one worked
+            try:
+                delete_avatar_files(job.user_id, job.obsolete)
+            except Exception as e:
+                self.stderr.write(self.style.WARNING(f'Could not delete replaced files of {job}: {e}'))
+
+        AvatarJob.objects.filter(pk__in=[job.pk for job in done]).delete()
+        return len(jobs)
+
+    def retry_later(self, job, error):
+        job.attempts += 1
+        delay = min(AVATAR_RETRY_DELAY * 2 ** (job.attempts - 1), AVATAR_RETRY_MAX_DELAY)
+        job.next_attempt_at = timezone.now() + timedelta(seconds=delay)
+        job.last_error = str(error)[:1000]
+        job.save(update_fields=['attempts', 'next_attempt_at', 'last_error'])
+        self.stderr.write(self.style.WARNING(f'Failed to process {job}: {error}'))
+
+    def fail(self, job, error):
+        job.attempts += 1
+        job.failed_at = timezone.now()
+        job.last_error = str(error)[:1000]
+        job.save(update_fields=['attempts', 'failed_at', 'last_error'])
+        self.stderr.write(self.style.ERROR(f'Giving up on {job}: {error}'))
@@ -0,0 +1,122 @@
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from accounts.models import User, SupabaseOutbox
+from tinggo.config import (
+    SUPABASE_OUTBOX_BATCH_SIZE,
+    SUPABASE_OUTBOX_LEASE,
+    SUPABASE_OUTBOX_RETRY_DELAY,
+    SUPABASE_OUTBOX_RETRY_MAX_DELAY,
+)
+from tinggo.supabase import build_user_profile_data, upsert_user_profiles
+
+
+class Command(BaseCommand):
+    help = 'Push pending user profile changes from the outbox to Supabase'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=SUPABASE_OUTBOX_BATCH_SIZE,
+            help='Outbox entries claimed per batch',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep running and poll for new entries',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5,
+            help='Seconds to wait when the outbox is empty (with --loop)',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            while True:
+                processed = self.process_batch(options['batch_size'])
+                if processed:
+                    continue
+                if not options['loop']:
+                    break
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+
+    def claim_batch(self, batch_size):
+        """
+        Lock due entries and push their next attempt past the lease so that
+        concurrent workers skip them
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            entries = list(
+                SupabaseOutbox.objects.select_for_update(skip_locked=True)
+                .filter(next_attempt_at__lte=now)
+                .order_by('pk')[:batch_size]
+            )
+            if entries:
+                SupabaseOutbox.objects.filter(pk__in=[entry.pk for entry in entries]).update(
+                    next_attempt_at=now + timedelta(seconds=SUPABASE_OUTBOX_LEASE),
+                )
+        return entries
+
+    def process_batch(self, batch_size):
+        entries = self.claim_batch(batch_size)
+        if not entries:
+            return 0
+
+        # Coalesce repeated updates: one row per user with the union of fields
+        pending = {}
+        for entry in entries:
+            user_entries, fields = pending.get(entry.user_id, ([], set()))
+            user_entries.append(entry)
+            if fields is not None:
+                fields = None if entry.fields is None else fields | set(entry.fields)
+            pending[entry.user_id] = (user_entries, fields)
+
+        users = User.objects.in_bulk(list(pending))
+        done = []
+        # Upserts need identical keys within a request, so group by column set
+        groups = defaultdict(list)
+        for user_id, (user_entries, fields) in pending.items():
+            user = users.get(user_id)
+            if user is None:
+                # User deleted since the change was queued, nothing to push
+                done.extend(user_entries)
+                continue
+            row = build_user_profile_data(user, fields)
+            groups[tuple(sorted(row))].append((user_entries, row))
+
+        for group in groups.values():
+            group_entries = [entry for user_entries, _ in group for entry in user_entries]
+            try:
+                upsert_user_profiles([row for _, row in group])
+            except Exception as e:
+                self.retry_later(group_entries, e)
+            else:
+                done.extend(group_entries)
+
+        SupabaseOutbox.objects.filter(pk__in=[entry.pk for entry in done]).delete()
+        self.stdout.write(f'Synced {len(done)}/{len(entries)} outbox entries for {len(pending)} users')
+        return len(entries)
+
+    def retry_later(self, entries, error):
+        now = timezone.now()
+        for entry in entries:
+            entry.attempts += 1
+            delay = min(
+                SUPABASE_OUTBOX_RETRY_DELAY * 2 ** (entry.attempts - 1),
+                SUPABASE_OUTBOX_RETRY_MAX_DELAY,
+            )
+            entry.next_attempt_at = now + timedelta(seconds=delay)
+            entry.last_error = str(error)[:1000]
+        SupabaseOutbox.objects.bulk_update(entries, ['attempts', 'next_attempt_at', 'last_error'])
+        self.stderr.write(self.style.WARNING(f'Failed to sync {len(entries)} outbox entries: {error}'))
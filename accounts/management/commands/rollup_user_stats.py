@@ -0,0 +1,51 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from accounts.models import User, UserDailyRollup
+from accounts.stats import clear_user_stats_cache, count_users_by_role, day_bounds
+
+
+class Command(BaseCommand):
+    help = 'Write per-role daily user counts used by the admin dashboard (run daily)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--date',
+            help='Last day to roll up (YYYY-MM-DD), defaults to yesterday',
+        )
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=1,
+            help='Number of days to roll up, ending at --date',
+        )
+
+    def handle(self, *args, **options):
+        if options['date']:
+            try:
+                end_date = date.fromisoformat(options['date'])
+            except ValueError:
+                raise CommandError('Invalid --date, expected YYYY-MM-DD')
+        else:
+            end_date = timezone.localdate() - timedelta(days=1)
+
+        for offset in range(options['days'] - 1, -1, -1):
+            day = end_date - timedelta(days=offset)
+            start, end = day_bounds(day)
+            new_users = count_users_by_role(User.objects.filter(created_at__gte=start, created_at__lt=end))
+            total_users = count_users_by_role(User.objects.filter(created_at__lt=end))
+
+            for role in User.UserRole.values:
+                UserDailyRollup.objects.update_or_create(
+                    date=day,
+                    role=role,
+                    defaults={
+                        'new_users': new_users[role],
+                        'total_users': total_users[role],
+                    },
+                )
+            self.stdout.write(f'{day}: {new_users["total"]} new, {total_users["total"]} total')
+
+        clear_user_stats_cache()
@@ -0,0 +1,125 @@
+import json
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+# What a cold serverless instance runs before answering its first request
+STARTUP_CODE = (
+    'import tinggo.wsgi\n'
+    'from django.urls import get_resolver\n'
+    'get_resolver().url_patterns\n'
+)
+# Heavy packages only some requests need; importing them at startup is a regression
+FORBIDDEN_AT_STARTUP = ('supabase', 'gotrue', 'postgrest', 'httpx', 'PIL', 'tailwind', 'django_extensions')
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure import time of a cold WSGI start (tinggo.wsgi plus the URLconf) '
+        'in a fresh interpreter, per package. Fails when a lazily imported '
+        'package is loaded at startup or the total regresses past the baseline.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--runs',
+            type=int,
+            default=3,
+            help='Fresh interpreters to start; the fastest time per module is kept',
+        )
+        parser.add_argument(
+            '--top',
+            type=int,
+            default=15,
+            help='Packages to list',
+        )
+        parser.add_argument(
+            '--baseline',
+            default=str(settings.BASE_DIR / 'startup_profile.json'),
+            help='JSON file with the total import time to compare against',
+        )
+        parser.add_argument(
+            '--save-baseline',
+            action='store_true',
+            help='Write the measured total to --baseline',
+        )
+        parser.add_argument(
+            '--tolerance',
+            type=float,
+            default=0.25,
+            help='Allowed slowdown over the baseline (0.25 = 25%%)',
+        )
+        parser.add_argument(
+            '--production',
+            action='store_true',
+            help='Profile with DEBUG=False, as deployed',
+        )
+
+    def measure(self, production):
+        """
+        {module: (self_us, cumulative_us, is_top_level)} for one cold start
+        """
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE='tinggo.settings')
+        if production:
+            env['DEBUG'] = 'False'
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', STARTUP_CODE],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+        )
+        if result.returncode:
+            raise CommandError(f'Startup failed:\n{result.stderr[-2000:]}')
+
+        modules = {}
+        for line in result.stderr.splitlines():
+            match = IMPORTTIME_LINE.match(line)
+            if match:
+                self_us, cumulative_us, indent, module = match.groups()
+                modules[module] = (int(self_us), int(cumulative_us), len(indent) == 1)
+        return modules
+
+    def handle(self, *args, **options):
+        runs = [self.measure(options['production']) for _ in range(max(1, options['runs']))]
+        modules = {}
+        for module, (_, _, top_level) in runs[0].items():
+            timings = [run[module] for run in runs if module in run]
+            modules[module] = (min(t[0] for t in timings), min(t[1] for t in timings), top_level)
+
+        packages = defaultdict(int)
+        for module, (self_us, _, _) in modules.items():
+            packages[module.split('.')[0]] += self_us
+        total_ms = sum(cumulative for _, cumulative, top_level in modules.values() if top_level) / 1000
+
+        self.stdout.write(f'{"package":<32}{"ms":>10}')
+        for package, self_us in sorted(packages.items(), key=lambda item: -item[1])[:options['top']]:
+            self.stdout.write(f'{package:<32}{self_us / 1000:>10.1f}')
+        self.stdout.write(f'{"total":<32}{total_ms:>10.1f}  ({len(modules)} modules)')
+
+        failures = [
+            f'{package} is imported at startup'
+            for package in FORBIDDEN_AT_STARTUP
+            if package in packages and (options['production'] or package not in ('tailwind', 'django_extensions'))
+        ]
+
+        baseline_path = Path(options['baseline'])
+        if options['save_baseline']:
+            baseline_path.write_text(json.dumps({'total_ms': round(total_ms, 1)}, indent=2) + '\n')
+            self.stdout.write(f'Baseline saved to {baseline_path}')
+        elif baseline_path.exists():
+            baseline_ms = json.loads(baseline_path.read_text())['total_ms']
+            limit_ms = baseline_ms * (1 + options['tolerance'])
+            self.stdout.write(f'Baseline {baseline_ms:.1f} ms, limit {limit_ms:.1f} ms')
+            if total_ms > limit_ms:
+                failures.append(f'startup import time {total_ms:.1f} ms exceeds {limit_ms:.1f} ms')
+
+        for failure in failures:
+            self.stderr.write(self.style.ERROR(f'❌ {failure}'))
+        if failures:
+            raise CommandError('Startup profile regressed')
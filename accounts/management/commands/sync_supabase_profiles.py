@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_datetime
+
+from accounts.models import User
+from tinggo.config import SUPABASE_UPSERT_BATCH_SIZE
+from tinggo.supabase import build_user_profile_data, bulk_upsert_user_profiles
+
+
+class Command(BaseCommand):
+    help = 'Re-sync User rows to the Supabase user_profiles table with bulk upserts'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=SUPABASE_UPSERT_BATCH_SIZE,
+            help='Rows per upsert request',
+        )
+        parser.add_argument(
+            '--updated-since',
+            help='Only sync users updated at or after this ISO datetime',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        users = User.objects.order_by('pk')
+
+        if options['updated_since']:
+            updated_since = parse_datetime(options['updated_since'])
+            if updated_since is None:
+                raise CommandError('Invalid --updated-since datetime')
+            users = users.filter(updated_at__gte=updated_since)
+
+        total = users.count()
+        rows = (build_user_profile_data(user) for user in users.iterator(chunk_size=batch_size))
+        synced = bulk_upsert_user_profiles(rows, batch_size=batch_size)
+
+        style = self.style.SUCCESS if synced == total else self.style.WARNING
+        self.stdout.write(style(f'Synced {synced}/{total} user profiles to Supabase'))
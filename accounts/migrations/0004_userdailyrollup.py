@@ -0,0 +1,30 @@
+# Generated by Django 5.2.4 on 2026-10-18 07:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_supabaseoutbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('role', models.CharField(choices=[('admin', 'Administrator'), ('organizer', 'Event Organizer'), ('participant', 'Event Participant'), ('vendor', 'Vendor/Partner'), ('host', 'Experience Host')], max_length=20)),
+                ('new_users', models.PositiveIntegerField(default=0)),
+                ('total_users', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'daily user rollup',
+                'verbose_name_plural': 'daily user rollups',
+                'ordering': ['-date', 'role'],
+                'constraints': [models.UniqueConstraint(fields=('date', 'role'), name='unique_user_rollup_date_role')],
+            },
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 5.2.4 on 2026-10-18 07:57
+
+from django.db import migrations, models
+
+from accounts.models import normalize_search_text
+
+
+BATCH_SIZE = 2000
+
+
+def fill_search_text(apps, schema_editor):
+    User = apps.get_model('accounts', 'User')
+    UserProfile = apps.get_model('accounts', 'UserProfile')
+    db = schema_editor.connection.alias
+    last_pk = 0
+    while True:
+        users = list(
+            User.objects.using(db).filter(pk__gt=last_pk).order_by('pk')
+            .only('pk', 'email', 'first_name', 'last_name')[:BATCH_SIZE]
+        )
+        if not users:
+            break
+        business_names = dict(
+            UserProfile.objects.using(db).filter(user_id__in=[user.pk for user in users])
+            .values_list('user_id', 'business_name')
+        )
+        for user in users:
+            user.search_text = normalize_search_text(
+                user.email, user.first_name, user.last_name, business_names.get(user.pk),
+            )
+        User.objects.using(db).bulk_update(users, ['search_text'])
+        last_pk = users[-1].pk
+
+
+def create_search_index(apps, schema_editor):
+    from accounts.search import install_search_index
+    install_search_index(schema_editor.connection)
+
+
+def drop_search_index(apps, schema_editor):
+    from accounts.search import uninstall_search_index
+    uninstall_search_index(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0006_avatar_renditions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='search_text',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.RunPython(fill_search_text, migrations.RunPython.noop),
+        # pg_trgm GIN index on PostgreSQL, FTS5 table and triggers on SQLite
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.4 on 2026-10-18 08:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0007_user_search_text'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='avatarjob',
+            name='failed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='avatarjob',
+            name='obsolete',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AlterField(
+            model_name='avatarjob',
+            name='source',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 08:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0008_avatarjob_obsolete_failed'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='password_sync_pending',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+    ]
@@ -1,8 +1,24 @@
+import unicodedata
+
 from django.db import models
+from django.utils import timezone
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 from django.utils.translation import gettext_lazy as _
 
 
+# User fields copied into User.search_text
+SEARCH_SOURCE_FIELDS = {'email', 'first_name', 'last_name'}
+
+
+def normalize_search_text(*parts):
+    """
+    Lowercase, accent-free, single-spaced text of ``parts``, for
+    User.search_text and search queries (so "José" matches "jose")
+    """
+    text = unicodedata.normalize('NFKD', ' '.join(part for part in parts if part)).casefold()
+    return ' '.join(''.join(char for char in text if not unicodedata.combining(char)).split())
+
+
 class CustomUserManager(BaseUserManager):
     def create_user(self, email, password=None, **extra_fields):
         if not email:
@@ -13,6 +29,36 @@ class CustomUserManager(BaseUserManager):
         user.save(using=self._db)
         return user
 
+    def bulk_create_users(self, users, processes=None, chunk_size=1000, sync_supabase=False):
+        """
+        Create users from dicts of User field values, each with an optional
+        'password' and 'profile' (UserProfile field values), together with
+        their profiles and one transaction per ``chunk_size`` users.
+
+        Passwords are hashed across ``processes`` processes (default: one
+        per CPU, 0: in this process) while the previous chunk is inserted.
+        Emails that already exist are skipped. Like bulk_create(), no
+        save() or signals run. Returns the created users.
+
+        Only Django users are created: with AUTH_AUTHORITY = 'supabase'
+        they cannot log in until they also have a Supabase Auth account,
+        see bulk.create_auth_users() (used by import_users).
+        """
+        from .bulk import chunked, create_users_in_chunks
+
+        def rows():
+            for fields in users:
+                fields = dict(fields)
+                password = fields.pop('password', None)
+                profile = fields.pop('profile', None) or {}
+                fields['email'] = self.normalize_email(fields['email'])
+                yield fields, profile, password
+
+        created = []
+        for _, chunk_users in create_users_in_chunks(chunked(rows(), chunk_size), processes, sync_supabase):
+            created.extend(chunk_users)
+        return created
+
     def create_superuser(self, email, password=None, **extra_fields):
         extra_fields.setdefault('is_staff', True)
         extra_fields.setdefault('is_superuser', True)
@@ -50,10 +96,16 @@ class User(AbstractUser):
     )
     is_verified = models.BooleanField(default=False, verbose_name=_('verified'))
     is_active = models.BooleanField(default=True, verbose_name=_('active'))
+    # A password reset was requested, so the local hash may be older than
+    # the Supabase password. SupabaseBackend checks it on the next login.
+    password_sync_pending = models.BooleanField(default=False, editable=False)
     
     # Profile information
     bio = models.TextField(_('bio'), max_length=500, blank=True)
     avatar = models.ImageField(_('avatar'), upload_to='avatars/', blank=True, null=True)
+    # Resized copies of the avatar written by process_avatars:
+    # {'small': {'webp': name, 'jpeg': name}, 'medium': {...}}
+    avatar_renditions = models.JSONField(default=dict, blank=True, editable=False)
     
     # Location and preferences
     country = models.CharField(_('country'), max_length=100, blank=True)
@@ -73,6 +125,11 @@ class User(AbstractUser):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    # Email, names and profile business name for admin search, indexed with
+    # pg_trgm or SQLite FTS5 (accounts.search). Kept current by save() and
+    # UserProfile.save().
+    search_text = models.TextField(default='', blank=True, editable=False)
+    
     # Username not required
     username = models.CharField(
         _('username'),
@@ -95,10 +152,53 @@ class User(AbstractUser):
         verbose_name = _('user')
         verbose_name_plural = _('users')
         ordering = ['-created_at']
+        # Match the default ordering, dashboard counts and admin list filters
+        # (see the check_user_query_plans command). The boolean flags get
+        # partial indexes on their rare value: Django filters them as
+        # "WHERE NOT is_active", which SQLite cannot match to a column index.
+        indexes = [
+            models.Index(fields=['-created_at'], name='user_created_idx'),
+            models.Index(fields=['role', '-created_at'], name='user_role_created_idx'),
+            models.Index(fields=['role'], condition=models.Q(is_active=False), name='user_inactive_role_idx'),
+            models.Index(fields=['-created_at'], condition=models.Q(is_verified=True), name='user_verified_created_idx'),
+            models.Index(fields=['language', '-created_at'], name='user_language_created_idx'),
+        ]
     
     def __str__(self):
         return self.email
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        user = super().from_db(db, field_names, values)
+        # Role as stored, so accounts.signals can move the user between the
+        # rollup counts of the admin dashboard when it changes
+        user._stored_role = user.__dict__.get('role')
+        return user
+    
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or SEARCH_SOURCE_FIELDS.intersection(update_fields):
+            self.search_text = self.build_search_text()
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'search_text'}
+        super().save(*args, **kwargs)
+    
+    def build_search_text(self, business_name=None):
+        """
+        search_text for the current field values; the business name is read
+        from the profile unless given
+        """
+        if business_name is None:
+            business_name = ''
+            if 'profile' in self._state.fields_cache:
+                profile = self._state.fields_cache['profile']
+                business_name = profile.business_name if profile else ''
+            elif self.pk:
+                business_name = UserProfile.objects.filter(user_id=self.pk).values_list(
+                    'business_name', flat=True,
+                ).first() or ''
+        return normalize_search_text(self.email, self.first_name, self.last_name, business_name)
+    
     @property
     def full_name(self):
         return f"{self.first_name} {self.last_name}".strip()
@@ -118,6 +218,24 @@ class User(AbstractUser):
     @property
     def is_host(self):
         return self.role == self.UserRole.HOST
+    
+    def avatar_rendition(self, size):
+        """
+        {'webp': url, 'jpeg': url} of a processed avatar size, or None while
+        the avatar is missing or not processed yet
+        """
+        files = self.avatar_renditions.get(size)
+        if not files:
+            return None
+        return {fmt: self.avatar.storage.url(name) for fmt, name in files.items()}
+    
+    @property
+    def avatar_small(self):
+        return self.avatar_rendition('small')
+    
+    @property
+    def avatar_medium(self):
+        return self.avatar_rendition('medium')
 
 
 class UserProfile(models.Model):
@@ -146,6 +264,117 @@ class UserProfile(models.Model):
     class Meta:
         verbose_name = _('user profile')
         verbose_name_plural = _('user profiles')
+        indexes = [
+            models.Index(fields=['-created_at'], name='userprofile_created_idx'),
+        ]
     
     def __str__(self):
         return f"Profile for {self.user.email}"
+    
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        super().save(*args, **kwargs)
+        update_fields = kwargs.get('update_fields')
+        if (adding and not self.business_name) or (update_fields is not None and 'business_name' not in update_fields):
+            return
+        # Copy the business name into the owner's search text, without a
+        # user save() (and its signals) when nothing changed
+        search_text = self.user.build_search_text(self.business_name)
+        if search_text != self.user.search_text:
+            User.objects.filter(pk=self.user_id).update(search_text=search_text)
+            self.user.search_text = search_text
+
+
+class UserDailyRollup(models.Model):
+    """
+    Per-day, per-role user counts written by the ``rollup_user_stats``
+    management command, so dashboards never count the whole users table
+    """
+    date = models.DateField()
+    role = models.CharField(max_length=20, choices=User.UserRole.choices)
+    # Users with this role created on ``date``
+    new_users = models.PositiveIntegerField(default=0)
+    # Users with this role at the end of ``date``
+    total_users = models.PositiveIntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = _('daily user rollup')
+        verbose_name_plural = _('daily user rollups')
+        ordering = ['-date', 'role']
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'role'], name='unique_user_rollup_date_role'),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.role}: {self.total_users}"
+
+
+class SupabaseOutbox(models.Model):
+    """
+    Pending user profile change to push to the Supabase user_profiles table.
+
+    Rows are written in the same transaction as the User/UserProfile save and
+    drained by the ``process_supabase_outbox`` management command.
+    """
+    # Plain id rather than a foreign key so the entry outlives the user row
+    user_id = models.BigIntegerField(db_index=True)
+    # Changed user_profiles columns, null means the whole row
+    fields = models.JSONField(null=True, blank=True)
+
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now, db_index=True)
+    last_error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = _('Supabase outbox entry')
+        verbose_name_plural = _('Supabase outbox')
+        ordering = ['id']
+
+    def __str__(self):
+        return f"Supabase sync for user {self.user_id}"
+
+    @classmethod
+    def enqueue(cls, user, fields=None):
+        """
+        Queue a sync of ``fields`` (or the whole row) for ``user``
+        """
+        return cls.objects.create(
+            user_id=user.pk,
+            fields=sorted(set(fields)) if fields is not None else None,
+        )
+
+
+class AvatarJob(models.Model):
+    """
+    Pending avatar upload to turn into resized renditions.
+
+    Queued by accounts.avatars.queue_avatar_processing() and processed by the
+    ``process_avatars`` management command.
+    """
+    user_id = models.BigIntegerField(db_index=True)
+    # Storage name of the uploaded original, empty when the avatar was removed
+    source = models.CharField(max_length=255, blank=True)
+    # Storage names of the replaced avatar's original and renditions, deleted
+    # once the job is done unless another user's avatar uses them
+    obsolete = models.JSONField(default=list, blank=True)
+
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now, db_index=True)
+    last_error = models.TextField(blank=True)
+    # Set when the upload cannot be processed or attempts ran out; failed
+    # jobs are kept for inspection and not retried
+    failed_at = models.DateTimeField(null=True, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = _('avatar job')
+        verbose_name_plural = _('avatar jobs')
+        ordering = ['id']
+
+    def __str__(self):
+        return f"Avatar {self.source} for user {self.user_id}"
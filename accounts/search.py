@@ -0,0 +1,203 @@
+"""
+Indexed user search for the admin and the support search endpoint.
+
+Matches users whose User.search_text (email, names, business name)
+contains every word of the query, so prefixes and fragments match
+("mar" finds "Maria"). When nothing does, falls back to typo-tolerant
+trigram similarity ("jonh" finds "john").
+
+PostgreSQL uses a pg_trgm GIN index for both. SQLite uses an FTS5 table
+with the trigram tokenizer, kept in sync by triggers. Other databases
+fall back to unindexed LIKE and no typo tolerance.
+"""
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from .models import User, normalize_search_text
+
+
+PG_INDEX = 'user_search_trgm_idx'
+FTS_TABLE = 'accounts_user_search'
+# Per-trigram document counts of FTS_TABLE
+FTS_VOCAB = f'{FTS_TABLE}_vocab'
+FTS_TRIGGERS = {
+    f'{FTS_TABLE}_insert': f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_insert AFTER INSERT ON accounts_user BEGIN
+            INSERT INTO {FTS_TABLE} (rowid, search_text) VALUES (new.id, new.search_text);
+        END""",
+    f'{FTS_TABLE}_delete': f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_delete AFTER DELETE ON accounts_user BEGIN
+            INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, search_text) VALUES ('delete', old.id, old.search_text);
+        END""",
+    f'{FTS_TABLE}_update': f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_update AFTER UPDATE OF search_text ON accounts_user BEGIN
+            INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, search_text) VALUES ('delete', old.id, old.search_text);
+            INSERT INTO {FTS_TABLE} (rowid, search_text) VALUES (new.id, new.search_text);
+        END""",
+}
+# Words beyond this are ignored, each one adds a condition
+MAX_WORDS = 5
+# Typo fallback: candidates returned and the share of the query's
+# trigrams a candidate must contain (SQLite; PostgreSQL uses pg_trgm's
+# word_similarity_threshold), and the most rows scored on SQLite
+TYPO_CANDIDATES = 200
+TYPO_SIMILARITY = 0.5
+TYPO_SCAN_LIMIT = 5000
+
+
+def install_search_index(conn):
+    """
+    Create the search index for the database of ``conn`` if missing.
+
+    Idempotent, and a no-op before the search_text migration. On SQLite it
+    also runs after every migrate (accounts.apps), because altering
+    accounts_user rebuilds the table and drops its triggers.
+    """
+    with conn.cursor() as cursor:
+        if 'accounts_user' not in conn.introspection.table_names(cursor):
+            return
+        columns = [column.name for column in conn.introspection.get_table_description(cursor, 'accounts_user')]
+        if 'search_text' not in columns:
+            return
+        if conn.vendor == 'postgresql':
+            cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+            cursor.execute(
+                f'CREATE INDEX IF NOT EXISTS {PG_INDEX} ON accounts_user USING gin (search_text gin_trgm_ops)'
+            )
+        elif conn.vendor == 'sqlite':
+            cursor.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'accounts_user'"
+            )
+            existing = {name for name, in cursor.fetchall()}
+            if set(FTS_TRIGGERS) <= existing:
+                return
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+                f"search_text, content='accounts_user', content_rowid='id', tokenize='trigram')"
+            )
+            cursor.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_VOCAB} USING fts5vocab({FTS_TABLE}, 'row')")
+            for sql in FTS_TRIGGERS.values():
+                cursor.execute(sql)
+            # Rows changed while the triggers were missing
+            cursor.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def uninstall_search_index(conn):
+    with conn.cursor() as cursor:
+        if conn.vendor == 'postgresql':
+            cursor.execute(f'DROP INDEX IF EXISTS {PG_INDEX}')
+        elif conn.vendor == 'sqlite':
+            for name in FTS_TRIGGERS:
+                cursor.execute(f'DROP TRIGGER IF EXISTS {name}')
+            cursor.execute(f'DROP TABLE IF EXISTS {FTS_VOCAB}')
+            cursor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+def search_words(query):
+    return normalize_search_text(query).split()[:MAX_WORDS]
+
+
+def _fts_phrase(text):
+    return '"' + text.replace('"', '""') + '"'
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def contains_words(words, prefix=''):
+    """
+    Q for users whose search text contains every word. ``prefix`` is the
+    path to the user, e.g. 'user__' from UserProfile.
+    """
+    condition = Q()
+    # The trigram tokenizer only indexes words of three characters or more
+    indexed = [word for word in words if len(word) >= 3] if connection.vendor == 'sqlite' else []
+    if indexed:
+        match = ' AND '.join(_fts_phrase(word) for word in indexed)
+        condition &= Q(**{f'{prefix}id__in': RawSQL(
+            f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [match],
+        )})
+    for word in words:
+        if word not in indexed:
+            condition &= Q(**{f'{prefix}search_text__contains': word})
+    return condition
+
+
+def similar_user_ids(words):
+    """
+    Ids of users whose search text is similar to the query words, best
+    match first: the typo-tolerant fallback
+    """
+    query = ' '.join(words)
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            # %> is indexable: word_similarity(query, search_text) above the threshold
+            cursor.execute(
+                'SELECT id FROM accounts_user WHERE search_text %%> %s '
+                'ORDER BY word_similarity(%s, search_text) DESC LIMIT %s',
+                [query, query, TYPO_CANDIDATES],
+            )
+            return [pk for pk, in cursor.fetchall()]
+        if connection.vendor != 'sqlite':
+            return []
+
+        wanted = set().union(*(_trigrams(word) for word in words))
+        if not wanted:
+            return []
+        # A candidate misses at most this many trigrams, so it contains at
+        # least one of any (missable + 1): fetch rows for the rarest ones
+        # only, instead of ranking every row sharing a common trigram
+        missable = int(len(wanted) * (1 - TYPO_SIMILARITY))
+        cursor.execute(
+            f'SELECT term, doc FROM {FTS_VOCAB} WHERE term IN ({", ".join(["%s"] * len(wanted))})',
+            sorted(wanted),
+        )
+        counts = dict(cursor.fetchall())
+        if len(counts) < len(wanted) - missable:
+            return []
+        rarest = sorted(counts, key=counts.get)[:missable + 1]
+        cursor.execute(
+            f'SELECT rowid, search_text FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s LIMIT %s',
+            [' OR '.join(_fts_phrase(trigram) for trigram in rarest), TYPO_SCAN_LIMIT],
+        )
+        scored = []
+        for pk, text in cursor.fetchall():
+            similarity = len(wanted & _trigrams(text)) / len(wanted)
+            if similarity >= TYPO_SIMILARITY:
+                scored.append((-similarity, pk))
+        return [pk for _, pk in sorted(scored)[:TYPO_CANDIDATES]]
+
+
+def filter_users(queryset, query, prefix=''):
+    """
+    ``queryset`` narrowed to users matching ``query``: containing every
+    word, or if none do, similar to it. Returns (queryset, typo_tolerant).
+    """
+    words = search_words(query)
+    if not words:
+        return queryset, False
+    matches = queryset.filter(contains_words(words, prefix))
+    if matches.exists():
+        return matches, False
+    return queryset.filter(**{f'{prefix}id__in': similar_user_ids(words)}), True
+
+
+def search_users(query, limit=20):
+    """
+    Up to ``limit`` users matching ``query`` as dicts for the JSON search
+    endpoint, newest first, or the most similar ones when none contain it
+    """
+    words = search_words(query)
+    if not words:
+        return []
+    fields = ('id', 'email', 'first_name', 'last_name', 'role', 'profile__business_name')
+    results = list(
+        User.objects.filter(contains_words(words)).order_by('-created_at').values(*fields)[:limit]
+    )
+    if results:
+        return results
+    similar = similar_user_ids(words)[:limit]
+    rows = {row['id']: row for row in User.objects.filter(pk__in=similar).values(*fields)}
+    return [{**rows[pk], 'typo': True} for pk in similar if pk in rows]
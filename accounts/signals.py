@@ -0,0 +1,38 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .backends import forget_verified_password, invalidate_cached_user
+from .models import User, UserProfile
+from .stats import adjust_rollup_counts, clear_user_stats_cache
+
+
+# Fields shown on the admin dashboard; saves touching only other fields
+# (e.g. last_login on every sign-in) keep the cached stats.
+DASHBOARD_FIELDS = {'role', 'first_name', 'last_name', 'email', 'avatar', 'avatar_renditions', 'is_active'}
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, update_fields=None, **kwargs):
+    if not created:
+        invalidate_cached_user(instance.pk)
+        if update_fields is None or 'password' in update_fields:
+            forget_verified_password(instance.email)
+    if created or update_fields is None or DASHBOARD_FIELDS.intersection(update_fields):
+        clear_user_stats_cache()
+    if update_fields is None or 'role' in update_fields:
+        stored_role = getattr(instance, '_stored_role', None)
+        if not created and stored_role and stored_role != instance.role:
+            adjust_rollup_counts(instance.created_at, stored_role, instance.role)
+        instance._stored_role = instance.role
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    invalidate_cached_user(instance.pk)
+    adjust_rollup_counts(instance.created_at, getattr(instance, '_stored_role', None) or instance.role)
+    clear_user_stats_cache()
+
+
+@receiver([post_save, post_delete], sender=UserProfile)
+def profile_changed(sender, instance, **kwargs):
+    invalidate_cached_user(instance.user_id)
@@ -0,0 +1,99 @@
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from tinggo.db_router import read_from_replica
+from .models import User, UserDailyRollup
+
+
+ROLE_COUNTS_CACHE_KEY = 'accounts:user_role_counts'
+RECENT_USERS_CACHE_KEY = 'accounts:recent_users'
+
+
+def count_users_by_role(queryset=None):
+    """
+    Count users for every UserRole plus the total in a single query
+    """
+    if queryset is None:
+        queryset = User.objects.all()
+    aggregates = {role: Count('pk', filter=Q(role=role)) for role in User.UserRole.values}
+    aggregates['total'] = Count('pk')
+    return queryset.order_by().aggregate(**aggregates)
+
+
+def day_bounds(date):
+    """
+    Aware start and end datetimes of ``date`` in the current time zone
+    """
+    start = timezone.make_aware(datetime.combine(date, time.min))
+    return start, start + timedelta(days=1)
+
+
+def compute_user_role_counts():
+    """
+    Users per role and in total.
+
+    Reads the latest daily rollup and only counts users created after it.
+    Without rollups the whole table is aggregated. Role changes and
+    deletions of users the rollup covers are applied to it as they happen
+    (adjust_rollup_counts), so the counts stay exact between rollup runs,
+    except for changes made with QuerySet.update().
+    """
+    latest = UserDailyRollup.objects.order_by('-date').values_list('date', flat=True).first()
+    if latest is None:
+        return count_users_by_role()
+
+    counts = dict(UserDailyRollup.objects.filter(date=latest).values_list('role', 'total_users'))
+    _, since = day_bounds(latest)
+    recent = count_users_by_role(User.objects.filter(created_at__gte=since))
+
+    result = {role: counts.get(role, 0) + recent[role] for role in User.UserRole.values}
+    result['total'] = sum(result.values())
+    return result
+
+
+def adjust_rollup_counts(created_at, old_role=None, new_role=None):
+    """
+    Move a user created before the end of the latest rollup day from
+    ``old_role`` to ``new_role`` in its counts; no ``new_role`` for a
+    deleted user. Later users are counted live anyway.
+    """
+    latest = UserDailyRollup.objects.order_by('-date').values_list('date', flat=True).first()
+    if latest is None or created_at >= day_bounds(latest)[1]:
+        return
+    rollups = UserDailyRollup.objects.filter(date=latest)
+    if old_role:
+        rollups.filter(role=old_role, total_users__gt=0).update(total_users=F('total_users') - 1)
+    if new_role:
+        rollups.filter(role=new_role).update(total_users=F('total_users') + 1)
+
+
+def get_user_role_counts():
+    """
+    Cached compute_user_role_counts(), cleared when users are added or removed
+    """
+    counts = cache.get(ROLE_COUNTS_CACHE_KEY)
+    if counts is None:
+        with read_from_replica():
+            counts = compute_user_role_counts()
+        cache.set(ROLE_COUNTS_CACHE_KEY, counts, settings.DASHBOARD_STATS_TTL)
+    return counts
+
+
+def get_recent_users(limit=10):
+    """
+    Cached list of the newest users for the admin dashboard
+    """
+    users = cache.get(RECENT_USERS_CACHE_KEY)
+    if users is None:
+        with read_from_replica():
+            users = list(User.objects.order_by('-created_at')[:limit])
+        cache.set(RECENT_USERS_CACHE_KEY, users, settings.DASHBOARD_STATS_TTL)
+    return users
+
+
+def clear_user_stats_cache():
+    cache.delete_many([ROLE_COUNTS_CACHE_KEY, RECENT_USERS_CACHE_KEY])
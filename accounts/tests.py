@@ -1,3 +1,466 @@
-from django.test import TestCase
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import AnonymousUser
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.cache.utils import make_template_fragment_key
+from django.core.paginator import InvalidPage
+from django.http import HttpResponse, HttpResponseNotFound
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone, translation
+
+from tinggo.instrumentation import PHASES
+from tinggo.page_cache import CSRF_PLACEHOLDER, cache_anonymous_page, page_cache_key
+from tinggo.pagination import KeysetPaginator
+from tinggo.supabase import SupabaseUnavailable
+from tinggo.translations import catalog_version
+from .avatars import delete_avatar_files, owns_avatar_file
+from .backends import SupabaseBackend, password_reset_requested
+from .bulk import clean_import_row
+from .management.commands.export_users import csv_value
+from .models import SupabaseOutbox, User, UserProfile
+from .search import search_users
+from .stats import compute_user_role_counts, get_user_role_counts
+
+
+def url(name, *args):
+    """``name`` reversed under the /en/ prefix (LANGUAGE_CODE is en-us)"""
+    with translation.override('en'):
+        return reverse(name, args=args)
+
+
+# Fast hashers: the tests check which hash is stored, not its cost
+TEST_HASHERS = [
+    'django.contrib.auth.hashers.MD5PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+
+
+# No collectstatic manifest is needed for {% static %}
+STATIC_STORAGES = {**settings.STORAGES, 'staticfiles': {
+    'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage',
+}}
+
+
+def create_users(count, **fields):
+    return [
+        User.objects.create_user(email=f'user-{n}@example.com', password=None, **fields)
+        for n in range(count)
+    ]
+
+
+class KeysetPaginatorTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = create_users(7)
+
+    def test_pages_follow_the_ordering_without_gaps(self):
+        paginator = KeysetPaginator(User.objects.all(), 3)
+        seen = []
+        cursor = None
+        while True:
+            page = paginator.page(cursor)
+            seen.extend(page.object_list)
+            if not page.has_next:
+                break
+            cursor = page.next_cursor
+        self.assertEqual(seen, list(User.objects.order_by('-created_at', '-id')))
+
+    def test_previous_cursor_returns_the_previous_page(self):
+        paginator = KeysetPaginator(User.objects.all(), 3)
+        first = paginator.page()
+        second = paginator.page(first.next_cursor)
+        self.assertFalse(first.has_previous)
+        self.assertEqual(list(paginator.page(second.previous_cursor)), list(first))
+
+    def test_ascending_ordering(self):
+        paginator = KeysetPaginator(User.objects.all(), 4, ('id',))
+        first = paginator.page()
+        second = paginator.page(first.next_cursor)
+        self.assertEqual([user.pk for user in [*first, *second]], sorted(user.pk for user in self.users))
+        self.assertFalse(second.has_next)
+
+    def test_malformed_cursors_raise_invalid_page(self):
+        paginator = KeysetPaginator(User.objects.all(), 3)
+        # Bad base64, bad padding, not JSON, a value created_at cannot parse
+        for cursor in ('!!!', 'a', 'bm90IGpzb24', 'WyI-IiwgWyJub3QtYS1kYXRlIiwgIngiXV0'):
+            with self.subTest(cursor=cursor), self.assertRaises(InvalidPage):
+                paginator.page(cursor)
+
+
+class SearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.maria = User.objects.create_user(email='maria@example.com', first_name='María', last_name='López')
+        cls.john = User.objects.create_user(email='jsmith@example.com', first_name='John', last_name='Smith')
+        cls.organizer = User.objects.create_user(email='org@example.com', role=User.UserRole.ORGANIZER)
+        UserProfile.objects.create(user=cls.organizer, business_name='Kompa Nights')
+
+    def ids(self, query):
+        return [row['id'] for row in search_users(query)]
+
+    def test_prefixes_and_accents_match(self):
+        self.assertEqual(self.ids('mar'), [self.maria.pk])
+        self.assertEqual(self.ids('MARIA lopez'), [self.maria.pk])
+
+    def test_every_word_must_match(self):
+        # No user contains both words: only typo-tolerant guesses come back
+        self.assertTrue(all(row['typo'] for row in search_users('maria smith')))
+
+    def test_business_name_is_searchable(self):
+        self.assertEqual(self.ids('kompa'), [self.organizer.pk])
+        self.organizer.profile.business_name = 'Rara Fest'
+        self.organizer.profile.save()
+        self.assertEqual(self.ids('kompa'), [])
+        self.assertEqual(self.ids('rara'), [self.organizer.pk])
+
+    def test_typos_fall_back_to_similar_users(self):
+        results = search_users('jonh smith')
+        self.assertEqual([row['id'] for row in results], [self.john.pk])
+        self.assertTrue(results[0]['typo'])
+
+    def test_endpoint_is_staff_only(self):
+        self.client.force_login(self.john)
+        self.assertEqual(self.client.get(url('accounts:user_search'), {'q': 'maria'}).status_code, 403)
+        self.client.force_login(User.objects.create_user(email='staff@example.com', is_staff=True))
+        response = self.client.get(url('accounts:user_search'), {'q': 'maria'})
+        self.assertEqual([row['id'] for row in response.json()['results']], [self.maria.pk])
+
+
+@mock.patch('accounts.management.commands.process_supabase_outbox.upsert_user_profiles')
+class OutboxTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.ana, cls.ben = create_users(2, first_name='Ana', city='Miami')
+
+    def process(self):
+        call_command('process_supabase_outbox', stdout=StringIO(), stderr=StringIO())
+
+    def test_updates_of_a_user_are_coalesced_into_one_row(self, upsert):
+        SupabaseOutbox.enqueue(self.ana, fields=['first_name'])
+        SupabaseOutbox.enqueue(self.ana, fields=['city', 'updated_at'])
+        self.process()
+        (rows,), _ = upsert.call_args
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(set(rows[0]), {'user_id', 'email', 'first_name', 'city', 'updated_at'})
+        self.assertFalse(SupabaseOutbox.objects.exists())
+
+    def test_a_full_row_entry_wins_over_field_lists(self, upsert):
+        SupabaseOutbox.enqueue(self.ana, fields=['city'])
+        SupabaseOutbox.enqueue(self.ana)
+        self.process()
+        (rows,), _ = upsert.call_args
+        self.assertIn('last_name', rows[0])
+
+    def test_rows_with_different_columns_are_sent_separately(self, upsert):
+        SupabaseOutbox.enqueue(self.ana, fields=['city'])
+        SupabaseOutbox.enqueue(self.ben, fields=['first_name'])
+        self.process()
+        self.assertEqual(upsert.call_count, 2)
+
+    def test_failed_entries_are_retried_later(self, upsert):
+        upsert.side_effect = RuntimeError('Supabase down')
+        entry = SupabaseOutbox.enqueue(self.ana, fields=['city'])
+        self.process()
+        entry.refresh_from_db()
+        self.assertEqual(entry.attempts, 1)
+        self.assertEqual(entry.last_error, 'Supabase down')
+        self.assertGreater(entry.next_attempt_at, entry.created_at)
+
+    def test_entries_of_deleted_users_are_dropped(self, upsert):
+        SupabaseOutbox.enqueue(self.ben, fields=['city'])
+        self.ben.delete()
+        self.process()
+        upsert.assert_not_called()
+        self.assertFalse(SupabaseOutbox.objects.exists())
+
+
+@override_settings(PASSWORD_HASHERS=TEST_HASHERS, AUTH_AUTHORITY='supabase')
+class SupabaseBackendTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email='ana@example.com', password='old-password')
+        self.backend = SupabaseBackend()
+        patcher = mock.patch('accounts.backends.verify_user_credentials')
+        self.verify = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def authenticate(self, password, email='ana@example.com'):
+        return self.backend.authenticate(None, username=email, password=password)
+
+    def test_supabase_decides(self):
+        self.verify.return_value = {'id': 'supabase-id'}
+        self.assertEqual(self.authenticate('new-password'), self.user)
+        self.verify.return_value = None
+        self.assertIsNone(self.authenticate('old-password'))
+
+    def test_accepted_login_does_not_run_the_hasher(self):
+        self.verify.return_value = {'id': 'supabase-id'}
+        with mock.patch.object(User, 'check_password') as check_password:
+            self.authenticate('new-password')
+        check_password.assert_not_called()
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password('old-password'))
+
+    def test_outdated_hash_is_redone(self):
+        User.objects.filter(pk=self.user.pk).update(password=make_password('pw', hasher='scrypt'))
+        self.verify.return_value = {'id': 'supabase-id'}
+        self.authenticate('pw')
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith('md5$'))
+
+    def test_reset_password_is_synced_on_the_next_login(self):
+        password_reset_requested('ANA@example.com')
+        self.verify.side_effect = SupabaseUnavailable('down')
+        # The local hash may still be the old password
+        self.assertIsNone(self.authenticate('old-password'))
+
+        self.verify.side_effect = None
+        self.verify.return_value = {'id': 'supabase-id'}
+        self.assertEqual(self.authenticate('new-password'), self.user)
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.password_sync_pending)
+        self.assertTrue(self.user.check_password('new-password'))
+
+    def test_rejected_staff_fall_back_to_the_local_hash(self):
+        self.user.is_staff = True
+        self.user.save()
+        self.verify.return_value = None
+        self.assertEqual(self.authenticate('old-password'), self.user)
+        self.assertIsNone(self.authenticate('wrong-password'))
+
+    @override_settings(AUTH_LOCAL_FALLBACK_LIMIT=2)
+    def test_local_fallback_is_throttled_while_supabase_is_down(self):
+        self.verify.side_effect = SupabaseUnavailable('down')
+        self.assertEqual(self.authenticate('old-password'), self.user)
+        self.assertIsNone(self.authenticate('wrong-password'))
+        self.assertIsNone(self.authenticate('old-password'))
+
+    @override_settings(AUTH_AUTHORITY='local')
+    def test_local_authority_never_asks_supabase(self):
+        self.assertEqual(self.authenticate('old-password'), self.user)
+        self.assertIsNone(self.authenticate('new-password'))
+        self.verify.assert_not_called()
+
+    @override_settings(CACHE_IS_SHARED=True)
+    def test_verification_is_cached_with_a_shared_cache(self):
+        self.verify.return_value = {'id': 'supabase-id'}
+        self.authenticate('new-password')
+        self.assertEqual(self.authenticate('new-password'), self.user)
+        self.assertEqual(self.verify.call_count, 1)
+        # Another password is checked again
+        self.verify.return_value = None
+        self.assertIsNone(self.authenticate('other-password'))
+
+    def test_unknown_and_inactive_users(self):
+        self.verify.return_value = {'id': 'supabase-id'}
+        self.assertIsNone(self.authenticate('old-password', email='nobody@example.com'))
+        self.user.is_active = False
+        self.user.save()
+        self.assertIsNone(self.authenticate('old-password'))
+        self.verify.assert_not_called()
+
+
+@override_settings(CACHE_IS_SHARED=True)
+class CachedUserTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email='ana@example.com', first_name='Ana')
+        UserProfile.objects.create(user=self.user, business_name='Ana Events')
+        self.backend = SupabaseBackend()
+
+    def test_user_and_profile_come_from_the_cache(self):
+        with self.assertNumQueries(1):
+            self.backend.get_user(self.user.pk)
+        with self.assertNumQueries(0):
+            user = self.backend.get_user(self.user.pk)
+            self.assertEqual(user.profile.business_name, 'Ana Events')
+
+    def test_saves_invalidate_the_cached_user(self):
+        self.backend.get_user(self.user.pk)
+        self.user.first_name = 'Anna'
+        self.user.save(update_fields=['first_name'])
+        self.assertEqual(self.backend.get_user(self.user.pk).first_name, 'Anna')
+
+        self.user.profile.business_name = 'Anna Events'
+        self.user.profile.save()
+        self.assertEqual(self.backend.get_user(self.user.pk).profile.business_name, 'Anna Events')
+
+    def test_deactivated_users_are_logged_out(self):
+        self.backend.get_user(self.user.pk)
+        self.user.is_active = False
+        self.user.save()
+        self.assertIsNone(self.backend.get_user(self.user.pk))
+
+    @override_settings(CACHE_IS_SHARED=False)
+    def test_users_are_not_cached_without_a_shared_cache(self):
+        self.backend.get_user(self.user.pk)
+        User.objects.filter(pk=self.user.pk).update(first_name='Anna')
+        self.assertEqual(self.backend.get_user(self.user.pk).first_name, 'Anna')
+
+    @override_settings(STORAGES=STATIC_STORAGES)
+    def test_authenticated_pages_run_no_user_query(self):
+        self.client.force_login(self.user)
+        self.client.get(url('accounts:profile'))
+        with self.assertNumQueries(1):
+            # The session row only: user and profile are cached
+            self.assertEqual(self.client.get(url('accounts:profile')).status_code, 200)
+
+
+class QueryPlanTests(TestCase):
+    def test_user_access_patterns_use_their_indexes(self):
+        # Enough rows for the planner to prefer the indexes; the search
+        # budget is loose, test databases are not tuned
+        out = StringIO()
+        call_command('check_user_query_plans', users=20_000, search_budget_ms=2000, stdout=out)
+        self.assertNotIn('FAIL', out.getvalue())
+        self.assertFalse(User.objects.exists())
+
+
+@override_settings(STORAGES=STATIC_STORAGES, PAGE_CACHE_TTL=60)
+class PageCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_anonymous_pages_are_cached_and_revalidated(self):
+        first = self.client.get(url('home'))
+        self.assertEqual(first.status_code, 200)
+        with self.assertNumQueries(0):
+            second = self.client.get(url('home'))
+        # Same page and CSRF secret; the token is masked anew
+        self.assertEqual(len(second.content), len(first.content))
+        self.assertEqual(second['ETag'], first['ETag'])
+        self.assertEqual(self.client.get(url('home'), HTTP_IF_NONE_MATCH=first['ETag']).status_code, 304)
+
+    def test_cached_pages_carry_the_visitors_csrf_token(self):
+        self.client.get(url('home'))
+        response = self.client.get(url('home'))
+        self.assertNotIn(CSRF_PLACEHOLDER.encode(), response.content)
+        self.assertIn(b'csrfmiddlewaretoken', response.content)
+
+    def test_logged_in_users_are_not_served_cached_pages(self):
+        self.client.get(url('home'))
+        self.client.force_login(User.objects.create_user(email='ana@example.com'))
+        self.assertNotIn('ETag', self.client.get(url('home')))
+
+    def test_fragment_keys_include_the_catalog_version(self):
+        self.client.get(url('home'))
+        vary_on = ['en', catalog_version(), settings.DEPLOY_VERSION]
+        self.assertIsNotNone(cache.get(make_template_fragment_key('base_nav_menu', vary_on)))
+        self.assertIsNotNone(cache.get(make_template_fragment_key('base_footer', vary_on)))
+
+    def test_render_lock_is_released_after_uncacheable_responses(self):
+        responses = [HttpResponseNotFound(), HttpResponse('ok')]
+        view = cache_anonymous_page(lambda request: responses.pop(0))
+        request = RequestFactory().get('/en/missing/')
+        request.user = AnonymousUser()
+        key = page_cache_key(request)
+        # A stale entry: only the request that takes the lock renders
+        cache.set(key, {'expires': 0}, 60)
+
+        self.assertEqual(view(request).status_code, 404)
+        self.assertIsNone(cache.get(f'{key}:lock'))
+        self.assertEqual(view(request).content, b'ok')
+
+
+class CsvEscapeTests(TestCase):
+    def test_formulas_are_quoted_on_export_and_restored_on_import(self):
+        self.assertEqual(csv_value('=HYPERLINK("x")'), '\'=HYPERLINK("x")')
+        self.assertEqual(csv_value('-5 stars'), "'-5 stars")
+        self.assertEqual(csv_value('Ana'), 'Ana')
+        user_fields, _, _ = clean_import_row({
+            'email': 'ana@example.com',
+            'first_name': csv_value('=Ana'),
+            'last_name': "'Neil",
+        })
+        self.assertEqual(user_fields['first_name'], '=Ana')
+        # Only the quote added by export_users is removed
+        self.assertEqual(user_fields['last_name'], "'Neil")
+
+
+class AvatarFileTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='ana@example.com')
+
+    def test_only_uploads_and_the_users_renditions_are_owned(self):
+        self.assertTrue(owns_avatar_file(self.user.pk, 'avatars/ana.jpg'))
+        self.assertTrue(owns_avatar_file(self.user.pk, f'avatars/small/{self.user.pk}/abc.webp'))
+        self.assertFalse(owns_avatar_file(self.user.pk, f'avatars/small/{self.user.pk + 1}/abc.webp'))
+        # Renditions from before they were stored per user may be shared
+        self.assertFalse(owns_avatar_file(self.user.pk, 'avatars/small/abc.webp'))
+
+    def test_files_of_the_current_avatar_are_kept(self):
+        current = f'avatars/small/{self.user.pk}/new.webp'
+        User.objects.filter(pk=self.user.pk).update(
+            avatar='avatars/new.jpg', avatar_renditions={'small': {'webp': current}},
+        )
+        old = f'avatars/small/{self.user.pk}/old.webp'
+        with mock.patch('accounts.avatars.default_storage') as storage, self.assertNumQueries(1):
+            delete_avatar_files(self.user.pk, ['avatars/old.jpg', old, current, 'avatars/new.jpg', 'avatars/small/old.webp'])
+        deleted = {call.args[0] for call in storage.delete.call_args_list}
+        self.assertEqual(deleted, {'avatars/old.jpg', old})
+
+
+@override_settings(STORAGES=STATIC_STORAGES)
+class ProfileViewTests(TestCase):
+    def test_profile_pages_queue_no_sync_without_synced_changes(self):
+        user = User.objects.create_user(email='ana@example.com')
+        UserProfile.objects.create(user=user)
+        self.client.force_login(user)
+        SupabaseOutbox.objects.all().delete()
+        response = self.client.post(url('accounts:profile'), {'business_name': 'Ana Events'})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(UserProfile.objects.get(user=user).business_name, 'Ana Events')
+        self.assertFalse(SupabaseOutbox.objects.exists())
+
+
+class UserStatsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.users = create_users(2)
+        User.objects.update(created_at=timezone.now() - timedelta(days=2))
+        call_command('rollup_user_stats', stdout=StringIO())
+
+    def test_counts_add_later_users_to_the_rollup(self):
+        User.objects.create_user(email='new@example.com', role=User.UserRole.ORGANIZER)
+        # The users created after the rollup are counted in one query
+        with self.assertNumQueries(3):
+            counts = compute_user_role_counts()
+        self.assertEqual(counts[User.UserRole.PARTICIPANT], 2)
+        self.assertEqual(counts[User.UserRole.ORGANIZER], 1)
+        self.assertEqual(counts['total'], 3)
+
+    def test_role_changes_and_deletions_adjust_the_rollup(self):
+        user = User.objects.get(pk=self.users[0].pk)
+        user.role = User.UserRole.VENDOR
+        user.save()
+        User.objects.get(pk=self.users[1].pk).delete()
+        counts = compute_user_role_counts()
+        self.assertEqual(counts[User.UserRole.PARTICIPANT], 0)
+        self.assertEqual(counts[User.UserRole.VENDOR], 1)
+        self.assertEqual(counts['total'], 1)
+
+    def test_counts_are_cached_until_users_change(self):
+        get_user_role_counts()
+        with self.assertNumQueries(0):
+            get_user_role_counts()
+        User.objects.create_user(email='new@example.com', role=User.UserRole.HOST)
+        self.assertEqual(get_user_role_counts()[User.UserRole.HOST], 1)
+
+
+@override_settings(STORAGES=STATIC_STORAGES)
+class ServerTimingTests(TestCase):
+    def test_header_is_off_by_default(self):
+        self.assertNotIn('Server-Timing', self.client.get(url('accounts:custom_login')))
+
+    @override_settings(SERVER_TIMING=True)
+    def test_header_has_phase_durations_only(self):
+        metrics = self.client.get(url('accounts:custom_login'))['Server-Timing'].split(', ')
+        names = [metric.split(';')[0] for metric in metrics]
+        self.assertEqual(names, [*PHASES, 'total'])
+        self.assertTrue(all(metric.split(';')[1].startswith('dur=') for metric in metrics))
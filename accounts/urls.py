@@ -1,14 +1,18 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import views, async_views
+
+# Under ASGI the Supabase-bound auth views run natively async
+auth_views = async_views if settings.ASYNC_VIEWS else views
 
 app_name = 'accounts'
 
 urlpatterns = [
     # Authentication
-    path('register/', views.register, name='register'),
-    path('login/', views.custom_login, name='custom_login'),
+    path('register/', auth_views.register, name='register'),
+    path('login/', auth_views.custom_login, name='custom_login'),
     path('logout/', views.custom_logout, name='custom_logout'),
-    path('password-reset/', views.custom_password_reset, name='custom_password_reset'),
+    path('password-reset/', auth_views.custom_password_reset, name='custom_password_reset'),
     path('profile/', views.profile, name='profile'),
     path('dashboard/', views.dashboard, name='dashboard'),
 
@@ -17,4 +21,7 @@ urlpatterns = [
     path('admin-dashboard/', views.admin_dashboard, name='admin_dashboard'),
     path('organizer-dashboard/', views.organizer_dashboard, name='organizer_dashboard'),
     path('participant-dashboard/', views.participant_dashboard, name='participant_dashboard'),
+
+    # Staff user search (JSON)
+    path('search/', views.user_search, name='user_search'),
 ] 
\ No newline at end of file
@@ -1,17 +1,58 @@
+from django.http import JsonResponse
 from django.shortcuts import render, redirect
 from django.contrib.auth import login, authenticate, logout
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.utils.translation import gettext_lazy as _
 from django.conf import settings
+from django.db import transaction
 from django.utils.translation import gettext_lazy as _
+from django.utils.translation import get_language
+from .backends import password_reset_requested
 from .forms import CustomUserCreationForm, UserProfileForm, UserAvatarForm
-from .models import User, UserProfile
-from tinggo.supabase import create_user_profile, sign_up_user, sign_in_user, reset_password
+from .models import User, UserProfile, SupabaseOutbox
+from .search import search_users
+from .stats import get_recent_users, get_user_role_counts
+from events.feed import nearby_feed
+from tinggo.page_cache import cache_anonymous_page
+from tinggo.supabase import USER_PROFILE_FIELDS, sign_up_user, reset_password
 
 
+@cache_anonymous_page
 def home(request):
-    return render(request, 'home.html')
+    return render(request, 'home.html', feed_context(request))
+
+
+def feed_context(request):
+    """First page of the events near the user, for templates/events/_feed.html"""
+    region, page = nearby_feed(request.user, get_language())
+    return {'feed': page, 'feed_region': region}
+
+
+def registration_user_data(form, language):
+    """
+    Metadata stored with the Supabase Auth user on sign-up
+    """
+    return {
+        'first_name': form.cleaned_data.get('first_name'),
+        'last_name': form.cleaned_data.get('last_name'),
+        'role': form.cleaned_data.get('role'),
+        'language': language,
+    }
+
+
+@transaction.atomic
+def create_registered_user(form, language):
+    """
+    Save the new User with its UserProfile and queue the Supabase sync
+    """
+    user = form.save(commit=False)
+    user.language = language  # Set language automatically
+    user.save()
+    UserProfile.objects.create(user=user)
+    # Synced to Supabase by the process_supabase_outbox worker
+    SupabaseOutbox.enqueue(user)
+    return user
 
 
 def register(request):
@@ -24,39 +65,14 @@ def register(request):
             # Get current language from session or default to 'en'
             current_language = request.session.get('django_language', 'en')
             
-            supabase_user_data = {
-                'first_name': form.cleaned_data.get('first_name'),
-                'last_name': form.cleaned_data.get('last_name'),
-                'role': form.cleaned_data.get('role'),
-                'language': current_language,
-            }
-            
+            supabase_user_data = registration_user_data(form, current_language)
             supabase_user = sign_up_user(email, password, supabase_user_data)
             
             if supabase_user:
-                user = form.save(commit=False)
-                user.language = current_language  # Set language automatically
-                user.save()
-                UserProfile.objects.create(user=user)
-                
-                try:
-                    user_data = {
-                        'user_id': user.id,
-                        'email': user.email,
-                        'first_name': user.first_name,
-                        'last_name': user.last_name,
-                        'role': user.role,
-                        'country': user.country,
-                        'city': user.city,
-                        'language': user.language,
-                        'created_at': user.created_at.isoformat(),
-                    }
-                    create_user_profile(user_data)
-                except Exception as e:
-                    print(f"Error creating user profile in Supabase: {e}")
+                user = create_registered_user(form, current_language)
                 
-                user = authenticate(email=user.email, password=password)
-                login(request, user)
+                # Credentials were just accepted by Supabase, no need to verify again
+                login(request, user, backend='accounts.backends.SupabaseBackend')
                 messages.success(request, _('Welcome to TingGo! Your account has been created successfully.'))
                 return redirect('home')
             else:
@@ -78,27 +94,16 @@ def profile(request):
         avatar_form = UserAvatarForm(request.POST, request.FILES, instance=user)
         
         if profile_form.is_valid() and avatar_form.is_valid():
-            profile_form.save()
-            avatar_form.save()
-            
-            try:
-                user_data = {
-                    'user_id': user.id,
-                    'email': user.email,
-                    'first_name': user.first_name,
-                    'last_name': user.last_name,
-                    'role': user.role,
-                    'country': user.country,
-                    'city': user.city,
-                    'language': user.language,
-                    'updated_at': user.updated_at.isoformat(),
-                }
-                create_user_profile(user_data)
-            except Exception as e:
-                print(f"Error updating user in Supabase: {e}")
+            with transaction.atomic():
+                profile_form.save()
+                avatar_form.save()
+                # Send only the user_profiles columns edited on this page, if any
+                synced = [name for name in avatar_form.changed_data if name in USER_PROFILE_FIELDS]
+                if synced:
+                    SupabaseOutbox.enqueue(user, fields=[*synced, 'updated_at'])
             
             messages.success(request, _('Profile updated successfully!'))
-            return redirect('profile')
+            return redirect('accounts:profile')
     else:
         profile_form = UserProfileForm(instance=profile)
         avatar_form = UserAvatarForm(instance=user)
@@ -116,15 +121,15 @@ def dashboard(request):
     user = request.user
     
     if user.is_admin:
-        return redirect('admin_dashboard')
+        return redirect('accounts:admin_dashboard')
     elif user.is_organizer:
-        return redirect('organizer_dashboard')
+        return redirect('accounts:organizer_dashboard')
     elif user.is_vendor:
         return redirect('vendor_dashboard')
     elif user.is_host:
         return redirect('host_dashboard')
     else:
-        return redirect('participant_dashboard')
+        return redirect('accounts:participant_dashboard')
 
 
 def custom_login(request):
@@ -133,16 +138,12 @@ def custom_login(request):
         password = request.POST.get('password')
         
         if email and password:
-            supabase_user = sign_in_user(email, password)
-            
-            if supabase_user:
-                user = authenticate(request, email=email, password=password)
-                if user is not None:
-                    login(request, user)
-                    messages.success(request, _('Welcome back!'))
-                    return redirect('home')
-                else:
-                    messages.error(request, _('Invalid credentials.'))
+            # SupabaseBackend checks Supabase Auth (cached) instead of a separate sign-in
+            user = authenticate(request, email=email, password=password)
+            if user is not None:
+                login(request, user)
+                messages.success(request, _('Welcome back!'))
+                return redirect('home')
             else:
                 messages.error(request, _('Invalid credentials.'))
         else:
@@ -156,9 +157,12 @@ def custom_password_reset(request):
         email = request.POST.get('email')
         
         if email:
+            # The old password must not keep logging in from the cache or
+            # the local hash
+            password_reset_requested(email)
             if reset_password(email):
                 messages.success(request, _('Password reset email sent. Please check your inbox.'))
-                return redirect('custom_login')
+                return redirect('accounts:custom_login')
             else:
                 messages.error(request, _('Failed to send password reset email. Please try again.'))
         else:
@@ -179,12 +183,13 @@ def admin_dashboard(request):
         messages.error(request, _('Access denied. Admin privileges required.'))
         return redirect('home')
     
-    users = User.objects.all().order_by('-created_at')[:10]
+    counts = get_user_role_counts()
     context = {
-        'users': users,
-        'total_users': User.objects.count(),
-        'total_organizers': User.objects.filter(role=User.UserRole.ORGANIZER).count(),
-        'total_participants': User.objects.filter(role=User.UserRole.PARTICIPANT).count(),
+        'users': get_recent_users(),
+        'total_users': counts['total'],
+        'total_organizers': counts[User.UserRole.ORGANIZER],
+        'total_participants': counts[User.UserRole.PARTICIPANT],
+        'role_counts': [(label, counts[role]) for role, label in User.UserRole.choices],
     }
     return render(request, 'accounts/admin_dashboard.html', context)
 
@@ -205,10 +210,29 @@ def organizer_dashboard(request):
 def participant_dashboard(request):
     context = {
         'user': request.user,
+        **feed_context(request),
     }
     return render(request, 'accounts/participant_dashboard.html', context)
 
 
 
     
-    return redirect('/') 
\ No newline at end of file
+    return redirect('/') 
+
+
+@login_required
+def user_search(request):
+    """Staff user lookup as JSON: ?q=<words>&limit=<n>, typo tolerant"""
+    if not (request.user.is_staff or request.user.is_admin):
+        return JsonResponse({'error': 'forbidden'}, status=403)
+    query = request.GET.get('q', '')
+    try:
+        limit = min(max(int(request.GET.get('limit', 20)), 1), 50)
+    except ValueError:
+        limit = 20
+    results = search_users(query, limit)
+    return JsonResponse({
+        'query': query,
+        'results': results,
+        'typo_tolerant': any(row.get('typo') for row in results),
+    })
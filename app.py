@@ -14,5 +14,12 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'tinggo.settings')
 from django.core.wsgi import get_wsgi_application
 application = get_wsgi_application()
 
+# Load every language's catalog and parse every template now instead of
+# on the first request that needs them
+from tinggo.templating import warm_templates
+from tinggo.translations import warm_translations
+warm_translations()
+warm_templates()
+
 # Also export as 'app' for Render compatibility
 app = application 
\ No newline at end of file
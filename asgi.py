@@ -0,0 +1,34 @@
+"""
+ASGI application entry point (gunicorn with uvicorn workers)
+
+    GUNICORN_WORKER_CLASS=uvicorn gunicorn   # see gunicorn.conf.py
+"""
+import os
+import sys
+
+# Add the project directory to the Python path
+sys.path.insert(0, os.path.dirname(__file__))
+
+# Set Django settings module
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'tinggo.settings')
+
+# Serve register/login/password reset with the async views
+os.environ.setdefault('ASYNC_VIEWS', 'True')
+# Static files are served by StaticFilesApplication below, outside the
+# middleware chain (WhiteNoiseMiddleware is sync-only)
+os.environ['STATIC_FILES_MIDDLEWARE'] = 'False'
+
+# Import Django ASGI application
+from django.core.asgi import get_asgi_application
+from tinggo.static_files import StaticFilesApplication
+application = StaticFilesApplication(get_asgi_application())
+
+# Load every language's catalog and parse every template now instead of
+# on the first request that needs them
+from tinggo.templating import warm_templates
+from tinggo.translations import warm_translations
+warm_translations()
+warm_templates()
+
+# Also export as 'app' for compatibility
+app = application
@@ -11,7 +11,8 @@ pip install -r requirements.txt
 # Check if Node.js is available
 if command -v node &> /dev/null; then
     echo "📦 Node.js found, building Tailwind CSS..."
-    # Install Node.js dependencies and build Tailwind CSS
+    # Install Node.js dependencies and build Tailwind CSS: styles.css with
+    # only the classes the templates use, plus critical.css for base.html
     cd theme/static_src
     npm install
     npm run build
@@ -21,16 +22,30 @@ else
     echo "⚠️  Node.js not found, skipping Tailwind build"
 fi
 
+# Validate templates (fails the build on template errors)
+echo "🧩 Checking templates..."
+python manage.py check_templates
+
+# Heavy packages (Supabase SDK, httpx, Pillow) must stay out of a cold
+# start. The import time is also compared once startup_profile.json is
+# committed, measured on the build machine.
+echo "⏱️  Checking startup imports..."
+python manage.py startup_profile --production --runs 1
+
 # Collect static files
 echo "📁 Collecting static files..."
 python manage.py collectstatic --noinput
 
+# Every CSS/JS file must be fingerprinted with .gz and .br variants
+echo "🗜️  Checking static assets..."
+python manage.py check_static_assets
+
 # Run migrations
 echo "🗄️  Running migrations..."
 python manage.py migrate
 
 # Compile translations
 echo "🌐 Compiling translations..."
-python compile_translations.py
+python manage.py compile_translations --jobs "${TRANSLATION_JOBS:-2}"
 
 echo "✅ Build completed successfully!" 
\ No newline at end of file
@@ -0,0 +1,26 @@
+from django.contrib import admin
+
+from .models import Event, FeedEntry
+
+
+@admin.register(Event)
+class EventAdmin(admin.ModelAdmin):
+    list_display = ('title', 'organizer', 'city', 'region', 'language', 'starts_at', 'status')
+    list_filter = ('status', 'region', 'language', 'starts_at')
+    search_fields = ('title', 'city', 'venue')
+    raw_id_fields = ('organizer',)
+    date_hierarchy = 'starts_at'
+    readonly_fields = ('region', 'created_at', 'updated_at')
+
+
+@admin.register(FeedEntry)
+class FeedEntryAdmin(admin.ModelAdmin):
+    """Read-only: entries are written by events.feed.refresh_event()"""
+    list_display = ('title', 'region', 'language', 'starts_at', 'ends_at', 'organizer_name')
+    list_filter = ('region', 'language')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
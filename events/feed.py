@@ -0,0 +1,178 @@
+"""
+Precomputed event feeds per region and language.
+
+Every event change rewrites its one FeedEntry row (refresh_event) and
+bumps the cache version of the feeds it was and is in, so feed pages are
+served from the cache until an event of that feed changes, and built
+from the FeedEntry indexes, never the events table.
+
+The version bump only reaches the workers sharing the cache: with a
+per-process cache (CACHE_IS_SHARED False) pages are kept LOCAL_FEED_TTL
+seconds at most, so other workers show a change after that long.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from tinggo.db_router import read_from_replica
+from tinggo.pagination import KeysetPaginator
+from .models import Event, FeedEntry
+from .regions import Region, region_for
+
+
+# Cache version region for the feed of a language across all regions
+ALL_REGIONS = 'all'
+FEED_ORDERING = ('starts_at', 'id')
+LOCAL_FEED_TTL = 10
+
+
+def _version_key(region, language):
+    return f'events:feed_version:{region}:{language}'
+
+
+def invalidate_feeds(keys):
+    """
+    Make the next request of the (region, language) feeds in ``keys``, and
+    of their languages across regions, rebuild from FeedEntry
+    """
+    for region, language in keys:
+        for key in (_version_key(region, language), _version_key(ALL_REGIONS, language)):
+            cache.add(key, 0, None)
+            try:
+                cache.incr(key)
+            except ValueError:
+                # Evicted between add() and incr()
+                cache.set(key, 1, None)
+
+
+def organizer_name(organizer):
+    """Business name of the organizer's profile, or their full name"""
+    profile = getattr(organizer, 'profile', None)
+    return (profile and profile.business_name) or organizer.full_name
+
+
+def entry_fields(event):
+    return {
+        'region': event.region,
+        'language': event.language,
+        'starts_at': event.starts_at,
+        'ends_at': event.effective_ends_at,
+        'title': event.title,
+        'venue': event.venue,
+        'city': event.city,
+        'organizer_name': organizer_name(event.organizer),
+    }
+
+
+def refresh_event(event):
+    """
+    Create, update or delete the feed entry of ``event`` to match it, and
+    invalidate the feeds it leaves or joins once the transaction commits
+    """
+    keys = set(FeedEntry.objects.filter(event=event).values_list('region', 'language'))
+    if event.is_listed:
+        FeedEntry.objects.update_or_create(event=event, defaults=entry_fields(event))
+        keys.add((event.region, event.language))
+    elif keys:
+        FeedEntry.objects.filter(event=event).delete()
+    if keys:
+        transaction.on_commit(lambda: invalidate_feeds(keys))
+
+
+def refresh_organizer(organizer):
+    """
+    Update the organizer name on the feed entries of ``organizer``'s events
+    that show another one (one query when the name did not change)
+    """
+    name = organizer_name(organizer)
+    entries = FeedEntry.objects.filter(event__organizer=organizer).exclude(organizer_name=name)
+    keys = set(entries.values_list('region', 'language').distinct())
+    if keys:
+        entries.update(organizer_name=name)
+        transaction.on_commit(lambda: invalidate_feeds(keys))
+
+
+def rebuild_feed(batch_size=1000):
+    """
+    Recreate every feed entry from the listed events, for the first deploy
+    or after bulk changes that skipped save(). Returns the entry count.
+    """
+    keys = set(FeedEntry.objects.values_list('region', 'language').distinct())
+    now = timezone.now()
+    events = (
+        Event.objects.filter(status=Event.Status.PUBLISHED)
+        .exclude(ends_at__lt=now).exclude(ends_at=None, starts_at__lt=now)
+        .select_related('organizer__profile')
+    )
+    entries = []
+    for event in events.iterator(chunk_size=batch_size):
+        entries.append(FeedEntry(event=event, **entry_fields(event)))
+        keys.add((event.region, event.language))
+    with transaction.atomic():
+        FeedEntry.objects.all().delete()
+        FeedEntry.objects.bulk_create(entries, batch_size=batch_size)
+        transaction.on_commit(lambda: invalidate_feeds(keys))
+    return len(entries)
+
+
+def prune_feed():
+    """Delete the entries of events that are over. Returns the count."""
+    ended = FeedEntry.objects.filter(ends_at__lt=timezone.now())
+    keys = set(ended.values_list('region', 'language').distinct())
+    deleted, _ = ended.delete()
+    invalidate_feeds(keys)
+    return deleted
+
+
+def feed_page(language, region=None, cursor=None, per_page=None):
+    """
+    Upcoming events of ``language`` in ``region`` (or every region), soonest
+    first, as {'entries': [FeedEntry], 'next_cursor': str or None}. Cached
+    until an event of the feed changes, an event of the page ends or
+    EVENT_FEED_TTL (LOCAL_FEED_TTL without a shared cache) passes. An invalid ``cursor`` raises InvalidPage.
+    """
+    per_page = per_page or settings.EVENT_FEED_PAGE_SIZE
+    version = cache.get(_version_key(region or ALL_REGIONS, language), 0)
+    position = hashlib.sha256(cursor.encode()).hexdigest()[:32] if cursor else 'first'
+    key = f'events:feed:{region or ALL_REGIONS}:{language}:{version}:{per_page}:{position}'
+    page = cache.get(key)
+    if page is None:
+        now = timezone.now()
+        entries = FeedEntry.objects.filter(language=language, ends_at__gte=now)
+        if region:
+            entries = entries.filter(region=region)
+        with read_from_replica():
+            result = KeysetPaginator(entries, per_page, FEED_ORDERING).page(cursor)
+        page = {'entries': result.object_list, 'next_cursor': result.next_cursor}
+        ttl = settings.EVENT_FEED_TTL
+        if not settings.CACHE_IS_SHARED:
+            ttl = min(ttl, LOCAL_FEED_TTL)
+        # Ended events are not a write, nothing invalidates the page for them
+        if page['entries']:
+            ends_in = (min(entry.ends_at for entry in page['entries']) - now).total_seconds()
+            ttl = max(1, min(ttl, int(ends_in) + 1))
+        cache.set(key, page, ttl)
+    return page
+
+
+def user_region(user):
+    if not user.is_authenticated:
+        return Region.OTHER
+    return region_for(user.country, user.city)
+
+
+def nearby_feed(user, language):
+    """
+    (region, first feed page) for ``user``: upcoming events in their region
+    and ``language``, or in every region (region None) when theirs is
+    unknown or has none
+    """
+    region = user_region(user)
+    if region != Region.OTHER:
+        page = feed_page(language, region)
+        if page['entries']:
+            return region, page
+    return None, feed_page(language)
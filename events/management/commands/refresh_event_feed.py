@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from events.feed import prune_feed, rebuild_feed
+
+
+class Command(BaseCommand):
+    help = (
+        'Delete the feed entries of events that are over (run hourly). With '
+        '--rebuild, recreate every entry from the published events instead, '
+        'e.g. after bulk changes made without Event.save().'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rebuild',
+            action='store_true',
+            help='Recreate all feed entries',
+        )
+
+    def handle(self, *args, **options):
+        if options['rebuild']:
+            count = rebuild_feed()
+            self.stdout.write(self.style.SUCCESS(f'Rebuilt the feed with {count} upcoming events'))
+        else:
+            count = prune_feed()
+            self.stdout.write(self.style.SUCCESS(f'Deleted {count} ended feed entries'))
@@ -0,0 +1,77 @@
+# Generated by Django 5.2.4 on 2026-10-18 08:15
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Event',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=200, verbose_name='title')),
+                ('description', models.TextField(blank=True, verbose_name='description')),
+                ('venue', models.CharField(blank=True, max_length=200, verbose_name='venue')),
+                ('city', models.CharField(max_length=100, verbose_name='city')),
+                ('country', models.CharField(max_length=100, verbose_name='country')),
+                ('region', models.CharField(choices=[('caribbean', 'Caribbean'), ('latin_america', 'Latin America'), ('new_york', 'New York'), ('london', 'London'), ('other', 'Other')], editable=False, max_length=20, verbose_name='region')),
+                ('language', models.CharField(choices=[('en', 'English'), ('es', 'Español'), ('ht', 'Kreyòl Ayisyen')], default='en', max_length=10, verbose_name='language')),
+                ('starts_at', models.DateTimeField(verbose_name='starts at')),
+                ('ends_at', models.DateTimeField(blank=True, null=True, verbose_name='ends at')),
+                ('status', models.CharField(choices=[('draft', 'Draft'), ('published', 'Published'), ('cancelled', 'Cancelled')], default='draft', max_length=20, verbose_name='status')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('organizer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='events', to=settings.AUTH_USER_MODEL, verbose_name='organizer')),
+            ],
+            options={
+                'verbose_name': 'event',
+                'verbose_name_plural': 'events',
+                'ordering': ['starts_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='FeedEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('region', models.CharField(choices=[('caribbean', 'Caribbean'), ('latin_america', 'Latin America'), ('new_york', 'New York'), ('london', 'London'), ('other', 'Other')], max_length=20)),
+                ('language', models.CharField(choices=[('en', 'English'), ('es', 'Español'), ('ht', 'Kreyòl Ayisyen')], max_length=10)),
+                ('starts_at', models.DateTimeField()),
+                ('ends_at', models.DateTimeField()),
+                ('title', models.CharField(max_length=200)),
+                ('venue', models.CharField(blank=True, max_length=200)),
+                ('city', models.CharField(max_length=100)),
+                ('organizer_name', models.CharField(blank=True, max_length=200)),
+                ('event', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='feed_entry', to='events.event')),
+            ],
+            options={
+                'verbose_name': 'feed entry',
+                'verbose_name_plural': 'feed entries',
+                'ordering': ['starts_at', 'id'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['organizer', '-starts_at'], name='event_organizer_starts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='feedentry',
+            index=models.Index(fields=['region', 'language', 'starts_at', 'id'], name='feed_region_language_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='feedentry',
+            index=models.Index(fields=['language', 'starts_at', 'id'], name='feed_language_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='feedentry',
+            index=models.Index(fields=['ends_at'], name='feed_ends_idx'),
+        ),
+    ]
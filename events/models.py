@@ -0,0 +1,99 @@
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+from .regions import Region, region_for
+
+
+class Event(models.Model):
+    """
+    A cultural event, listed in the feeds (events.feed) while published
+    and not over
+    """
+    class Status(models.TextChoices):
+        DRAFT = 'draft', _('Draft')
+        PUBLISHED = 'published', _('Published')
+        CANCELLED = 'cancelled', _('Cancelled')
+
+    organizer = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='events',
+        verbose_name=_('organizer'),
+    )
+    title = models.CharField(_('title'), max_length=200)
+    description = models.TextField(_('description'), blank=True)
+
+    # Location: region is derived from country and city on save
+    venue = models.CharField(_('venue'), max_length=200, blank=True)
+    city = models.CharField(_('city'), max_length=100)
+    country = models.CharField(_('country'), max_length=100)
+    region = models.CharField(_('region'), max_length=20, choices=Region.choices, editable=False)
+    language = models.CharField(_('language'), max_length=10, choices=settings.LANGUAGES, default='en')
+
+    starts_at = models.DateTimeField(_('starts at'))
+    ends_at = models.DateTimeField(_('ends at'), null=True, blank=True)
+    status = models.CharField(_('status'), max_length=20, choices=Status.choices, default=Status.DRAFT)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = _('event')
+        verbose_name_plural = _('events')
+        ordering = ['starts_at']
+        indexes = [
+            models.Index(fields=['organizer', '-starts_at'], name='event_organizer_starts_idx'),
+        ]
+
+    def __str__(self):
+        return self.title
+
+    def save(self, *args, **kwargs):
+        self.region = region_for(self.country, self.city)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'country', 'city'}.intersection(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'region'}
+        super().save(*args, **kwargs)
+
+    @property
+    def effective_ends_at(self):
+        return self.ends_at or self.starts_at
+
+    @property
+    def is_listed(self):
+        return self.status == self.Status.PUBLISHED and self.effective_ends_at >= timezone.now()
+
+
+class FeedEntry(models.Model):
+    """
+    Denormalised copy of a listed event for the feeds, kept in sync by
+    events.feed.refresh_event() on every event change. Feeds read only
+    this table, through its (region, language, starts_at) indexes.
+    """
+    event = models.OneToOneField(Event, on_delete=models.CASCADE, related_name='feed_entry')
+    region = models.CharField(max_length=20, choices=Region.choices)
+    language = models.CharField(max_length=10, choices=settings.LANGUAGES)
+    starts_at = models.DateTimeField()
+    # Starts_at when the event has no end: entries past it are not shown
+    # and are pruned by the refresh_event_feed command
+    ends_at = models.DateTimeField()
+
+    title = models.CharField(max_length=200)
+    venue = models.CharField(max_length=200, blank=True)
+    city = models.CharField(max_length=100)
+    organizer_name = models.CharField(max_length=200, blank=True)
+
+    class Meta:
+        verbose_name = _('feed entry')
+        verbose_name_plural = _('feed entries')
+        ordering = ['starts_at', 'id']
+        indexes = [
+            models.Index(fields=['region', 'language', 'starts_at', 'id'], name='feed_region_language_idx'),
+            models.Index(fields=['language', 'starts_at', 'id'], name='feed_language_idx'),
+            models.Index(fields=['ends_at'], name='feed_ends_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.title} ({self.region}, {self.language})"
@@ -0,0 +1,59 @@
+"""
+Feed regions of the roadmap, derived from the free-text country and city
+of users and events.
+"""
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+from accounts.models import normalize_search_text
+
+
+class Region(models.TextChoices):
+    CARIBBEAN = 'caribbean', _('Caribbean')
+    LATIN_AMERICA = 'latin_america', _('Latin America')
+    NEW_YORK = 'new_york', _('New York')
+    LONDON = 'london', _('London')
+    OTHER = 'other', _('Other')
+
+
+# Normalized (normalize_search_text) country names, with common English,
+# Spanish, French and Kreyòl spellings and ISO codes
+CARIBBEAN_COUNTRIES = {
+    'haiti', 'ayiti', 'ht', 'dominican republic', 'republica dominicana', 'do',
+    'cuba', 'cu', 'jamaica', 'jm', 'puerto rico', 'pr', 'trinidad and tobago',
+    'trinidad', 'tt', 'barbados', 'bb', 'bahamas', 'the bahamas', 'bs',
+    'grenada', 'gd', 'saint lucia', 'st lucia', 'lc', 'dominica', 'dm',
+    'saint vincent and the grenadines', 'vc', 'antigua and barbuda', 'ag',
+    'saint kitts and nevis', 'kn', 'guadeloupe', 'gp', 'martinique', 'mq',
+    'curacao', 'cw', 'aruba', 'aw', 'cayman islands', 'ky', 'turks and caicos islands',
+    'tc', 'us virgin islands', 'vi', 'british virgin islands', 'vg', 'guyana', 'gy',
+    'suriname', 'sr', 'belize', 'bz',
+}
+LATIN_AMERICAN_COUNTRIES = {
+    'mexico', 'mx', 'guatemala', 'gt', 'honduras', 'hn', 'el salvador', 'sv',
+    'nicaragua', 'ni', 'costa rica', 'cr', 'panama', 'pa', 'colombia', 'co',
+    'venezuela', 've', 'ecuador', 'ec', 'peru', 'pe', 'bolivia', 'bo', 'chile', 'cl',
+    'argentina', 'ar', 'uruguay', 'uy', 'paraguay', 'py', 'brazil', 'brasil', 'br',
+}
+NEW_YORK_CITIES = {
+    'new york', 'new york city', 'nyc', 'ny', 'manhattan', 'brooklyn', 'queens',
+    'bronx', 'the bronx', 'staten island', 'nueva york',
+}
+LONDON_CITIES = {'london', 'londres'}
+UK_COUNTRIES = {'', 'uk', 'gb', 'united kingdom', 'great britain', 'england', 'reino unido'}
+US_COUNTRIES = {'', 'us', 'usa', 'united states', 'united states of america', 'estados unidos', 'etazini'}
+
+
+def region_for(country, city):
+    """Region of a country and city as typed by users and organizers"""
+    country = normalize_search_text(country)
+    city = normalize_search_text(city)
+    if city in NEW_YORK_CITIES and country in US_COUNTRIES:
+        return Region.NEW_YORK
+    if city in LONDON_CITIES and country in UK_COUNTRIES:
+        return Region.LONDON
+    if country in CARIBBEAN_COUNTRIES:
+        return Region.CARIBBEAN
+    if country in LATIN_AMERICAN_COUNTRIES:
+        return Region.LATIN_AMERICA
+    return Region.OTHER
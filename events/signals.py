@@ -0,0 +1,40 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from accounts.models import User, UserProfile
+from .feed import invalidate_feeds, refresh_event, refresh_organizer
+from .models import Event
+
+
+# User fields shown as the organizer name in the feeds
+ORGANIZER_NAME_FIELDS = {'first_name', 'last_name'}
+
+
+@receiver(post_save, sender=Event)
+def event_saved(sender, instance, **kwargs):
+    refresh_event(instance)
+
+
+@receiver(post_delete, sender=Event)
+def event_deleted(sender, instance, **kwargs):
+    # The feed entry goes with the event (CASCADE), also when its organizer is deleted
+    keys = {(instance.region, instance.language)}
+    transaction.on_commit(lambda: invalidate_feeds(keys))
+
+
+@receiver(post_save, sender=User)
+def organizer_saved(sender, instance, created, update_fields=None, **kwargs):
+    if instance.is_organizer and not created and (
+        update_fields is None or ORGANIZER_NAME_FIELDS.intersection(update_fields)
+    ):
+        refresh_organizer(instance)
+
+
+@receiver(post_save, sender=UserProfile)
+def organizer_profile_saved(sender, instance, created, update_fields=None, **kwargs):
+    # Only organizers have feed entries, and only business_name is shown
+    if created or (update_fields is not None and 'business_name' not in update_fields):
+        return
+    if instance.user.is_organizer:
+        refresh_organizer(instance.user)
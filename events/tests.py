@@ -0,0 +1,171 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import InvalidPage
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone, translation
+
+from accounts.models import User, UserProfile
+from . import feed
+from .feed import LOCAL_FEED_TTL, feed_page, nearby_feed
+from .models import Event, FeedEntry
+from .regions import Region
+
+
+def url(name, *args):
+    """``name`` reversed under the /en/ prefix (LANGUAGE_CODE is en-us)"""
+    with translation.override('en'):
+        return reverse(name, args=args)
+
+
+# No collectstatic manifest is needed for {% static %}
+STATIC_STORAGES = {**settings.STORAGES, 'staticfiles': {
+    'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage',
+}}
+
+
+class FeedTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.organizer = User.objects.create_user(
+            email='ana@example.com', first_name='Ana', last_name='Pierre',
+            role=User.UserRole.ORGANIZER,
+        )
+
+    def create_event(self, days=1, **fields):
+        fields = {
+            'organizer': self.organizer,
+            'title': 'Konpa night',
+            'city': 'Port-au-Prince',
+            'country': 'Haiti',
+            'starts_at': timezone.now() + timedelta(days=days),
+            'status': Event.Status.PUBLISHED,
+            **fields,
+        }
+        with self.captureOnCommitCallbacks(execute=True):
+            return Event.objects.create(**fields)
+
+
+class FeedEntryTests(FeedTestCase):
+    def test_listed_events_have_one_entry(self):
+        event = self.create_event()
+        entry = FeedEntry.objects.get(event=event)
+        self.assertEqual(entry.region, Region.CARIBBEAN)
+        self.assertEqual(entry.ends_at, event.starts_at)
+        self.assertEqual(entry.organizer_name, 'Ana Pierre')
+
+    def test_unlisted_events_lose_their_entry(self):
+        event = self.create_event()
+        event.status = Event.Status.CANCELLED
+        with self.captureOnCommitCallbacks(execute=True):
+            event.save()
+        self.assertFalse(FeedEntry.objects.exists())
+        self.assertFalse(FeedEntry.objects.filter(event=self.create_event(status=Event.Status.DRAFT)).exists())
+        self.assertFalse(FeedEntry.objects.filter(event=self.create_event(days=-1)).exists())
+
+    def test_moved_events_follow_their_region(self):
+        event = self.create_event()
+        event.city, event.country = 'Brooklyn', 'USA'
+        with self.captureOnCommitCallbacks(execute=True):
+            event.save(update_fields=['city', 'country'])
+        self.assertEqual(FeedEntry.objects.get(event=event).region, Region.NEW_YORK)
+
+    def test_only_organizer_business_names_are_refreshed(self):
+        self.create_event()
+        profile = UserProfile.objects.create(user=self.organizer)
+        profile.business_name = 'Ana Events'
+        with self.captureOnCommitCallbacks(execute=True):
+            profile.save()
+        self.assertEqual(FeedEntry.objects.get().organizer_name, 'Ana Events')
+
+        participant = User.objects.create_user(email='bo@example.com')
+        with mock.patch('events.signals.refresh_organizer') as refresh_organizer:
+            profile.save(update_fields=['business_description'])
+            other = UserProfile.objects.create(user=participant)
+            other.business_name = 'Bo'
+            other.save()
+        refresh_organizer.assert_not_called()
+
+    def test_unchanged_organizer_names_update_nothing(self):
+        self.create_event()
+        with self.assertNumQueries(2):
+            # The user update and the entries lookup
+            self.organizer.save()
+
+
+class FeedPageTests(FeedTestCase):
+    def test_pages_are_cached_until_an_event_of_the_feed_changes(self):
+        event = self.create_event()
+        self.assertEqual(len(feed_page('en', Region.CARIBBEAN)['entries']), 1)
+        self.assertEqual(len(feed_page('en')['entries']), 1)
+        with self.assertNumQueries(0):
+            feed_page('en', Region.CARIBBEAN)
+            feed_page('en')
+
+        event.title = 'Rara'
+        with self.captureOnCommitCallbacks(execute=True):
+            event.save()
+        self.assertEqual(feed_page('en', Region.CARIBBEAN)['entries'][0].title, 'Rara')
+        self.assertEqual(feed_page('en')['entries'][0].title, 'Rara')
+
+    def test_deleted_events_leave_the_feed(self):
+        event = self.create_event()
+        feed_page('en', Region.CARIBBEAN)
+        with self.captureOnCommitCallbacks(execute=True):
+            event.delete()
+        self.assertEqual(feed_page('en', Region.CARIBBEAN)['entries'], [])
+
+    @override_settings(EVENT_FEED_PAGE_SIZE=2)
+    def test_cursor_walks_the_feed_soonest_first(self):
+        events = [self.create_event(days=days) for days in (3, 1, 2)]
+        first = feed_page('en')
+        second = feed_page('en', cursor=first['next_cursor'])
+        ids = [entry.event_id for entry in first['entries'] + second['entries']]
+        self.assertEqual(ids, [events[1].pk, events[2].pk, events[0].pk])
+        self.assertIsNone(second['next_cursor'])
+
+    def test_invalid_cursors_raise_invalid_page(self):
+        with self.assertRaises(InvalidPage):
+            feed_page('en', cursor='!!!')
+
+    def test_pages_expire_with_their_first_ending_event(self):
+        self.create_event(days=0, starts_at=timezone.now() + timedelta(seconds=30))
+        with mock.patch.object(feed.cache, 'set') as cache_set:
+            feed_page('en')
+        self.assertLessEqual(cache_set.call_args.args[2], 31)
+
+    @override_settings(CACHE_IS_SHARED=False, EVENT_FEED_TTL=300)
+    def test_pages_are_kept_briefly_without_a_shared_cache(self):
+        with mock.patch.object(feed.cache, 'set') as cache_set:
+            feed_page('en')
+        self.assertEqual(cache_set.call_args.args[2], LOCAL_FEED_TTL)
+
+
+class NearbyFeedTests(FeedTestCase):
+    def test_users_see_their_region_or_every_region(self):
+        self.create_event()
+        haitian = User.objects.create_user(email='jo@example.com', country='Haiti', city='Jacmel')
+        londoner = User.objects.create_user(email='al@example.com', country='UK', city='London')
+
+        region, page = nearby_feed(haitian, 'en')
+        self.assertEqual(region, Region.CARIBBEAN)
+        self.assertEqual(len(page['entries']), 1)
+
+        region, page = nearby_feed(londoner, 'en')
+        self.assertIsNone(region)
+        self.assertEqual(len(page['entries']), 1)
+
+
+@override_settings(STORAGES=STATIC_STORAGES)
+class FeedViewTests(FeedTestCase):
+    def test_feed_lists_upcoming_events(self):
+        self.create_event()
+        response = self.client.get(url('events:feed'), {'region': Region.CARIBBEAN})
+        self.assertContains(response, 'Konpa night')
+
+    def test_invalid_regions_and_cursors_are_not_found(self):
+        self.assertEqual(self.client.get(url('events:feed'), {'region': 'mars'}).status_code, 404)
+        self.assertEqual(self.client.get(url('events:feed'), {'cursor': '!!!'}).status_code, 404)
@@ -0,0 +1,24 @@
+from django.core.paginator import InvalidPage
+from django.http import Http404
+from django.shortcuts import render
+from django.utils.translation import get_language
+
+from .feed import feed_page
+from .regions import Region
+
+
+def feed(request):
+    """Upcoming events in the current language: ?region=<region>&cursor=<next_cursor>"""
+    region = request.GET.get('region') or None
+    if region is not None and region not in Region.values:
+        raise Http404
+    try:
+        page = feed_page(get_language(), region, request.GET.get('cursor'))
+    except InvalidPage:
+        raise Http404
+    context = {
+        'feed': page,
+        'feed_region': region,
+        'feed_region_label': Region(region).label if region else None,
+    }
+    return render(request, 'events/feed.html', context)
@@ -0,0 +1,103 @@
+"""
+Gunicorn configuration, read automatically from the working directory:
+
+    gunicorn                      # app:app with gthread workers
+    GUNICORN_WORKER_CLASS=uvicorn gunicorn   # asgi:app with uvicorn workers
+
+Worker and thread counts follow the CPUs and memory of the container and
+can be pinned with WEB_CONCURRENCY / GUNICORN_THREADS.
+"""
+import gc
+import os
+
+
+def cpu_limit():
+    """CPUs available to the container (cgroup quota, affinity or count)"""
+    try:
+        quota, period = open('/sys/fs/cgroup/cpu.max').read().split()
+        if quota != 'max':
+            return max(1, int(int(quota) / int(period)))
+    except (OSError, ValueError):
+        pass
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def memory_limit_mb():
+    """Memory available to the container in MB (cgroup limit or physical)"""
+    for path in ('/sys/fs/cgroup/memory.max', '/sys/fs/cgroup/memory/memory.limit_in_bytes'):
+        try:
+            value = open(path).read().strip()
+        except OSError:
+            continue
+        # cgroup v1 reports "unlimited" as a huge number
+        if value != 'max' and int(value) < 1 << 60:
+            return int(value) // (1024 * 1024)
+    return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES') // (1024 * 1024)
+
+
+def env_int(name, default):
+    return int(os.environ.get(name) or default)
+
+
+# Worker type: gthread (WSGI, app.py) or uvicorn (ASGI, asgi.py)
+WORKER_TYPE = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+if WORKER_TYPE == 'uvicorn':
+    worker_class = 'uvicorn.workers.UvicornWorker'
+    wsgi_app = 'asgi:app'
+else:
+    worker_class = 'gthread'
+    wsgi_app = 'app:app'
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+
+# 2 x CPU + 1 workers, but no more than fit in memory next to the master
+WORKER_MEMORY_MB = env_int('GUNICORN_WORKER_MEMORY_MB', 150)
+workers = env_int(
+    'WEB_CONCURRENCY',
+    max(1, min(2 * cpu_limit() + 1, (memory_limit_mb() - WORKER_MEMORY_MB) // WORKER_MEMORY_MB)),
+)
+# Requests mostly wait on Postgres and Supabase, so threads add concurrency
+# cheaply (ignored by uvicorn workers, which run an event loop)
+threads = env_int('GUNICORN_THREADS', 4)
+
+# Import Django, templates and translation catalogs once in the master;
+# workers share those pages copy-on-write
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'True').lower() == 'true'
+
+# Recycle workers to bound slow memory growth, staggered so they do not
+# all restart at once
+max_requests = env_int('GUNICORN_MAX_REQUESTS', 1000)
+max_requests_jitter = env_int('GUNICORN_MAX_REQUESTS_JITTER', max_requests // 10)
+
+# Kill stuck workers, give in-flight requests time to finish on restart
+timeout = env_int('GUNICORN_TIMEOUT', 30)
+graceful_timeout = env_int('GUNICORN_GRACEFUL_TIMEOUT', 25)
+keepalive = env_int('GUNICORN_KEEPALIVE', 5)
+
+# Worker heartbeat files on tmpfs, a slow disk can trigger false timeouts
+if os.path.isdir('/dev/shm'):
+    worker_tmp_dir = '/dev/shm'
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG') or None
+errorlog = '-'
+
+
+def when_ready(server):
+    # Move everything loaded so far out of the collector's reach, so that
+    # collections in the workers do not touch (and copy) shared pages
+    if preload_app:
+        gc.freeze()
+    server.log.info(
+        'Starting %s %s workers x %s threads (max_requests=%s)',
+        workers, worker_class, threads, max_requests,
+    )
+
+
+def post_fork(server, worker):
+    # Never share a database connection opened in the master
+    if preload_app:
+        from django.db import connections
+        connections.close_all()
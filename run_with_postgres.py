@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+"""
+Run manage.py commands against a throwaway local PostgreSQL server.
+
+No Docker needed: uses initdb/pg_ctl from PATH (or the PG_BIN directory),
+creates a cluster in a temporary directory reachable only through a unix
+socket, and removes it afterwards. Must not run as root (initdb refuses).
+
+    python run_with_postgres.py                      # manage.py test
+    python run_with_postgres.py check_user_query_plans --users 100000
+"""
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+
+def find_binary(name):
+    """Locate a PostgreSQL binary in PG_BIN or PATH"""
+    pg_bin = os.environ.get('PG_BIN')
+    path = os.path.join(pg_bin, name) if pg_bin else shutil.which(name)
+    if not path or not os.path.exists(path):
+        sys.exit(f"❌ {name} not found. Install PostgreSQL or set PG_BIN")
+    return path
+
+
+def main():
+    """Start a temporary cluster, run the command, tear everything down"""
+    command = sys.argv[1:] or ['test']
+    initdb = find_binary('initdb')
+    pg_ctl = find_binary('pg_ctl')
+
+    workdir = tempfile.mkdtemp(prefix='tinggo-pg-')
+    data_dir = os.path.join(workdir, 'data')
+    socket_dir = os.path.join(workdir, 'socket')
+    os.mkdir(socket_dir)
+
+    try:
+        subprocess.run(
+            [initdb, '-D', data_dir, '-U', 'postgres', '--auth=trust', '-E', 'UTF8'],
+            check=True, stdout=subprocess.DEVNULL,
+        )
+        subprocess.run(
+            [pg_ctl, '-D', data_dir, '-l', os.path.join(workdir, 'postgres.log'), '-w',
+             '-o', f"-k {socket_dir} -c listen_addresses=''", 'start'],
+            check=True, stdout=subprocess.DEVNULL,
+        )
+        print(f"🐘 PostgreSQL running in {workdir}")
+
+        env = dict(os.environ, DATABASE_URL=f'postgres://postgres@/postgres?host={socket_dir}')
+        manage = [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'manage.py')]
+        if command[0] != 'test':
+            subprocess.run(manage + ['migrate', '--noinput', '-v', '0'], check=True, env=env)
+        result = subprocess.run(manage + command, env=env)
+    finally:
+        subprocess.run([pg_ctl, '-D', data_dir, '-m', 'fast', 'stop'],
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    sys.exit(result.returncode)
+
+
+if __name__ == "__main__":
+    main()
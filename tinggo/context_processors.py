@@ -0,0 +1,29 @@
+from django.conf import settings
+
+from .page_cache import CSRF_PLACEHOLDER
+from .static_assets import critical_css
+from .translations import catalog_version
+
+
+def page_cache(request):
+    """
+    Cache key parts for {% cache %} fragments, and a placeholder CSRF token
+    while a page is rendered for the shared anonymous page cache
+    """
+    context = {
+        # Recompiled translations change the catalog version, not the deploy
+        'CATALOG_VERSION': catalog_version(),
+        'DEPLOY_VERSION': settings.DEPLOY_VERSION,
+        'FRAGMENT_CACHE_TTL': settings.FRAGMENT_CACHE_TTL,
+    }
+    if getattr(request, 'page_cache_fill', False):
+        context['csrf_token'] = CSRF_PLACEHOLDER
+    return context
+
+
+def static_assets(request):
+    """
+    Critical CSS inlined in <head>; the full stylesheet loads without
+    blocking the first paint
+    """
+    return {'CRITICAL_CSS': critical_css()}
@@ -0,0 +1,44 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+
+_use_replica = ContextVar('use_replica', default=False)
+
+
+@contextmanager
+def read_from_replica():
+    """
+    Route reads inside the block to the 'replica' database when one is
+    configured (DATABASE_REPLICA_URL). Use it for lag-tolerant reads such as
+    dashboard statistics.
+    """
+    token = _use_replica.set(True)
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+
+class ReplicaRouter:
+    """
+    Send writes and migrations to 'default', and reads to 'replica' only
+    inside read_from_replica()
+    """
+
+    def db_for_read(self, model, **hints):
+        if _use_replica.get() and 'replica' in settings.DATABASES:
+            return 'replica'
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        # Explicit, otherwise Django writes an instance back to the database
+        # it was read from
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
@@ -0,0 +1,252 @@
+import json
+import logging
+import random
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.http import Http404, HttpResponse
+from django.utils.crypto import constant_time_compare
+
+
+logger = logging.getLogger('tinggo.performance')
+
+PHASES = ('db', 'supabase', 'template')
+# Upper bounds in seconds, Prometheus' default buckets
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_timings = ContextVar('request_timings', default=None)
+
+
+class RequestTimings:
+    """
+    Time spent per phase by the current request, in milliseconds.
+
+    Phases can overlap: queries run while a template renders count for
+    both db and template.
+    """
+    __slots__ = ('started', 'ms', 'counts', 'rendering')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        # Set while a template renders, so nested renders are not counted twice
+        self.rendering = False
+        self.ms = dict.fromkeys(PHASES, 0.0)
+        self.counts = dict.fromkeys(PHASES, 0)
+
+    def total_ms(self):
+        return (time.perf_counter() - self.started) * 1000
+
+
+def start_request():
+    """
+    Start timing a request, returns the token for finish_request()
+    """
+    return _timings.set(RequestTimings())
+
+
+def finish_request(token):
+    timings = _timings.get()
+    _timings.reset(token)
+    return timings
+
+
+def current_timings():
+    """
+    RequestTimings of the current request, or None outside a request
+    """
+    return _timings.get()
+
+
+def record_phase(phase, elapsed_ms):
+    """
+    Add ``elapsed_ms`` to ``phase`` of the current request (no-op outside one)
+    """
+    timings = _timings.get()
+    if timings is not None:
+        timings.ms[phase] += elapsed_ms
+        timings.counts[phase] += 1
+
+
+def time_query(execute, sql, params, many, context):
+    """
+    Database execute wrapper timing every query of the request
+    """
+    if _timings.get() is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        record_phase('db', (time.perf_counter() - started) * 1000)
+
+
+def install_query_timer(sender, connection, **kwargs):
+    # Runs on every new connection of a (reused) connection wrapper
+    if time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(time_query)
+
+
+connection_created.connect(install_query_timer)
+
+
+class Histogram:
+    __slots__ = ('buckets', 'sum', 'count')
+
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds):
+        self.buckets[bisect_left(BUCKETS, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+
+
+_metrics_lock = threading.Lock()
+_requests = {}
+_request_durations = {}
+_phase_durations = {phase: Histogram() for phase in PHASES}
+_phase_calls = dict.fromkeys(PHASES, 0)
+
+
+def record_request(request, response, timings, total_ms):
+    """
+    Count the request in the per-worker metrics and log it when slow
+    """
+    match = getattr(request, 'resolver_match', None)
+    view = match.view_name if match else 'unmatched'
+    labels = (view, request.method, f'{response.status_code // 100}xx')
+    with _metrics_lock:
+        _requests[labels] = _requests.get(labels, 0) + 1
+        histogram = _request_durations.get(labels[0])
+        if histogram is None:
+            histogram = _request_durations[labels[0]] = Histogram()
+        histogram.observe(total_ms / 1000)
+        for phase in PHASES:
+            if timings.counts[phase]:
+                _phase_durations[phase].observe(timings.ms[phase] / 1000)
+                _phase_calls[phase] += timings.counts[phase]
+
+    if total_ms >= settings.SLOW_REQUEST_MS and random.random() < settings.SLOW_REQUEST_SAMPLE_RATE:
+        logger.warning(json.dumps({
+            'event': 'slow_request',
+            'method': request.method,
+            # Without the query string, which may carry tokens
+            'path': request.path,
+            'view': view,
+            'status': response.status_code,
+            'total_ms': round(total_ms, 1),
+            **{f'{phase}_ms': round(timings.ms[phase], 1) for phase in PHASES},
+            **{f'{phase}_calls': timings.counts[phase] for phase in PHASES},
+        }))
+
+
+def server_timing(timings, total_ms):
+    """
+    Server-Timing header value, e.g. ``db;dur=3.1, supabase;dur=0.0, ...``.
+    Call counts are left out: they differ between e.g. a login for an
+    existing and an unknown email.
+    """
+    metrics = [f'{phase};dur={timings.ms[phase]:.1f}' for phase in PHASES]
+    metrics.append(f'total;dur={total_ms:.1f}')
+    return ', '.join(metrics)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels):
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + '}'
+
+
+def _histogram_lines(name, histogram, **labels):
+    cumulative = 0
+    for bound, count in zip(BUCKETS + ('+Inf',), histogram.buckets):
+        cumulative += count
+        yield f'{name}_bucket{_labels(**labels, le=bound)} {cumulative}'
+    yield f'{name}_sum{_labels(**labels) if labels else ""} {histogram.sum:.6f}'
+    yield f'{name}_count{_labels(**labels) if labels else ""} {histogram.count}'
+
+
+def render_metrics():
+    """
+    Metrics of this worker in the Prometheus text format
+    """
+    # Imported on scrape: the middleware and template backend load this
+    # module and should not pull in models
+    from accounts.backends import get_auth_stats
+    from . import supabase, supabase_async
+
+    lines = [
+        '# HELP tinggo_requests_total Requests by view, method and status class',
+        '# TYPE tinggo_requests_total counter',
+    ]
+    with _metrics_lock:
+        for (view, method, status), count in sorted(_requests.items()):
+            lines.append(f'tinggo_requests_total{_labels(view=view, method=method, status=status)} {count}')
+        lines += [
+            '# HELP tinggo_request_duration_seconds Request duration by view',
+            '# TYPE tinggo_request_duration_seconds histogram',
+        ]
+        for view, histogram in sorted(_request_durations.items()):
+            lines += _histogram_lines('tinggo_request_duration_seconds', histogram, view=view)
+        lines += [
+            '# HELP tinggo_request_phase_seconds Time per request spent in db, supabase and template',
+            '# TYPE tinggo_request_phase_seconds histogram',
+        ]
+        for phase, histogram in _phase_durations.items():
+            lines += _histogram_lines('tinggo_request_phase_seconds', histogram, phase=phase)
+        lines += [
+            '# HELP tinggo_request_phase_calls_total Queries, Supabase calls and renders within requests',
+            '# TYPE tinggo_request_phase_calls_total counter',
+        ]
+        for phase, count in _phase_calls.items():
+            lines.append(f'tinggo_request_phase_calls_total{_labels(phase=phase)} {count}')
+
+    clients = (('sync', supabase.get_client_stats()), ('async', supabase_async.get_client_stats()))
+    supabase_families = (
+        ('tinggo_supabase_calls_total', 'Supabase calls by operation', lambda op: op['calls']),
+        ('tinggo_supabase_errors_total', 'Failed Supabase calls by operation', lambda op: op['errors']),
+        ('tinggo_supabase_seconds_total', 'Time spent in Supabase calls by operation',
+         lambda op: f"{op['total_ms'] / 1000:.6f}"),
+    )
+    for name, help_text, value in supabase_families:
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} counter']
+        for client, stats in clients:
+            for operation, op in sorted(stats['operations'].items()):
+                lines.append(f'{name}{_labels(client=client, operation=operation)} {value(op)}')
+    lines += [
+        '# HELP tinggo_supabase_pool_total Client pool hits, misses and retries',
+        '# TYPE tinggo_supabase_pool_total counter',
+    ]
+    for client, stats in clients:
+        for event in ('pool_hits', 'pool_misses', 'retries'):
+            lines.append(f'tinggo_supabase_pool_total{_labels(client=client, event=event)} {stats[event]}')
+
+    lines += [
+        '# HELP tinggo_auth_events_total Login verification and user cache events',
+        '# TYPE tinggo_auth_events_total counter',
+    ]
+    for event, count in sorted(get_auth_stats().items()):
+        lines.append(f'tinggo_auth_events_total{_labels(event=event)} {count}')
+    return '\n'.join(lines) + '\n'
+
+
+def metrics(request):
+    """
+    Prometheus endpoint for this worker. Needs ``Authorization: Bearer
+    <METRICS_TOKEN>``; without a METRICS_TOKEN it only exists in DEBUG.
+    """
+    if settings.METRICS_TOKEN:
+        header = request.headers.get('Authorization', '')
+        if not constant_time_compare(header, f'Bearer {settings.METRICS_TOKEN}'):
+            raise Http404
+    elif not settings.DEBUG:
+        raise Http404
+    return HttpResponse(render_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,51 @@
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.utils.decorators import sync_and_async_middleware
+
+from .instrumentation import finish_request, record_request, server_timing, start_request
+from .translations import reload_translations_if_changed
+
+
+@sync_and_async_middleware
+def translation_reload_middleware(get_response):
+    """
+    Pick up recompiled translations without restarting workers.
+    Place before LocaleMiddleware.
+    """
+    # A few stat() calls at most every TRANSLATION_RELOAD_INTERVAL seconds,
+    # cheap enough to run inline under ASGI too
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            reload_translations_if_changed()
+            return await get_response(request)
+    else:
+        def middleware(request):
+            reload_translations_if_changed()
+            return get_response(request)
+    return middleware
+
+
+@sync_and_async_middleware
+def instrumentation_middleware(get_response):
+    """
+    Time the request and its db, supabase and template phases: adds a
+    Server-Timing header, feeds /internal/metrics and logs slow requests.
+    Place first so the total covers the whole middleware stack.
+    """
+    def finish(request, response, token):
+        timings = finish_request(token)
+        total_ms = timings.total_ms()
+        if settings.SERVER_TIMING:
+            response['Server-Timing'] = server_timing(timings, total_ms)
+        record_request(request, response, timings, total_ms)
+        return response
+
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            token = start_request()
+            return finish(request, await get_response(request), token)
+    else:
+        def middleware(request):
+            token = start_request()
+            return finish(request, get_response(request), token)
+    return middleware
@@ -0,0 +1,111 @@
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from django.utils.translation import get_language
+
+from .translations import catalog_version
+
+
+CSRF_PLACEHOLDER = 'csrf-token-placeholder-0c1f7a'
+# Stale pages are kept this many TTLs so one request can re-render while
+# the others keep serving the old copy
+STALE_FACTOR = 10
+RENDER_LOCK_TIMEOUT = 30
+
+
+def page_cache_key(request):
+    """
+    Key of the cached page for the request path, language and deploy.
+    The query string is ignored (campaign links add utm_* parameters).
+    """
+    path = hashlib.sha256(request.path.encode()).hexdigest()[:32]
+    return f'page:{settings.DEPLOY_VERSION}:{catalog_version()}:{get_language()}:{path}'
+
+
+def is_cacheable(request):
+    return (
+        settings.PAGE_CACHE_TTL > 0
+        and request.method in ('GET', 'HEAD')
+        and not request.user.is_authenticated
+        # Pending messages (e.g. "logged out") belong to this visitor only
+        and not len(get_messages(request))
+    )
+
+
+def cache_anonymous_page(view):
+    """
+    Serve anonymous GET requests of ``view`` from a shared page cache.
+
+    Pages are rendered with a placeholder CSRF token that is replaced by the
+    visitor's own token on every hit, and carry an ETag and Last-Modified
+    so revalidating browsers get a 304. The ETag of a page with a token
+    also covers the visitor's CSRF secret, and such pages have no
+    Last-Modified, so a 304 never keeps a page with an outdated token. Logged-in users, other methods and
+    requests with pending messages always run the view.
+    """
+    @wraps(view)
+    def wrapped(request, *args, **kwargs):
+        if not is_cacheable(request):
+            return view(request, *args, **kwargs)
+
+        key = page_cache_key(request)
+        entry = cache.get(key)
+        stale = entry is None or entry['expires'] < time.time()
+        # Only the request that wins the lock renders, unless there is
+        # nothing at all to serve
+        if stale and (entry is None or cache.add(f'{key}:lock', 1, RENDER_LOCK_TIMEOUT)):
+            try:
+                request.page_cache_fill = True
+                response = view(request, *args, **kwargs)
+                request.page_cache_fill = False
+                if response.status_code != 200 or response.streaming or response.cookies:
+                    return response
+                body = response.content
+                entry = {
+                    'body': body,
+                    'content_type': response['Content-Type'],
+                    'etag': hashlib.sha256(body).hexdigest()[:32],
+                    'has_csrf_token': CSRF_PLACEHOLDER.encode() in body,
+                    'last_modified': time.time(),
+                    'expires': time.time() + settings.PAGE_CACHE_TTL,
+                }
+                cache.set(key, entry, settings.PAGE_CACHE_TTL * STALE_FACTOR)
+            finally:
+                # Also after an uncacheable response or an error, so the
+                # next request renders instead of serving stale for
+                # RENDER_LOCK_TIMEOUT
+                cache.delete(f'{key}:lock')
+
+        response = HttpResponse(
+            entry['body'].replace(CSRF_PLACEHOLDER.encode(), get_token(request).encode()),
+            content_type=entry['content_type'],
+        )
+        etag, last_modified = entry['etag'], int(entry['last_modified'])
+        if entry['has_csrf_token']:
+            # get_token() masks the secret differently on every call; the
+            # secret itself only changes when the token is rotated
+            secret = request.META['CSRF_COOKIE']
+            etag = hashlib.sha256(f'{etag}:{secret}'.encode()).hexdigest()[:32]
+            last_modified = None
+        else:
+            response['Last-Modified'] = http_date(last_modified)
+        etag = f'W/"{etag}"'
+        response['ETag'] = etag
+        # The body holds the visitor's CSRF token: browsers may keep it but
+        # must revalidate, shared caches must not store it
+        patch_cache_control(response, private=True, no_cache=True)
+        return get_conditional_response(
+            request,
+            etag=etag,
+            last_modified=last_modified,
+            response=response,
+        )
+    return wrapped
@@ -0,0 +1,146 @@
+"""
+Keyset (cursor) pagination and cheap row counts for large tables.
+
+OFFSET pagination reads and discards every row before the page, and a
+page count needs COUNT(*) over the whole result: both grow with the
+table. A keyset page instead continues from the last row shown
+("created before this row"), an index range scan of one page whatever
+its depth.
+"""
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import InvalidPage
+from django.db import connections
+from django.db.models import Q
+
+
+# Below this estimate the exact count is cheap enough to show instead
+EXACT_COUNT_BELOW = 10_000
+
+
+class KeysetPage:
+    def __init__(self, object_list, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+
+class KeysetPaginator:
+    """
+    Pages of ``queryset`` in ``ordering``, which must be unique (end with
+    the primary key) and covered by an index, newest first by default:
+
+        page = KeysetPaginator(User.objects.all(), 50).page(request.GET.get('cursor'))
+        page.object_list, page.next_cursor, page.previous_cursor
+
+    Cursors are opaque strings naming the row to continue from and the
+    direction; a malformed one raises InvalidPage.
+    """
+
+    def __init__(self, queryset, per_page, ordering=('-created_at', '-id')):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.ordering = tuple(ordering)
+        opts = queryset.model._meta
+        self.fields = [
+            opts.pk if name.lstrip('-') == 'pk' else opts.get_field(name.lstrip('-'))
+            for name in self.ordering
+        ]
+
+    def encode_cursor(self, obj, forward=True):
+        values = [field.value_from_object(obj) for field in self.fields]
+        # str() keeps microseconds, which DjangoJSONEncoder would truncate
+        payload = json.dumps(['>' if forward else '<', values], default=str)
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        """(forward, values) of a cursor from encode_cursor"""
+        try:
+            payload = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            direction, values = json.loads(payload)
+            if direction not in ('>', '<') or len(values) != len(self.fields):
+                raise ValueError(cursor)
+            return direction == '>', [field.to_python(value) for field, value in zip(self.fields, values)]
+        # to_python() raises ValidationError for values of the wrong type
+        except (ValueError, TypeError, UnicodeDecodeError, binascii.Error, ValidationError) as error:
+            raise InvalidPage(f'Invalid cursor: {cursor!r}') from error
+
+    def _beyond(self, values, forward):
+        """Q for rows after ``values`` in the ordering, or before if not ``forward``"""
+        condition = Q()
+        # (a, b) after (x, y) is a > x OR (a = x AND b > y), with > flipped for
+        # descending fields and going backwards
+        for i in reversed(range(len(self.fields))):
+            name = self.fields[i].attname
+            lookup = 'lt' if self.ordering[i].startswith('-') == forward else 'gt'
+            later = Q(**{f'{name}__{lookup}': values[i]})
+            condition = later if i == len(self.fields) - 1 else later | (Q(**{name: values[i]}) & condition)
+        return condition
+
+    def page(self, cursor=None):
+        forward, values = self.decode_cursor(cursor) if cursor else (True, None)
+        queryset = self.queryset
+        if values is not None:
+            queryset = queryset.filter(self._beyond(values, forward))
+        ordering = self.ordering if forward else [
+            name[1:] if name.startswith('-') else f'-{name}' for name in self.ordering
+        ]
+        # One extra row tells whether there is a further page
+        rows = list(queryset.order_by(*ordering)[:self.per_page + 1])
+        more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if not forward:
+            rows.reverse()
+        if not rows:
+            return KeysetPage(rows, None, None)
+        has_next, has_previous = (more, values is not None) if forward else (True, more)
+        return KeysetPage(
+            rows,
+            self.encode_cursor(rows[-1]) if has_next else None,
+            self.encode_cursor(rows[0], forward=False) if has_previous else None,
+        )
+
+
+def approximate_count(queryset):
+    """
+    Row count of the table behind an unfiltered ``queryset`` from the
+    planner statistics (PostgreSQL reltuples, SQLite sqlite_stat1), with
+    whether it is approximate. Small or never analyzed tables are counted
+    exactly.
+    """
+    connection = connections[queryset.db]
+    table = queryset.model._meta.db_table
+    estimate = None
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass', [table])
+            row = cursor.fetchone()
+            # -1 until the first ANALYZE
+            if row and row[0] >= 0:
+                estimate = row[0]
+        elif connection.vendor == 'sqlite' and 'sqlite_stat1' in connection.introspection.table_names(cursor):
+            # One row per index, "<rows> <rows per key>..."
+            cursor.execute('SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1', [table])
+            row = cursor.fetchone()
+            if row:
+                estimate = int(row[0].split()[0])
+    if estimate is None or estimate < EXACT_COUNT_BELOW:
+        return queryset.count(), False
+    return estimate, True
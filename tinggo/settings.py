@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
 from pathlib import Path
+from urllib.parse import parse_qsl, unquote, urlparse
 import os
 from .config import *
 
@@ -44,13 +45,21 @@ INSTALLED_APPS = [
     # Third party apps
     'crispy_forms',
     'crispy_tailwind',
-    'tailwind',
     'theme',
     
     # Local apps
     'accounts',
+    'events',
 ]
 
+# Development-only apps: django-tailwind's `tailwind` commands and
+# django-extensions. Production builds CSS with npm in build.sh.
+if DEBUG:
+    INSTALLED_APPS += [
+        'tailwind',
+        'django_extensions',
+    ]
+
 TAILWIND_APP_NAME = 'theme'
 
 # NPM path for development only
@@ -59,9 +68,11 @@ if DEBUG:
 
 
 MIDDLEWARE = [
+    'tinggo.middleware.instrumentation_middleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',  # For static files in production
     'django.contrib.sessions.middleware.SessionMiddleware',
+    'tinggo.middleware.translation_reload_middleware',
     'django.middleware.locale.LocaleMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -69,6 +80,10 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
+# WhiteNoiseMiddleware is sync-only; asgi.py serves static files in front
+# of Django instead, so async requests stay on the event loop
+if not STATIC_FILES_MIDDLEWARE:
+    MIDDLEWARE.remove('whitenoise.middleware.WhiteNoiseMiddleware')
 
 ROOT_URLCONF = 'tinggo.urls'
 
@@ -91,7 +106,11 @@ LOCALE_PATHS = [
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates timing renders for the Server-Timing header
+        'BACKEND': 'tinggo.templating.InstrumentedDjangoTemplates',
+        # Named like the stock backend: engines['django'] is looked up by
+        # warm_templates() and check_templates
+        'NAME': 'django',
         'DIRS': [BASE_DIR / 'templates'],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -100,11 +119,25 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
                 'django.template.context_processors.i18n',
+                'tinggo.context_processors.page_cache',
+                'tinggo.context_processors.static_assets',
             ],
         },
     },
 ]
 
+# In production templates are parsed once per process by the cached loader
+# (warmed at boot by tinggo.templating.warm_templates). In DEBUG Django's
+# default loaders reload changed templates.
+if not DEBUG:
+    TEMPLATES[0]['APP_DIRS'] = False
+    TEMPLATES[0]['OPTIONS']['loaders'] = [
+        ('django.template.loaders.cached.Loader', [
+            'django.template.loaders.filesystem.Loader',
+            'django.template.loaders.app_directories.Loader',
+        ]),
+    ]
+
 WSGI_APPLICATION = 'tinggo.wsgi.application'
 
 # Site ID for django.contrib.sites
@@ -115,8 +148,9 @@ CRISPY_ALLOWED_TEMPLATE_PACKS = "tailwind"
 CRISPY_TEMPLATE_PACK = "tailwind"
 
 # Authentication Settings
+# SupabaseBackend extends ModelBackend; see AUTH_AUTHORITY in config.py
 AUTHENTICATION_BACKENDS = [
-    'django.contrib.auth.backends.ModelBackend',
+    'accounts.backends.SupabaseBackend',
 ]
 
 LOGIN_REDIRECT_URL = '/'
@@ -129,9 +163,57 @@ LOGOUT_URL = '/accounts/logout/'
 # Email settings
 EMAIL_BACKEND = EMAIL_BACKEND
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+def cache_config(url):
+    """
+    CACHES entry for a CACHE_URL (locmem://, redis://, rediss://,
+    memcached://host:port or dummy://)
+    """
+    parsed = urlparse(url)
+    backends = {
+        'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+        'redis': 'django.core.cache.backends.redis.RedisCache',
+        'rediss': 'django.core.cache.backends.redis.RedisCache',
+        'memcached': 'django.core.cache.backends.memcached.PyMemcacheCache',
+        'dummy': 'django.core.cache.backends.dummy.DummyCache',
+    }
+    if parsed.scheme not in backends:
+        raise ValueError(f'Unsupported CACHE_URL scheme: {parsed.scheme!r}')
+
+    cache = {
+        'BACKEND': backends[parsed.scheme],
+        'TIMEOUT': CACHE_TIMEOUT,
+        'KEY_PREFIX': 'tinggo',
+    }
+    if parsed.scheme in ('redis', 'rediss'):
+        cache['LOCATION'] = url
+    elif parsed.scheme == 'memcached':
+        cache['LOCATION'] = parsed.netloc
+    elif parsed.scheme == 'locmem':
+        cache['LOCATION'] = parsed.netloc or 'tinggo'
+        cache['OPTIONS'] = {'MAX_ENTRIES': 10000}
+    return cache
+
+
+CACHES = {
+    'default': cache_config(CACHE_URL),
+}
+# Whether every gunicorn worker sees the same cache; locmem is per process,
+# so anything invalidated through it must not be cached there
+CACHE_IS_SHARED = urlparse(CACHE_URL).scheme in ('redis', 'rediss', 'memcached')
+
 # Session settings - автоматическое запоминание пользователей
 SESSION_COOKIE_AGE = 60 * 60 * 24 * 30  # 30 дней
 SESSION_EXPIRE_AT_BROWSER_CLOSE = False
+# С общим кэшем сессии читаются из него, БД только при промахе кэша и при
+# записи. С locmem у каждого воркера свой кэш: сессия, удаленная при выходе
+# в одном воркере, осталась бы живой в остальных, поэтому тогда - db.
+SESSION_BACKEND = SESSION_BACKEND or ('cached_db' if CACHE_IS_SHARED else 'db')
+if SESSION_BACKEND == 'cached_db' and not CACHE_IS_SHARED and not DEBUG:
+    raise ValueError('SESSION_BACKEND=cached_db needs a shared CACHE_URL (redis:// or memcached://)')
+SESSION_ENGINE = f'django.contrib.sessions.backends.{SESSION_BACKEND}'
 
 # Custom User Model
 AUTH_USER_MODEL = 'accounts.User'
@@ -144,13 +226,73 @@ MEDIA_ROOT = BASE_DIR / 'media'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-# Используем SQLite для разработки, Supabase для продакшена
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+def postgres_database(url):
+    """
+    DATABASES entry for a postgres:// URL.
+
+    Query parameters go to OPTIONS (e.g. ?sslmode=require); ?host=/path
+    connects through a unix socket directory.
+    """
+    parsed = urlparse(url)
+    options = dict(parse_qsl(parsed.query))
+    database = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': unquote(parsed.path.lstrip('/')),
+        'USER': unquote(parsed.username or ''),
+        'PASSWORD': unquote(parsed.password or ''),
+        'HOST': options.pop('host', parsed.hostname or ''),
+        'PORT': str(parsed.port or ''),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': options,
+    }
+    if DB_POOL:
+        # Pooled connections cannot also be persistent
+        database['CONN_MAX_AGE'] = 0
+        options['pool'] = {
+            'min_size': DB_POOL_MIN_SIZE,
+            'max_size': DB_POOL_MAX_SIZE,
+            'timeout': DB_POOL_TIMEOUT,
+        }
+    else:
+        database['CONN_MAX_AGE'] = DB_CONN_MAX_AGE
+    return database
+
+
+# Используем SQLite для разработки, PostgreSQL (DATABASE_URL) для продакшена
+if DATABASE_URL:
+    DATABASES = {
+        'default': postgres_database(DATABASE_URL),
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db.sqlite3',
+        }
     }
+
+if DATABASE_REPLICA_URL:
+    DATABASES['replica'] = postgres_database(DATABASE_REPLICA_URL)
+    DATABASES['replica']['TEST'] = {'MIRROR': 'default'}
+
+# Reads inside tinggo.db_router.read_from_replica() go to the replica
+DATABASE_ROUTERS = ['tinggo.db_router.ReplicaRouter']
+
+
+# Password hashing: PASSWORD_HASHER hashes new passwords, the others still
+# verify existing hashes (upgraded on the next login). Costs in config.py.
+_PASSWORD_HASHERS = {
+    'pbkdf2': 'accounts.hashers.PBKDF2PasswordHasher',
+    'argon2': 'accounts.hashers.Argon2PasswordHasher',
+    'bcrypt': 'accounts.hashers.BCryptSHA256PasswordHasher',
+    'scrypt': 'django.contrib.auth.hashers.ScryptPasswordHasher',
 }
+PASSWORD_HASHERS = [
+    _PASSWORD_HASHERS[PASSWORD_HASHER],
+    *(path for name, path in _PASSWORD_HASHERS.items() if name != PASSWORD_HASHER),
+    # Verify-only, in Django's default list: hashes from older installs
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+]
 
 
 # Password validation
@@ -198,8 +340,23 @@ STATICFILES_DIRS = [
     BASE_DIR / 'static',
 ]
 
-# WhiteNoise configuration for static files
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+# WhiteNoise: collectstatic fingerprints every file (styles.<hash>.css) and
+# writes .gz and .br (with the Brotli package) variants next to it. Served
+# files carrying a hash get `Cache-Control: max-age=315360000, public, immutable`.
+# (STATICFILES_STORAGE is no longer read by Django 5.1+, STORAGES is.)
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage',
+    },
+}
+# Files referenced without a hash (rare) may be cached for a day
+WHITENOISE_MAX_AGE = 0 if DEBUG else 86400
+
+# Above-the-fold CSS for base.html, inlined into every page
+CRITICAL_CSS_PATH = 'css/dist/critical.css'
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
@@ -217,3 +374,26 @@ if not DEBUG:
     SESSION_COOKIE_SECURE = True
     CSRF_COOKIE_SECURE = True
     X_FRAME_OPTIONS = 'DENY'
+
+# Slow-request records from tinggo.instrumentation are one JSON object per
+# line on stderr, for the log drain to parse
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'json_line': {'format': '%(message)s'},
+    },
+    'handlers': {
+        'performance': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'json_line',
+        },
+    },
+    'loggers': {
+        'tinggo.performance': {
+            'handlers': ['performance'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
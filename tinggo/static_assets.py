@@ -0,0 +1,32 @@
+from functools import lru_cache
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.utils.safestring import mark_safe
+
+
+def read_critical_css():
+    """
+    Contents of the critical CSS built by `npm run build`, or '' when it has
+    not been built (the full stylesheet is then linked as usual)
+    """
+    path = finders.find(settings.CRITICAL_CSS_PATH)
+    if not path:
+        return ''
+    with open(path, encoding='utf-8') as file:
+        # A stray </style> would end the inline block early
+        return mark_safe(file.read().replace('</', '<\\/'))
+
+
+# Read once per process; it only changes with a deploy
+_cached_critical_css = lru_cache(maxsize=1)(read_critical_css)
+
+
+def critical_css():
+    """
+    Critical CSS for inlining in base.html, re-read on every call in DEBUG
+    so `npm run dev` changes show up
+    """
+    if settings.DEBUG:
+        return read_critical_css()
+    return _cached_critical_css()
@@ -0,0 +1,39 @@
+"""
+Static files for the ASGI entry point.
+
+WhiteNoiseMiddleware is sync-only: in the ASGI middleware chain it would
+send every request through a thread and undo the async views. Under ASGI
+it is left out (STATIC_FILES_MIDDLEWARE) and StaticFilesApplication serves
+the same files, with the same WHITENOISE_* settings, in front of Django.
+"""
+from asgiref.wsgi import WsgiToAsgi
+from whitenoise.base import WhiteNoise
+from whitenoise.middleware import WhiteNoiseMiddleware
+from whitenoise.string_utils import decode_path_info
+
+
+class StaticFilesApplication:
+    """ASGI app serving STATIC_ROOT files and passing other requests to ``application``"""
+
+    def __init__(self, application):
+        self.application = application
+        # Configured from settings like the middleware, but only used for
+        # its file index
+        self.whitenoise = WhiteNoiseMiddleware()
+        # Files are read in a thread, only for static requests
+        self.serve = WsgiToAsgi(self.serve_wsgi)
+
+    def find(self, path):
+        if self.whitenoise.autorefresh:
+            return self.whitenoise.find_file(path)
+        return self.whitenoise.files.get(path)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'http' and self.find(scope['path']) is not None:
+            await self.serve(scope, receive, send)
+        else:
+            await self.application(scope, receive, send)
+
+    def serve_wsgi(self, environ, start_response):
+        static_file = self.find(decode_path_info(environ['PATH_INFO']))
+        return WhiteNoise.serve(static_file, environ, start_response)
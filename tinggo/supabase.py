@@ -1,24 +1,291 @@
+from __future__ import annotations
+
 import os
-from typing import Optional, Dict, Any
-from supabase import create_client, Client
-from .config import SUPABASE_URL, SUPABASE_KEY
+import random
+import threading
+import time
+from itertools import islice
+from typing import TYPE_CHECKING, Optional, Dict, Any, Callable, Iterable
+
+from .config import (
+    SUPABASE_URL,
+    SUPABASE_KEY,
+    SUPABASE_SERVICE_KEY,
+    SUPABASE_TIMEOUT,
+    SUPABASE_CONNECT_TIMEOUT,
+    SUPABASE_MAX_CONNECTIONS,
+    SUPABASE_MAX_KEEPALIVE,
+    SUPABASE_KEEPALIVE_EXPIRY,
+    SUPABASE_MAX_RETRIES,
+    SUPABASE_RETRY_BACKOFF,
+    SUPABASE_RETRY_BACKOFF_MAX,
+    SUPABASE_UPSERT_BATCH_SIZE,
+)
+from .instrumentation import record_phase
+
+# The Supabase SDK and httpx take a few hundred milliseconds to import, so
+# they are imported where a client is first needed rather than at startup
+# (most requests never call Supabase).
+if TYPE_CHECKING:
+    import httpx
+    from supabase import Client
+
+
+# Client kinds: table queries use the anon key only, auth calls get their own
+# client so a sign-in never swaps the bearer token used for table queries.
+# The admin client uses the service_role key for the Auth admin API.
+DATA_CLIENT = 'data'
+AUTH_CLIENT = 'auth'
+ADMIN_CLIENT = 'admin'
+
+
+def _connect_errors():
+    """
+    Errors raised before the request reached Supabase, safe to retry for any call
+    """
+    import httpx
+    return (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+class SupabaseUnavailable(Exception):
+    """
+    Supabase could not be reached or failed on its side
+    """
+
+
+def _transport_error(error: Exception) -> Optional[httpx.TransportError]:
+    """
+    Return the httpx transport error behind ``error``, if any.
+
+    gotrue wraps network failures in AuthRetryableError, keeping the original
+    httpx exception as the context.
+    """
+    import httpx
+    from gotrue.errors import AuthRetryableError
+
+    if isinstance(error, httpx.TransportError):
+        return error
+    if isinstance(error, AuthRetryableError) and isinstance(error.__context__, httpx.TransportError):
+        return error.__context__
+    return None
+
+
+def _credentials_rejected(error: Exception) -> bool:
+    """
+    True when Supabase Auth answered and refused the credentials
+    """
+    from gotrue.errors import AuthApiError, AuthRetryableError, CustomAuthError
+
+    return (
+        isinstance(error, (AuthApiError, CustomAuthError))
+        and not isinstance(error, AuthRetryableError)
+        and error.status < 500
+    )
+
+
+class SupabaseClientPool:
+    """
+    Per-process pool of Supabase clients with keep-alive HTTP connections.
+
+    Clients are created once per thread and reused across requests. After a
+    fork (gunicorn workers) the child drops everything inherited from the
+    parent and builds fresh connections on first use.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """
+        Forget all clients and counters (called in forked children)
+        """
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._local = threading.local()
+        self._stats = {
+            'pool_hits': 0,
+            'pool_misses': 0,
+            'retries': 0,
+            'operations': {},
+        }
+
+    def _client_settings(self):
+        """
+        Timeout, connection limits and client options shared by all clients
+        """
+        import httpx
+        from supabase.lib.client_options import ClientOptions
+
+        timeout = httpx.Timeout(SUPABASE_TIMEOUT, connect=SUPABASE_CONNECT_TIMEOUT)
+        limits = httpx.Limits(
+            max_connections=SUPABASE_MAX_CONNECTIONS,
+            max_keepalive_connections=SUPABASE_MAX_KEEPALIVE,
+            keepalive_expiry=SUPABASE_KEEPALIVE_EXPIRY,
+        )
+        options = ClientOptions(
+            persist_session=False,
+            auto_refresh_token=False,
+            postgrest_client_timeout=timeout,
+        )
+        return timeout, limits, options
+
+    def _api_key(self, kind: str) -> str:
+        if kind != ADMIN_CLIENT:
+            return SUPABASE_KEY
+        if not SUPABASE_SERVICE_KEY:
+            raise SupabaseUnavailable('SUPABASE_SERVICE_KEY is not set')
+        return SUPABASE_SERVICE_KEY
+
+    def _build_client(self, kind: str = DATA_CLIENT) -> Client:
+        from supabase import create_client
+
+        timeout, limits, options = self._client_settings()
+        client = create_client(SUPABASE_URL, self._api_key(kind), options)
+
+        # supabase-py does not expose connection limits, so replace the
+        # underlying httpx sessions with ones using our pool settings.
+        postgrest = client.postgrest
+        session = postgrest.session
+        postgrest.session = session.__class__(
+            base_url=session.base_url,
+            headers=session.headers,
+            timeout=timeout,
+            limits=limits,
+        )
+        session.close()
+
+        auth_session = client.auth._http_client
+        client.auth._http_client = auth_session.__class__(
+            timeout=timeout,
+            limits=limits,
+            follow_redirects=True,
+        )
+        auth_session.close()
+        return client
+
+    def get(self, kind: str = DATA_CLIENT) -> Client:
+        """
+        Return the pooled client of the given kind for the current thread
+        """
+        if os.getpid() != self._pid:
+            self.reset()
+
+        clients = getattr(self._local, 'clients', None)
+        if clients is None:
+            clients = self._local.clients = {}
+
+        client = clients.get(kind)
+        if client is None:
+            client = clients[kind] = self._build_client(kind)
+            self._increment('pool_misses')
+        else:
+            self._increment('pool_hits')
+        return client
+
+    def execute(self, operation: str, call: Callable[[Client], Any],
+                kind: str = DATA_CLIENT, idempotent: bool = True) -> Any:
+        """
+        Run ``call(client)`` with latency tracking and retry/backoff.
+
+        Transport errors are retried up to SUPABASE_MAX_RETRIES times.
+        Non-idempotent calls are only retried when the request never left
+        this process (connection errors).
+        """
+        attempt = 0
+        while True:
+            client = self.get(kind)
+            started = time.perf_counter()
+            try:
+                result = call(client)
+            except Exception as e:
+                self._record(operation, started, failed=True)
+                delay = self._retry_delay(e, attempt, idempotent)
+                if delay is None:
+                    raise
+                self._increment('retries')
+                time.sleep(delay)
+                attempt += 1
+                continue
+            self._record(operation, started)
+            return result
+
+    def _retry_delay(self, error: Exception, attempt: int, idempotent: bool) -> Optional[float]:
+        """
+        Seconds to wait before retrying after ``error``, or None to give up
+        """
+        transport_error = _transport_error(error)
+        if transport_error is None or attempt >= SUPABASE_MAX_RETRIES:
+            return None
+        if not idempotent and not isinstance(transport_error, _connect_errors()):
+            return None
+        delay = min(SUPABASE_RETRY_BACKOFF * (2 ** attempt), SUPABASE_RETRY_BACKOFF_MAX)
+        return delay * random.uniform(0.5, 1.0)
+
+    def _increment(self, key: str):
+        with self._lock:
+            self._stats[key] += 1
+
+    def _record(self, operation: str, started: float, failed: bool = False):
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        record_phase('supabase', elapsed_ms)
+        with self._lock:
+            op = self._stats['operations'].setdefault(operation, {
+                'calls': 0,
+                'errors': 0,
+                'total_ms': 0.0,
+                'max_ms': 0.0,
+            })
+            op['calls'] += 1
+            op['total_ms'] += elapsed_ms
+            op['max_ms'] = max(op['max_ms'], elapsed_ms)
+            if failed:
+                op['errors'] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Snapshot of pool-hit and latency counters for this worker
+        """
+        with self._lock:
+            operations = {name: dict(op) for name, op in self._stats['operations'].items()}
+            return {
+                'pid': self._pid,
+                'pool_hits': self._stats['pool_hits'],
+                'pool_misses': self._stats['pool_misses'],
+                'retries': self._stats['retries'],
+                'operations': operations,
+            }
+
+
+_pool = SupabaseClientPool()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_pool.reset)
 
 
 def get_supabase_client() -> Client:
     """
-    Get Supabase client instance
+    Get pooled Supabase client instance for table queries
+    """
+    return _pool.get(DATA_CLIENT)
+
+
+def get_client_stats() -> Dict[str, Any]:
+    """
+    Get Supabase pool-hit and latency counters for the current worker
     """
-    return create_client(SUPABASE_URL, SUPABASE_KEY)
+    return _pool.stats()
 
 
 def test_supabase_connection():
     """
     Test connection to Supabase
     """
-    client = get_supabase_client()
     try:
         # Simple query to test connection
-        response = client.table('user_profiles').select('count').limit(1).execute()
+        response = _pool.execute(
+            'test_connection',
+            lambda client: client.table('user_profiles').select('count').limit(1).execute(),
+        )
         print("✅ Supabase connection successful!")
         return True
     except Exception as e:
@@ -26,35 +293,95 @@ def test_supabase_connection():
         return False
 
 
+# User fields stored in user_profiles columns of the same name
+USER_PROFILE_FIELDS = ('email', 'first_name', 'last_name', 'role', 'country', 'city', 'language')
+
+
+def build_user_profile_data(user, fields: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    """
+    Build the user_profiles row for a User.
+
+    When ``fields`` is given only those columns are included, so an upsert
+    leaves the other columns untouched. user_id and email are always sent:
+    Postgres checks NOT NULL columns before resolving the upsert conflict.
+    """
+    data = {
+        'user_id': user.id,
+        **{name: getattr(user, name) for name in USER_PROFILE_FIELDS},
+        'created_at': user.created_at.isoformat() if user.created_at else None,
+        'updated_at': user.updated_at.isoformat() if user.updated_at else None,
+    }
+    if fields is not None:
+        data = {key: data[key] for key in ('user_id', 'email', *fields) if key in data}
+    return data
+
+
 def create_user_profile(user_data):
     """
-    Create or update user profile in Supabase
+    Create or update user profile in Supabase.
+
+    Single upsert keyed on user_id (needs a unique constraint on
+    user_profiles.user_id). Columns missing from user_data are not changed.
     """
-    client = get_supabase_client()
     try:
-        # Check if user already exists
-        existing_user = client.table('user_profiles').select('*').eq('user_id', user_data['user_id']).execute()
-        
-        if existing_user.data:
-            # Update existing user
-            response = client.table('user_profiles').update(user_data).eq('user_id', user_data['user_id']).execute()
-        else:
-            # Create new user
-            response = client.table('user_profiles').insert(user_data).execute()
-        
+        response = _pool.execute(
+            'create_user_profile',
+            lambda client: client.table('user_profiles').upsert(user_data, on_conflict='user_id').execute(),
+        )
         return response.data
     except Exception as e:
         print(f"Error creating/updating user profile: {e}")
         return None
 
 
+def upsert_user_profiles(rows: list) -> None:
+    """
+    Upsert a batch of user profiles in a single request.
+
+    Rows must share the same keys. Errors are raised to the caller.
+    """
+    from postgrest.types import ReturnMethod
+
+    _pool.execute(
+        'upsert_user_profiles',
+        lambda client: client.table('user_profiles').upsert(
+            rows,
+            on_conflict='user_id',
+            returning=ReturnMethod.minimal,
+        ).execute(),
+    )
+
+
+def bulk_upsert_user_profiles(rows: Iterable[Dict[str, Any]],
+                              batch_size: int = SUPABASE_UPSERT_BATCH_SIZE) -> int:
+    """
+    Upsert many user profiles, batch_size rows per request.
+
+    Rows must share the same keys. Returns the number of rows synced;
+    failed batches are reported and skipped.
+    """
+    synced = 0
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            return synced
+        try:
+            upsert_user_profiles(batch)
+            synced += len(batch)
+        except Exception as e:
+            print(f"Error upserting {len(batch)} user profiles: {e}")
+
+
 def get_user_profile(user_id):
     """
     Get user profile from Supabase
     """
-    client = get_supabase_client()
     try:
-        response = client.table('user_profiles').select('*').eq('user_id', user_id).execute()
+        response = _pool.execute(
+            'get_user_profile',
+            lambda client: client.table('user_profiles').select('*').eq('user_id', user_id).execute(),
+        )
         return response.data[0] if response.data else None
     except Exception as e:
         print(f"Error getting user profile: {e}")
@@ -66,33 +393,55 @@ def sign_up_user(email: str, password: str, user_data: Dict[str, Any]) -> Option
     """
     Sign up a new user in Supabase Auth
     """
-    client = get_supabase_client()
     try:
-        response = client.auth.sign_up({
-            "email": email,
-            "password": password,
-            "options": {
-                "data": user_data
-            }
-        })
+        response = _pool.execute(
+            'sign_up_user',
+            lambda client: client.auth.sign_up({
+                "email": email,
+                "password": password,
+                "options": {
+                    "data": user_data
+                }
+            }),
+            kind=AUTH_CLIENT,
+            idempotent=False,
+        )
         return response.user
     except Exception as e:
         print(f"Error signing up user in Supabase: {e}")
         return None
 
 
+def verify_user_credentials(email: str, password: str) -> Optional[Dict]:
+    """
+    Check email and password against Supabase Auth.
+
+    Returns the Supabase user, or None when the credentials are rejected.
+    Raises SupabaseUnavailable when Supabase could not give an answer.
+    """
+    try:
+        response = _pool.execute(
+            'sign_in_user',
+            lambda client: client.auth.sign_in_with_password({
+                "email": email,
+                "password": password
+            }),
+            kind=AUTH_CLIENT,
+        )
+    except Exception as e:
+        if _credentials_rejected(e):
+            return None
+        raise SupabaseUnavailable(str(e)) from e
+    return response.user
+
+
 def sign_in_user(email: str, password: str) -> Optional[Dict]:
     """
     Sign in user with Supabase Auth
     """
-    client = get_supabase_client()
     try:
-        response = client.auth.sign_in_with_password({
-            "email": email,
-            "password": password
-        })
-        return response.user
-    except Exception as e:
+        return verify_user_credentials(email, password)
+    except SupabaseUnavailable as e:
         print(f"Error signing in user with Supabase: {e}")
         return None
 
@@ -101,9 +450,13 @@ def reset_password(email: str) -> bool:
     """
     Send password reset email via Supabase
     """
-    client = get_supabase_client()
     try:
-        response = client.auth.reset_password_email(email)
+        _pool.execute(
+            'reset_password',
+            lambda client: client.auth.reset_password_email(email),
+            kind=AUTH_CLIENT,
+            idempotent=False,
+        )
         return True
     except Exception as e:
         print(f"Error sending password reset email: {e}")
@@ -112,29 +465,73 @@ def reset_password(email: str) -> bool:
 
 def update_password(access_token: str, new_password: str) -> bool:
     """
-    Update user password in Supabase
+    Set the password of the Supabase user signed in with ``access_token``.
+
+    The pooled clients hold no session, so the user is looked up from the
+    token and updated with the admin API (needs SUPABASE_SERVICE_KEY).
     """
-    client = get_supabase_client()
     try:
-        response = client.auth.update_user({
-            "password": new_password
-        })
+        response = _pool.execute(
+            'get_user',
+            lambda client: client.auth.get_user(access_token),
+            kind=AUTH_CLIENT,
+        )
+        if response is None or response.user is None:
+            return False
+        user_id = response.user.id
+        _pool.execute(
+            'update_password',
+            lambda client: client.auth.admin.update_user_by_id(user_id, {
+                "password": new_password
+            }),
+            kind=ADMIN_CLIENT,
+        )
         return True
     except Exception as e:
         print(f"Error updating password: {e}")
         return False
 
 
+def create_auth_user(email: str, password: Optional[str], user_data: Dict[str, Any]) -> Optional[Dict]:
+    """
+    Create a confirmed Supabase Auth user with the admin API (needs
+    SUPABASE_SERVICE_KEY). Without a password the user sets one with a
+    password reset.
+
+    Returns the Supabase user, or None when the email is already
+    registered. Raises SupabaseUnavailable for other errors.
+    """
+    attributes = {'email': email, 'email_confirm': True, 'user_metadata': user_data}
+    if password:
+        attributes['password'] = password
+    try:
+        response = _pool.execute(
+            'create_auth_user',
+            lambda client: client.auth.admin.create_user(attributes),
+            kind=ADMIN_CLIENT,
+            idempotent=False,
+        )
+    except SupabaseUnavailable:
+        raise
+    except Exception as e:
+        if _credentials_rejected(e) and getattr(e, 'status', None) == 422 and 'registered' in str(e):
+            return None
+        raise SupabaseUnavailable(str(e)) from e
+    return response.user
+
+
 def get_user_by_email(email: str) -> Optional[Dict]:
     """
     Get user from Supabase Auth by email
     """
-    client = get_supabase_client()
     try:
         # Note: This requires admin privileges in Supabase
         # For now, we'll use the profiles table
-        response = client.table('user_profiles').select('*').eq('email', email).execute()
+        response = _pool.execute(
+            'get_user_by_email',
+            lambda client: client.table('user_profiles').select('*').eq('email', email).execute(),
+        )
         return response.data[0] if response.data else None
     except Exception as e:
         print(f"Error getting user by email: {e}")
-        return None 
\ No newline at end of file
+        return None
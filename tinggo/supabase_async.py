@@ -0,0 +1,231 @@
+"""
+Async counterparts of the tinggo.supabase helpers, used by the ASGI views
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+import weakref
+from typing import TYPE_CHECKING, Optional, Dict, Any, Callable, Awaitable
+
+from .config import SUPABASE_URL
+from .supabase import (
+    DATA_CLIENT,
+    AUTH_CLIENT,
+    SupabaseClientPool,
+    SupabaseUnavailable,
+    _credentials_rejected,
+)
+
+# Imported lazily like in tinggo.supabase
+if TYPE_CHECKING:
+    from supabase._async.client import AsyncClient
+
+
+class AsyncSupabaseClientPool(SupabaseClientPool):
+    """
+    Async variant of SupabaseClientPool.
+
+    Async httpx connections belong to the event loop that opened them, so
+    clients are kept per running loop instead of per thread.
+    """
+
+    def reset(self):
+        super().reset()
+        self._loops = weakref.WeakKeyDictionary()
+
+    async def _build_client(self, kind: str = DATA_CLIENT) -> AsyncClient:
+        from supabase._async.client import create_client
+
+        timeout, limits, options = self._client_settings()
+        client = await create_client(SUPABASE_URL, self._api_key(kind), options)
+
+        # Same session swap as the sync pool, see SupabaseClientPool._build_client
+        postgrest = client.postgrest
+        session = postgrest.session
+        postgrest.session = session.__class__(
+            base_url=session.base_url,
+            headers=session.headers,
+            timeout=timeout,
+            limits=limits,
+        )
+        await session.aclose()
+
+        auth_session = client.auth._http_client
+        client.auth._http_client = auth_session.__class__(
+            timeout=timeout,
+            limits=limits,
+            follow_redirects=True,
+        )
+        await auth_session.aclose()
+        return client
+
+    async def get(self, kind: str = DATA_CLIENT) -> AsyncClient:
+        """
+        Return the pooled client of the given kind for the running event loop
+        """
+        if os.getpid() != self._pid:
+            self.reset()
+
+        clients = self._loops.setdefault(asyncio.get_running_loop(), {})
+        client = clients.get(kind)
+        if client is not None:
+            self._increment('pool_hits')
+            return client
+
+        self._increment('pool_misses')
+        client = await self._build_client(kind)
+        # Another task may have built one while we were waiting
+        existing = clients.setdefault(kind, client)
+        if existing is not client:
+            await client.postgrest.aclose()
+            await client.auth.close()
+        return existing
+
+    async def execute(self, operation: str, call: Callable[[AsyncClient], Awaitable[Any]],
+                      kind: str = DATA_CLIENT, idempotent: bool = True) -> Any:
+        """
+        Await ``call(client)`` with latency tracking and retry/backoff
+        """
+        attempt = 0
+        while True:
+            client = await self.get(kind)
+            started = time.perf_counter()
+            try:
+                result = await call(client)
+            except Exception as e:
+                self._record(operation, started, failed=True)
+                delay = self._retry_delay(e, attempt, idempotent)
+                if delay is None:
+                    raise
+                self._increment('retries')
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            self._record(operation, started)
+            return result
+
+
+_pool = AsyncSupabaseClientPool()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_pool.reset)
+
+
+async def get_supabase_client() -> AsyncClient:
+    """
+    Get pooled async Supabase client instance for table queries
+    """
+    return await _pool.get(DATA_CLIENT)
+
+
+def get_client_stats() -> Dict[str, Any]:
+    """
+    Get async Supabase pool-hit and latency counters for the current worker
+    """
+    return _pool.stats()
+
+
+async def create_user_profile(user_data):
+    """
+    Create or update user profile in Supabase (single upsert on user_id)
+    """
+    try:
+        response = await _pool.execute(
+            'create_user_profile',
+            lambda client: client.table('user_profiles').upsert(user_data, on_conflict='user_id').execute(),
+        )
+        return response.data
+    except Exception as e:
+        print(f"Error creating/updating user profile: {e}")
+        return None
+
+
+async def get_user_profile(user_id):
+    """
+    Get user profile from Supabase
+    """
+    try:
+        response = await _pool.execute(
+            'get_user_profile',
+            lambda client: client.table('user_profiles').select('*').eq('user_id', user_id).execute(),
+        )
+        return response.data[0] if response.data else None
+    except Exception as e:
+        print(f"Error getting user profile: {e}")
+        return None
+
+
+async def sign_up_user(email: str, password: str, user_data: Dict[str, Any]) -> Optional[Dict]:
+    """
+    Sign up a new user in Supabase Auth
+    """
+    try:
+        response = await _pool.execute(
+            'sign_up_user',
+            lambda client: client.auth.sign_up({
+                "email": email,
+                "password": password,
+                "options": {
+                    "data": user_data
+                }
+            }),
+            kind=AUTH_CLIENT,
+            idempotent=False,
+        )
+        return response.user
+    except Exception as e:
+        print(f"Error signing up user in Supabase: {e}")
+        return None
+
+
+async def verify_user_credentials(email: str, password: str) -> Optional[Dict]:
+    """
+    Check email and password against Supabase Auth.
+
+    Returns the Supabase user, or None when the credentials are rejected.
+    Raises SupabaseUnavailable when Supabase could not give an answer.
+    """
+    try:
+        response = await _pool.execute(
+            'sign_in_user',
+            lambda client: client.auth.sign_in_with_password({
+                "email": email,
+                "password": password
+            }),
+            kind=AUTH_CLIENT,
+        )
+    except Exception as e:
+        if _credentials_rejected(e):
+            return None
+        raise SupabaseUnavailable(str(e)) from e
+    return response.user
+
+
+async def sign_in_user(email: str, password: str) -> Optional[Dict]:
+    """
+    Sign in user with Supabase Auth
+    """
+    try:
+        return await verify_user_credentials(email, password)
+    except SupabaseUnavailable as e:
+        print(f"Error signing in user with Supabase: {e}")
+        return None
+
+
+async def reset_password(email: str) -> bool:
+    """
+    Send password reset email via Supabase
+    """
+    try:
+        await _pool.execute(
+            'reset_password',
+            lambda client: client.auth.reset_password_email(email),
+            kind=AUTH_CLIENT,
+            idempotent=False,
+        )
+        return True
+    except Exception as e:
+        print(f"Error sending password reset email: {e}")
+        return False
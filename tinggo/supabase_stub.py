@@ -0,0 +1,114 @@
+"""
+A local stand-in for the Supabase Auth and REST APIs, for benchmarks.
+
+Answers the calls tinggo.supabase makes (sign-up, password sign-in,
+password recovery, user_profiles upserts and selects) after a fixed
+latency, so load tests measure this app and not the network or
+Supabase's rate limits. Passwords starting with "wrong" are rejected.
+"""
+import json
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+# Any three-part token passes supabase-py's key format check
+STUB_KEY = 'stub.stub.stub'
+
+
+def _auth_user(email, user_metadata=None):
+    now = datetime.now(timezone.utc).isoformat()
+    return {
+        'id': str(uuid.uuid5(uuid.NAMESPACE_URL, f'mailto:{email}')),
+        'aud': 'authenticated',
+        'role': 'authenticated',
+        'email': email,
+        'app_metadata': {'provider': 'email'},
+        'user_metadata': user_metadata or {},
+        'created_at': now,
+        'updated_at': now,
+    }
+
+
+class StubSupabaseHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Keep-alive responses would otherwise wait ~40 ms on delayed ACKs
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def read_json(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        return json.loads(self.rfile.read(length) or b'null')
+
+    def handle_call(self):
+        time.sleep(self.server.latency)
+        with self.server.lock:
+            self.server.calls += 1
+        path = urlsplit(self.path).path
+        data = self.read_json() if self.command in ('POST', 'PATCH', 'PUT') else None
+
+        if path == '/auth/v1/signup':
+            # Email confirmation on: a user, no session
+            return self.send_json(200, _auth_user(data['email'], data.get('data')))
+        if path == '/auth/v1/token':
+            if data['password'].startswith('wrong'):
+                return self.send_json(400, {
+                    'error': 'invalid_grant',
+                    'error_description': 'Invalid login credentials',
+                })
+            return self.send_json(200, {
+                'access_token': 'stub-access-token',
+                'refresh_token': 'stub-refresh-token',
+                'token_type': 'bearer',
+                'expires_in': 3600,
+                'user': _auth_user(data['email']),
+            })
+        if path == '/auth/v1/recover':
+            return self.send_json(200, {})
+        if path.startswith('/rest/v1/'):
+            rows = data if isinstance(data, list) else [data] if data else []
+            return self.send_json(200 if self.command == 'GET' else 201, rows)
+        return self.send_json(404, {'message': f'{self.command} {path} is not stubbed'})
+
+    do_GET = do_POST = do_PATCH = do_PUT = do_DELETE = handle_call
+
+
+class StubSupabase:
+    """
+    Stub server on a free local port, in a daemon thread:
+
+        with StubSupabase(latency_ms=50) as stub:
+            stub.url  # use as SUPABASE_URL, with STUB_KEY as SUPABASE_KEY
+    """
+
+    def __init__(self, latency_ms=50):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), StubSupabaseHandler)
+        self.server.daemon_threads = True
+        self.server.latency = latency_ms / 1000
+        self.server.lock = threading.Lock()
+        self.server.calls = 0
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}'
+
+    @property
+    def calls(self):
+        return self.server.calls
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,74 @@
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.template import engines
+from django.template.backends.django import DjangoTemplates, Template
+from django.template.utils import get_app_template_dirs
+
+from .instrumentation import current_timings, record_phase
+
+
+def project_template_dirs():
+    """
+    Template directories of the project: DIRS plus app directories inside
+    BASE_DIR (e.g. templates/ and theme/templates/), without third-party apps
+    """
+    engine = engines['django'].engine
+    dirs = [Path(path) for path in engine.dirs]
+    dirs += [Path(path) for path in get_app_template_dirs('templates')
+             if Path(path).is_relative_to(settings.BASE_DIR)]
+    return [path for path in dict.fromkeys(dirs) if path.is_dir()]
+
+
+def project_template_names():
+    """
+    Names of every template file in the project template directories
+    """
+    names = set()
+    for directory in project_template_dirs():
+        for path in directory.rglob('*'):
+            if path.is_file() and path.suffix in ('.html', '.txt', '.xml'):
+                names.add(path.relative_to(directory).as_posix())
+    return sorted(names)
+
+
+def warm_templates():
+    """
+    Parse every project template into the cached loader, so the first
+    request after a deploy does not pay the parse cost. Returns the count.
+    """
+    engine = engines['django'].engine
+    names = project_template_names()
+    for name in names:
+        engine.get_template(name)
+    return len(names)
+
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        timings = current_timings()
+        # Templates rendered inside another one (crispy forms fields) are
+        # already part of the outer render
+        if timings is None or timings.rendering:
+            return super().render(context, request)
+        timings.rendering = True
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            timings.rendering = False
+            record_phase('template', (time.perf_counter() - started) * 1000)
+
+
+class InstrumentedDjangoTemplates(DjangoTemplates):
+    """
+    Django template backend that adds render time to the request's
+    template phase (tinggo.instrumentation)
+    """
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name).template, self)
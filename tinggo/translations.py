@@ -0,0 +1,70 @@
+import gettext as gettext_module
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.utils.translation import trans_real
+
+
+_lock = threading.Lock()
+_state = {'mtime': None, 'checked': 0.0}
+
+
+def catalog_mtime():
+    """
+    Newest modification time of the project's compiled .mo catalogs
+    """
+    return max(
+        (path.stat().st_mtime for locale in settings.LOCALE_PATHS
+         for path in Path(locale).glob('*/LC_MESSAGES/*.mo')),
+        default=0,
+    )
+
+
+def catalog_version():
+    """
+    Modification time of the loaded catalogs, for cache keys of translated pages
+    """
+    if _state['mtime'] is None:
+        _state['mtime'] = catalog_mtime()
+    return _state['mtime']
+
+
+def warm_translations():
+    """
+    Load the catalogs of every language in LANGUAGES into Django's
+    process-wide translation cache.
+
+    Called by the WSGI/ASGI entry points, so with gunicorn --preload the
+    catalogs are parsed once in the master and shared with forked workers
+    instead of being loaded by the first request of each language.
+    """
+    mtime = catalog_mtime()
+    catalogs = {code: trans_real.DjangoTranslation(code) for code, _ in settings.LANGUAGES}
+    # Swap the whole dict: requests in flight keep the catalog they activated
+    trans_real._translations = {**trans_real._translations, **catalogs}
+    _state['mtime'] = mtime
+    _state['checked'] = time.monotonic()
+
+
+def reload_translations_if_changed():
+    """
+    Reload the catalogs when a .mo file changed since they were loaded.
+    Checks the files at most once per TRANSLATION_RELOAD_INTERVAL seconds.
+    """
+    interval = settings.TRANSLATION_RELOAD_INTERVAL
+    if not interval or time.monotonic() - _state['checked'] < interval:
+        return False
+    with _lock:
+        if time.monotonic() - _state['checked'] < interval:
+            return False
+        _state['checked'] = time.monotonic()
+        if catalog_mtime() == _state['mtime']:
+            return False
+        # gettext caches parsed .mo files by path, Django caches per language
+        gettext_module._translations = {}
+        trans_real._translations = {}
+        trans_real._default = None
+        warm_translations()
+    return True
@@ -21,11 +21,13 @@ from django.conf.urls.static import static
 from django.views.i18n import set_language
 from django.conf.urls.i18n import i18n_patterns
 from accounts.views import home
+from tinggo.instrumentation import metrics
 
 # URL patterns that should be internationalized
 urlpatterns = i18n_patterns(
     path('', home, name='home'),
     path('accounts/', include('accounts.urls')),
+    path('events/', include('events.urls')),
     prefix_default_language=True,  # Prefix all languages including default (en)
 )
 
@@ -33,6 +35,7 @@ urlpatterns = i18n_patterns(
 urlpatterns += [
     path('admin/', admin.site.urls),
     path('i18n/', include('django.conf.urls.i18n')),  # Language switching
+    path('internal/metrics', metrics, name='metrics'),  # Prometheus, needs METRICS_TOKEN
 ]
 
 # Serve media files during development